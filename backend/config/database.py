@@ -1,15 +1,105 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
 from fastapi import Depends, HTTPException, status
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict
+import threading
 import os
 
 from config.settings import settings
 
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Collects connection pool counters and checkout latency.
+
+    Pool events are fired from the driver's worker threads, so all counters
+    are guarded by a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connections_open = 0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.in_use = 0
+            self.peak_in_use = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.checkout_time_total_ms = 0.0
+            self.checkout_time_max_ms = 0.0
+            self.pool_clears = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+            self.connections_open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+            self.connections_open = max(0, self.connections_open - 1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        # ``duration`` (seconds) is reported by the driver from checkout start
+        duration_ms = getattr(event, "duration", 0.0) * 1000
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.checkout_time_total_ms += duration_ms
+            self.checkout_time_max_ms = max(self.checkout_time_max_ms, duration_ms)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            avg_ms = self.checkout_time_total_ms / self.checkouts if self.checkouts else 0.0
+            return {
+                "connectionsOpen": self.connections_open,
+                "connectionsCreated": self.connections_created,
+                "connectionsClosed": self.connections_closed,
+                "inUse": self.in_use,
+                "peakInUse": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "checkoutFailures": self.checkout_failures,
+                "avgCheckoutMs": round(avg_ms, 3),
+                "maxCheckoutMs": round(self.checkout_time_max_ms, 3),
+                "poolClears": self.pool_clears,
+            }
+
 class Database:
     def __init__(self):
         self.client: AsyncIOMotorClient = None
         self.db = None
-    
+        self.pool_stats = PoolStatsListener()
+
     async def connect_to_database(self):
         try:
             # Skip database connection if using placeholder URL
@@ -17,8 +107,16 @@ class Database:
                 print("⚠️  Skipping MongoDB connection - placeholder URL detected")
                 print("📝 Please configure your MongoDB Atlas connection string in .env file")
                 return
-                
-            self.client = AsyncIOMotorClient(settings.MONGODB_URL)
+
+            # One pooled client is shared by every request for the process lifetime
+            self.client = AsyncIOMotorClient(
+                settings.MONGODB_URL,
+                maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+                minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+                maxIdleTimeMS=settings.MONGODB_MAX_IDLE_TIME_MS,
+                waitQueueTimeoutMS=settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+                event_listeners=[self.pool_stats],
+            )
             self.db = self.client[settings.MONGODB_DATABASE_NAME]
             # Test the connection
             await self.client.admin.command('ping')
@@ -32,21 +130,37 @@ class Database:
             #     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             #     detail="Database connection failed"
             # )
-    
+
     async def close_database_connection(self):
         if self.client:
             self.client.close()
+            self.client = None
+            self.db = None
             print("Closed MongoDB connection")
-    
+
     def get_collection(self, collection_name: str):
         return self.db[collection_name]
 
+    def get_pool_stats(self) -> Dict:
+        """Return pool configuration together with live pool counters."""
+        return {
+            "connected": self.client is not None,
+            "config": {
+                "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+                "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+                "maxIdleTimeMS": settings.MONGODB_MAX_IDLE_TIME_MS,
+                "waitQueueTimeoutMS": settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+            },
+            "stats": self.pool_stats.snapshot(),
+        }
+
 # Create database instance
 db = Database()
 
 # Dependency to get database client
 async def get_database() -> AsyncGenerator[Database, None]:
-    # Ensure database is connected
+    # The client is created once at application startup; only retry here
+    # if that initial connection attempt was skipped or failed.
     if not db.client:
         await db.connect_to_database()
-    yield db
\ No newline at end of file
+    yield db
@@ -1,20 +1,113 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 class Settings(BaseSettings):
     # MongoDB Configuration
     MONGODB_URL: str = "mongodb://localhost:27017"
     MONGODB_DATABASE_NAME: str = "smart_lab_db"
     
+    # MongoDB Connection Pool Configuration
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 10
+    MONGODB_MAX_IDLE_TIME_MS: int = 300000
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = 5000
+    
     # JWT Configuration
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Verified tokens kept in memory so repeat requests skip signature checks
+    JWT_CACHE_SIZE: int = 10000
+    
+    # Password hashing pool: bcrypt runs on these threads, and at most
+    # PASSWORD_HASH_MAX_QUEUE further calls may wait before new ones get 503
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
     
     # Application Configuration
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "Smart Lab Power Shutdown Assistant"
     DEBUG: bool = True
+    # Validate responses against their Pydantic models before serializing;
+    # can be disabled in production to skip the extra pass
+    VALIDATE_RESPONSES: bool = True
+    
+    # Documents fetched per cursor batch when streaming exports
+    EXPORT_BATCH_SIZE: int = 1000
+    
+    # Live update stream: events buffered per client before it is dropped as
+    # a slow consumer, and seconds between keep-alive comments
+    EVENT_QUEUE_SIZE: int = 256
+    EVENT_HEARTBEAT_SECONDS: int = 15
+    
+    # Background jobs: power operations run on JOB_WORKERS concurrent workers,
+    # and at most JOB_MAX_QUEUE jobs may wait before new ones get 503
+    JOB_WORKERS: int = 4
+    JOB_MAX_QUEUE: int = 100
+    
+    # Seconds between full recomputes of the materialized checklist readiness
+    CHECKLIST_READINESS_RECOMPUTE_SECONDS: int = 300
+    
+    # Shutdown logs are buffered and written in batches of up to
+    # WRITE_BEHIND_BATCH_SIZE, at least every WRITE_BEHIND_FLUSH_SECONDS.
+    # Enable WRITE_BEHIND_WAIT_FOR_FLUSH to make writers wait until stored.
+    # Batches hit by a connection error are retried on up to
+    # WRITE_BEHIND_MAX_RETRIES later flushes before they are dropped
+    WRITE_BEHIND_BATCH_SIZE: int = 100
+    WRITE_BEHIND_FLUSH_SECONDS: float = 1.0
+    WRITE_BEHIND_WAIT_FOR_FLUSH: bool = False
+    WRITE_BEHIND_MAX_RETRIES: int = 3
+    
+    # Store shutdown logs in a MongoDB time-series collection (5.0+) with
+    # device, user and status as its metaField. Run scripts/migrate_database.py
+    # with the API stopped after enabling it to convert the existing collection
+    SHUTDOWN_LOGS_TIMESERIES: bool = False
+    
+    # Shutdown and audit logs older than LOG_RETENTION_DAYS (0 keeps them
+    # forever) are moved to compressed daily files under LOG_ARCHIVE_DIR,
+    # LOG_ARCHIVE_BATCH_SIZE documents at a time, every
+    # LOG_RETENTION_INTERVAL_SECONDS
+    LOG_RETENTION_DAYS: int = 0
+    LOG_ARCHIVE_DIR: str = "archive"
+    LOG_ARCHIVE_BATCH_SIZE: int = 10000
+    LOG_RETENTION_INTERVAL_SECONDS: int = 3600
+    
+    # Power drivers: POWER_DRIVER_TYPES maps device types to drivers
+    # ("server:ipmi,pdu:snmp_pdu"); other devices use POWER_DEFAULT_DRIVER.
+    # Each driver has its own concurrency limit and per-call timeout
+    POWER_DEFAULT_DRIVER: str = "simulated"
+    POWER_DRIVER_TYPES: str = ""
+    POWER_SIMULATED_CONCURRENCY: int = 50
+    POWER_SIMULATED_TIMEOUT_SECONDS: float = 30
+    POWER_IPMI_CONCURRENCY: int = 20
+    POWER_IPMI_TIMEOUT_SECONDS: float = 30
+    IPMI_USERNAME: str = "admin"
+    IPMI_PASSWORD: str = ""
+    POWER_SNMP_PDU_CONCURRENCY: int = 4
+    POWER_SNMP_PDU_TIMEOUT_SECONDS: float = 15
+    SNMP_COMMUNITY: str = "private"
+    POWER_TCP_SIMULATOR_HOST: str = "127.0.0.1"
+    POWER_TCP_SIMULATOR_PORT: int = 9100
+    POWER_TCP_SIMULATOR_CONCURRENCY: int = 20
+    POWER_TCP_SIMULATOR_TIMEOUT_SECONDS: float = 10
+    
+    # Startup powers devices on in waves so that no circuit draws more than
+    # its budget at once. Circuits come from power.circuit, else location;
+    # POWER_ON_CIRCUIT_BUDGETS overrides single circuits ("Rack A1:3000").
+    # Devices without power_consumption.watts count as POWER_ON_DEFAULT_WATTS
+    POWER_ON_BUDGET_WATTS: int = 2000
+    POWER_ON_CIRCUIT_BUDGETS: str = ""
+    POWER_ON_DEFAULT_WATTS: int = 300
+    
+    @property
+    def power_driver_types(self) -> Dict[str, str]:
+        pairs = (entry.split(":", 1) for entry in self.POWER_DRIVER_TYPES.split(",") if ":" in entry)
+        return {device_type.strip(): driver.strip() for device_type, driver in pairs}
+    
+    @property
+    def power_on_circuit_budgets(self) -> Dict[str, int]:
+        pairs = (entry.rsplit(":", 1) for entry in self.POWER_ON_CIRCUIT_BUDGETS.split(",") if ":" in entry)
+        return {circuit.strip(): int(watts) for circuit, watts in pairs}
     
     # CORS Configuration
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:5173,http://localhost:5174"
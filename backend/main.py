@@ -1,20 +1,30 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from typing import Dict
 import os
+import asyncio
 import logging
 
 from config.settings import settings
 from config.database import db, get_database
 from src.auth import oauth2_scheme
+from src.models.indexes import reconcile_indexes
+from src.auth.password_utils import password_hasher
+from src.events import event_hub
+from src.jobs import job_manager
+from src.readiness import run_periodic_recompute
+from src.archive import run_periodic_retention
+from src.write_behind import write_behind
+from src.power import power_manager
 
 app = FastAPI(
     title=settings.PROJECT_NAME, 
     description="API for managing lab power shutdown procedures",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -24,6 +34,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Configure logging
@@ -58,7 +69,8 @@ async def http_exception_handler(request, exc):
                 "type": "http_error",
                 "status_code": exc.status_code
             }
-        }
+        },
+        headers=getattr(exc, "headers", None)
     )
 
 @app.on_event("startup")
@@ -66,11 +78,37 @@ async def startup_event():
     logger.info("Starting up Smart Lab Power Shutdown Assistant API")
     await db.connect_to_database()
     logger.info("Database connection established")
+    if db.db is not None:
+        # Build missing indexes without delaying startup
+        app.state.index_task = asyncio.create_task(reconcile_indexes(db.db))
+    write_behind.start()
+    await job_manager.start(db)
+    # Periodically rebuild the checklist readiness aggregate to correct drift
+    app.state.readiness_task = asyncio.create_task(
+        run_periodic_recompute(db, settings.CHECKLIST_READINESS_RECOMPUTE_SECONDS)
+    )
+    # Move logs past the retention window to the archive
+    app.state.retention_task = None
+    if settings.LOG_RETENTION_DAYS > 0:
+        app.state.retention_task = asyncio.create_task(
+            run_periodic_retention(db, settings.LOG_RETENTION_INTERVAL_SECONDS)
+        )
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down Smart Lab Power Shutdown Assistant API")
+    # End open event streams so the server is not held open by idle clients
+    event_hub.close()
+    # Jobs cut off here stay "running" and are marked failed on next startup
+    await job_manager.stop()
+    app.state.readiness_task.cancel()
+    if app.state.retention_task is not None:
+        app.state.retention_task.cancel()
+    # Write buffered shutdown logs while the database is still connected
+    await write_behind.stop()
+    await power_manager.close()
     await db.close_database_connection()
+    password_hasher.shutdown()
     logger.info("Database connection closed")
 
 @app.get("/")
@@ -95,15 +133,23 @@ from src.api.v1.auth.router import router as auth_router
 from src.api.v1.devices.router import router as devices_router
 from src.api.v1.checklist.router import router as checklist_router
 from src.api.v1.shutdown_logs.router import router as shutdown_logs_router
+from src.api.v1.reports.router import router as reports_router
 from src.api.v1.shutdown.router import router as shutdown_router
 from src.api.v1.users.router import router as users_router
+from src.api.v1.system.router import router as system_router
+from src.api.v1.dashboard.router import router as dashboard_router
+from src.api.v1.events.router import router as events_router
 
 app.include_router(auth_router, prefix=f"{settings.API_V1_STR}/auth")
 app.include_router(devices_router, prefix=f"{settings.API_V1_STR}/devices")
 app.include_router(checklist_router, prefix=f"{settings.API_V1_STR}/checklist")
 app.include_router(shutdown_logs_router, prefix=f"{settings.API_V1_STR}/shutdown-logs")
+app.include_router(reports_router, prefix=f"{settings.API_V1_STR}/reports")
 app.include_router(shutdown_router, prefix=f"{settings.API_V1_STR}/shutdown")
 app.include_router(users_router, prefix=f"{settings.API_V1_STR}/users")
+app.include_router(system_router, prefix=f"{settings.API_V1_STR}/system")
+app.include_router(dashboard_router, prefix=f"{settings.API_V1_STR}/dashboard")
+app.include_router(events_router, prefix=f"{settings.API_V1_STR}/events")
 
 @app.get("/test-users")
 def test_users():
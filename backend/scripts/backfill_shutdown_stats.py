@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Data Migration Script: Backfill Shutdown Statistics
+
+/reports/stats reads hourly and daily rollups of the shutdown logs, which
+are kept up to date as new logs are written. This script rebuilds the
+rollups of a date range from the logs themselves, for history written
+before the rollups existed or to correct drift. Days that log retention
+moved out of MongoDB are rebuilt from the archive in LOG_ARCHIVE_DIR, so run
+it where that directory is available. Each day is rebuilt on its
+own, so an interrupted run can be repeated with --start set to the day it
+stopped at.
+
+Rebuilding a day drops the rollup updates of logs written for it while it
+is rebuilt, so the current day (UTC) is left out unless --include-today is
+given, which must only be done with the API stopped.
+
+Usage:
+    python scripts/backfill_shutdown_stats.py [--start YYYY-MM-DD] [--end YYYY-MM-DD] [--include-today]
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add the backend root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from config.settings import settings
+from src.archive import archived_days
+from src.log_storage import SHUTDOWN_LOGS
+from src.reporting import backfill_rollups
+
+async def backfill_shutdown_stats(start=None, end=None, include_today=False):
+    """Rebuild the shutdown statistics rollups for [start, end)"""
+
+    print("🔄 Starting shutdown statistics backfill...")
+
+    # Connect to MongoDB
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db = client[settings.MONGODB_DATABASE_NAME]
+
+    try:
+        # Test connection
+        await client.admin.command('ping')
+        print("✅ Connected to MongoDB successfully")
+
+        logs = db.get_collection(SHUTDOWN_LOGS)
+        if start is None:
+            oldest = await logs.find_one({}, sort=[("timestamp", 1)], projection={"timestamp": 1})
+            candidates = archived_days(SHUTDOWN_LOGS)[:1] + ([oldest["timestamp"]] if oldest else [])
+            if not candidates:
+                print("ℹ️  No shutdown logs to backfill")
+                return
+            start = min(candidates)
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        if end is None:
+            end = today + timedelta(days=1) if include_today else today
+        elif not include_today and end > today:
+            print(f"ℹ️  Stopping before {today.date()}; pass --include-today with the API stopped to rebuild it")
+            end = today
+
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        total = 0
+        while day < end:
+            count = await backfill_rollups(db, day, day + timedelta(days=1), include_today=include_today)
+            total += count
+            print(f"  📅 {day.date()}: {count} logs")
+            day += timedelta(days=1)
+
+        print("\n✅ Backfill complete!")
+        print(f"   📈 Logs read: {total}")
+
+    except Exception as e:
+        print(f"❌ Error during backfill: {e}")
+        raise
+    finally:
+        client.close()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Rebuild shutdown statistics rollups from the shutdown logs")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="First day to rebuild (default: oldest stored or archived log)")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="Day to stop before (default: today, or tomorrow with --include-today)")
+    parser.add_argument("--include-today", action="store_true", help="Also rebuild the current day; only with the API stopped")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(backfill_shutdown_stats(start=args.start, end=args.end, include_today=args.include_today))
@@ -12,6 +12,12 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import settings
+from src.log_storage import SHUTDOWN_LOGS, TIMESERIES_OPTIONS, to_stored
+from src.archive import TIMESERIES_DELETE_MIN_VERSION
+from scripts.sync_device_assignments import sync_assignments
+
+LEGACY_SHUTDOWN_LOGS = "shutdownLogs_legacy"
+SHUTDOWN_LOG_COPY_BATCH_SIZE = 1000
 
 class DatabaseMigrator:
     def __init__(self):
@@ -46,12 +52,14 @@ class DatabaseMigrator:
             "002_add_user_preferences", 
             "003_add_device_metadata",
             "004_add_checklist_dependencies",
-            "005_add_audit_logs"
+            "005_add_audit_logs",
+            "006_shutdown_logs_timeseries",
+            "007_sync_device_assignments"
         ]
         
         for migration_name in migrations:
-            # Check if migration already applied
-            existing = await migrations_collection.find_one({"name": migration_name})
+            # Check if migration already applied; failed ones are retried
+            existing = await migrations_collection.find_one({"name": migration_name, "status": "success"})
             if existing:
                 print(f"⏭️  Skipping {migration_name} (already applied)")
                 continue
@@ -61,25 +69,28 @@ class DatabaseMigrator:
             
             if migration_method:
                 try:
-                    await migration_method()
+                    # A migration returning False does not apply yet and is
+                    # retried on the next run
+                    if await migration_method() is False:
+                        continue
                     
-                    # Record successful migration
-                    await migrations_collection.insert_one({
+                    # Record successful migration, replacing any failed attempt
+                    await migrations_collection.replace_one({"name": migration_name}, {
                         "name": migration_name,
                         "applied_at": datetime.utcnow(),
                         "status": "success"
-                    })
+                    }, upsert=True)
                     print(f"✅ Applied {migration_name}")
                     
                 except Exception as e:
                     print(f"❌ Failed to apply {migration_name}: {e}")
-                    # Record failed migration
-                    await migrations_collection.insert_one({
+                    # Record failed migration; it is retried on the next run
+                    await migrations_collection.replace_one({"name": migration_name}, {
                         "name": migration_name,
                         "applied_at": datetime.utcnow(),
                         "status": "failed",
                         "error": str(e)
-                    })
+                    }, upsert=True)
                     raise
             else:
                 print(f"⚠️  Migration method not found for {migration_name}")
@@ -183,6 +194,87 @@ class DatabaseMigrator:
             }
         })
 
+    async def migration_006_shutdown_logs_timeseries(self):
+        """Move shutdown logs into a time-series collection when SHUTDOWN_LOGS_TIMESERIES is enabled"""
+        if not settings.SHUTDOWN_LOGS_TIMESERIES:
+            print("   SHUTDOWN_LOGS_TIMESERIES is disabled; not converting shutdown logs")
+            return False
+        
+        server_info = await self.client.server_info()
+        if server_info.get("versionArray", [0])[0] < 5:
+            raise RuntimeError(f"Time-series collections need MongoDB 5.0+, server is {server_info.get('version')}")
+        if settings.LOG_RETENTION_DAYS > 0 and server_info.get("versionArray", [0])[0] < TIMESERIES_DELETE_MIN_VERSION:
+            raise RuntimeError(
+                f"Log retention deletes from time-series collections, which needs MongoDB "
+                f"{TIMESERIES_DELETE_MIN_VERSION}.0+, server is {server_info.get('version')}; "
+                f"set LOG_RETENTION_DAYS=0 or upgrade"
+            )
+        
+        # Time-series collections cannot be renamed, so the existing collection
+        # is moved aside and copied into a new one. Every step can be re-run
+        existing = await self.db.list_collections(filter={"name": SHUTDOWN_LOGS}).to_list(length=1)
+        if existing and existing[0].get("type") != "timeseries":
+            if await self.db.list_collection_names(filter={"name": LEGACY_SHUTDOWN_LOGS}):
+                # Typically the API wrote a log right after the rename
+                raise RuntimeError(
+                    f"Both {SHUTDOWN_LOGS} and {LEGACY_SHUTDOWN_LOGS} exist; stop the API, "
+                    f"move the logs in {SHUTDOWN_LOGS} into {LEGACY_SHUTDOWN_LOGS}, drop {SHUTDOWN_LOGS} and run again"
+                )
+            await self.db[SHUTDOWN_LOGS].rename(LEGACY_SHUTDOWN_LOGS)
+            existing = []
+        if not existing:
+            await self.db.create_collection(SHUTDOWN_LOGS, timeseries=TIMESERIES_OPTIONS)
+        
+        legacy = self.db[LEGACY_SHUTDOWN_LOGS]
+        target = self.db[SHUTDOWN_LOGS]
+        await target.create_index("logId")
+        checkpoints = self.db.syncCheckpoints
+        checkpoint = await checkpoints.find_one({"_id": "shutdown_logs_timeseries"})
+        last_id = checkpoint["lastId"] if checkpoint else None
+        copied = skipped = 0
+        # Only the first batch of a run can have been partly copied by an
+        # interrupted one; later batches start past the saved checkpoint
+        check_copied = True
+        
+        while True:
+            query = {"_id": {"$gt": last_id}} if last_id else {}
+            batch = await legacy.find(query).sort("_id", 1).limit(SHUTDOWN_LOG_COPY_BATCH_SIZE).to_list(length=None)
+            if not batch:
+                break
+            last_id = batch[-1]["_id"]
+            
+            # Copies keep their _id; logIds of old logs are not unique
+            already_copied = set()
+            if check_copied:
+                already_copied = set(await target.distinct(
+                    "_id", {"_id": {"$in": [log["_id"] for log in batch]}}
+                ))
+                check_copied = False
+            documents = []
+            for log in batch:
+                if not isinstance(log.get("timestamp"), datetime):
+                    skipped += 1
+                elif log["_id"] not in already_copied:
+                    documents.append(to_stored(log))
+            if documents:
+                await target.insert_many(documents, ordered=False)
+                copied += len(documents)
+            await checkpoints.update_one(
+                {"_id": "shutdown_logs_timeseries"},
+                {"$set": {"lastId": last_id, "updatedAt": datetime.utcnow()}},
+                upsert=True
+            )
+            print(f"   📦 Copied {copied} shutdown logs")
+        
+        await checkpoints.delete_one({"_id": "shutdown_logs_timeseries"})
+        if skipped:
+            print(f"   ⚠️  Skipped {skipped} shutdown logs without a timestamp")
+        print(f"   ℹ️  The original logs remain in {LEGACY_SHUTDOWN_LOGS}; drop it once verified")
+
+    async def migration_007_sync_device_assignments(self):
+        """Copy users.assignedDevices onto devices.assignedUsers, which authorization reads"""
+        await sync_assignments(self.db)
+
 async def main():
     """Main migration runner"""
     print("🚀 Smart Lab Power Shutdown Assistant - Database Migration")
@@ -205,7 +297,8 @@ async def main():
         print(f"  ❌ Failed migrations: {failed_count}")
         
         if failed_count > 0:
-            print("\n⚠️  Some migrations failed. Check the migrations collection for details.")
+            print("\n⚠️  Some migrations failed. Check the migrations collection for details;")
+            print("   failed migrations are retried on the next run.")
             
     except Exception as e:
         print(f"\n❌ Migration failed: {e}")
@@ -7,11 +7,11 @@ This script creates the necessary collections and indexes for the application.
 import asyncio
 import os
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import IndexModel, ASCENDING, DESCENDING
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import settings
+from src.models.indexes import reconcile_indexes
 
 async def create_collections_and_indexes():
     """Create collections and indexes for the Smart Lab Power Shutdown Assistant"""
@@ -28,69 +28,25 @@ async def create_collections_and_indexes():
         await client.admin.command('ping')
         print("✅ Connected to MongoDB successfully")
         
-        # Users Collection
-        print("\n📁 Setting up Users collection...")
-        users_collection = db.users
-        users_indexes = [
-            IndexModel([("email", ASCENDING)], unique=True),
-            IndexModel([("username", ASCENDING)], unique=True),
-            IndexModel([("role", ASCENDING)]),
-            IndexModel([("created_at", DESCENDING)]),
-            IndexModel([("is_active", ASCENDING)])
-        ]
-        await users_collection.create_indexes(users_indexes)
-        print("✅ Users collection indexes created")
+        # Indexes are declared in src/models/indexes.py for the fields the
+        # routers actually query
+        print("\n📁 Reconciling collection indexes...")
+        report = await reconcile_indexes(db)
+        for entry in report["created"]:
+            print(f"✅ Created index {entry['collection']}.{entry['index']}")
+        for entry in report["mismatched"]:
+            print(f"⚠️  Index {entry['collection']}.{entry['index']} differs from registry")
+        for entry in report["unused"]:
+            print(f"⚠️  Index {entry['collection']}.{entry['index']} is not declared in registry")
+        for entry in report["failed"]:
+            print(f"❌ Failed to create index {entry['collection']}.{entry['index']}: {entry['error']}")
+        if "error" in report:
+            raise RuntimeError(f"Index reconciliation failed: {report['error']}")
+        print("✅ Collection indexes reconciled")
         
-        # Devices Collection
-        print("\n📁 Setting up Devices collection...")
+        users_collection = db.users
         devices_collection = db.devices
-        devices_indexes = [
-            IndexModel([("deviceId", ASCENDING)], unique=True),
-            IndexModel([("name", ASCENDING)]),
-            IndexModel([("status", ASCENDING)]),
-            IndexModel([("location", ASCENDING)]),
-            IndexModel([("assignedUsers", ASCENDING)]),
-            IndexModel([("created_at", DESCENDING)]),
-            IndexModel([("lastShutdown", DESCENDING)])
-        ]
-        await devices_collection.create_indexes(devices_indexes)
-        print("✅ Devices collection indexes created")
-        
-        # Checklist Collection
-        print("\n📁 Setting up Checklist collection...")
         checklist_collection = db.checklist
-        checklist_indexes = [
-            IndexModel([("taskId", ASCENDING)], unique=True),
-            IndexModel([("category", ASCENDING)]),
-            IndexModel([("isCritical", ASCENDING)]),
-            IndexModel([("completed", ASCENDING)]),
-            IndexModel([("completedBy", ASCENDING)]),
-            IndexModel([("completedAt", DESCENDING)]),
-            IndexModel([("created_at", DESCENDING)]),
-            # Compound index for filtering
-            IndexModel([("category", ASCENDING), ("isCritical", ASCENDING)]),
-            IndexModel([("completed", ASCENDING), ("isCritical", ASCENDING)])
-        ]
-        await checklist_collection.create_indexes(checklist_indexes)
-        print("✅ Checklist collection indexes created")
-        
-        # Shutdown Logs Collection
-        print("\n📁 Setting up Shutdown Logs collection...")
-        shutdown_logs_collection = db.shutdown_logs
-        shutdown_logs_indexes = [
-            IndexModel([("deviceId", ASCENDING)]),
-            IndexModel([("userId", ASCENDING)]),
-            IndexModel([("status", ASCENDING)]),
-            IndexModel([("timestamp", DESCENDING)]),
-            IndexModel([("duration", ASCENDING)]),
-            # Compound indexes for common queries
-            IndexModel([("deviceId", ASCENDING), ("timestamp", DESCENDING)]),
-            IndexModel([("userId", ASCENDING), ("timestamp", DESCENDING)]),
-            IndexModel([("status", ASCENDING), ("timestamp", DESCENDING)]),
-            IndexModel([("timestamp", DESCENDING), ("status", ASCENDING)])
-        ]
-        await shutdown_logs_collection.create_indexes(shutdown_logs_indexes)
-        print("✅ Shutdown Logs collection indexes created")
         
         # Create initial data if collections are empty
         print("\n📊 Setting up initial data...")
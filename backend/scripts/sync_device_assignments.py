@@ -5,91 +5,167 @@ Data Migration Script: Sync Device Assignments
 This script fixes the data consistency issue where device assignments
 are stored in users.assignedDevices but not reflected in devices.assignedUsers.
 
-It syncs the assignments bi-directionally to ensure both collections
-have consistent data.
+users.assignedDevices is the source of truth. The expected assignedUsers of
+every device is computed in memory and compared with what is stored; only
+devices that differ are written, in batched bulk_write calls. Devices are
+processed in deviceId order and a checkpoint is saved after each batch, so an
+interrupted run resumes where it stopped.
+
+Usage:
+    python scripts/sync_device_assignments.py [--dry-run] [--batch-size N] [--restart]
 """
 
+import argparse
 import asyncio
 import sys
 import os
+from collections import defaultdict
+from datetime import datetime
 
 # Add the backend root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
 from config.settings import settings
 
-async def sync_device_assignments():
+CHECKPOINT_COLLECTION = "syncCheckpoints"
+CHECKPOINT_ID = "device_assignments"
+DEFAULT_BATCH_SIZE = 500
+
+async def load_expected_assignments(db):
+    """Map each deviceId to the set of user names that have it assigned"""
+    expected = defaultdict(set)
+    users = db.get_collection("users").find(
+        {"assignedDevices": {"$exists": True, "$ne": []}},
+        projection={"name": 1, "assignedDevices": 1}
+    )
+    async for user in users:
+        for device_id in user.get("assignedDevices", []):
+            expected[device_id].add(user["name"])
+    return expected
+
+def build_device_operations(device, expected_users):
+    """Return the bulk_write operations that bring one device in line, if any"""
+    device_filter = {"deviceId": device["deviceId"]}
+    # A missing or null field cannot take $addToSet, so set it outright
+    if not isinstance(device.get("assignedUsers"), list):
+        return [UpdateOne(device_filter, {"$set": {"assignedUsers": sorted(expected_users)}})]
+
+    current_users = set(device["assignedUsers"])
+    to_add = sorted(expected_users - current_users)
+    to_remove = sorted(current_users - expected_users)
+
+    # $addToSet and $pull cannot target the same field in one update
+    operations = []
+    if to_add:
+        operations.append(UpdateOne(device_filter, {"$addToSet": {"assignedUsers": {"$each": to_add}}}))
+    if to_remove:
+        operations.append(UpdateOne(device_filter, {"$pull": {"assignedUsers": {"$in": to_remove}}}))
+    return operations
+
+async def sync_device_assignments(dry_run=False, batch_size=DEFAULT_BATCH_SIZE, restart=False):
     """Sync device assignments between users and devices collections"""
-    
-    print("🔄 Starting device assignment synchronization...")
-    
+
+    mode = " (dry run)" if dry_run else ""
+    print(f"🔄 Starting device assignment synchronization{mode}...")
+
     # Connect to MongoDB
     client = AsyncIOMotorClient(settings.MONGODB_URL)
     db = client[settings.MONGODB_DATABASE_NAME]
-    
+
     try:
         # Test connection
         await client.admin.command('ping')
         print("✅ Connected to MongoDB successfully")
-        
-        # First, clear all assignedUsers from devices (we'll rebuild them)
-        print("🧹 Clearing existing assignedUsers from devices...")
-        await db.get_collection("devices").update_many(
-            {},
-            {"$set": {"assignedUsers": []}}
-        )
-        
-        # Get all users with assigned devices
-        print("👥 Processing user assignments...")
-        users_processed = 0
-        devices_updated = 0
-        
-        async for user in db.get_collection("users").find({"assignedDevices": {"$exists": True, "$ne": []}}):
-            user_name = user["name"]
-            assigned_devices = user.get("assignedDevices", [])
-            
-            if assigned_devices:
-                print(f"  📋 User '{user_name}' has {len(assigned_devices)} devices: {assigned_devices}")
-                
-                # Update each assigned device to include this user
-                for device_id in assigned_devices:
-                    result = await db.get_collection("devices").update_one(
-                        {"deviceId": device_id},
-                        {"$addToSet": {"assignedUsers": user_name}}
-                    )
-                    if result.modified_count > 0:
-                        devices_updated += 1
-                        print(f"    ✅ Added '{user_name}' to device '{device_id}'")
-                    else:
-                        print(f"    ⚠️  Device '{device_id}' not found or already updated")
-                
-                users_processed += 1
-        
-        # Verify the sync by checking devices
-        print("\n📊 Verification - Devices with assignments:")
-        async for device in db.get_collection("devices").find({"assignedUsers": {"$ne": []}}):
-            print(f"  🖥️  Device '{device['deviceId']}' ({device['name']}) assigned to: {device.get('assignedUsers', [])}")
-        
-        print(f"\n✅ Synchronization complete!")
-        print(f"   📈 Users processed: {users_processed}")
-        print(f"   📈 Device assignments updated: {devices_updated}")
-        
-        # Show summary statistics
-        total_users = await db.get_collection("users").count_documents({})
-        total_devices = await db.get_collection("devices").count_documents({})
-        devices_with_assignments = await db.get_collection("devices").count_documents({"assignedUsers": {"$ne": []}})
-        
-        print(f"\n📊 Database Summary:")
-        print(f"   👥 Total users: {total_users}")
-        print(f"   🖥️  Total devices: {total_devices}")
-        print(f"   🔗 Devices with assignments: {devices_with_assignments}")
-        
+
+        await sync_assignments(db, dry_run=dry_run, batch_size=batch_size, restart=restart)
+
     except Exception as e:
         print(f"❌ Error during synchronization: {e}")
+        if not dry_run:
+            print("   Run the script again to resume from the last completed batch")
         raise
     finally:
         client.close()
 
+async def sync_assignments(db, dry_run=False, batch_size=DEFAULT_BATCH_SIZE, restart=False):
+    """Bring devices.assignedUsers in line with users.assignedDevices on an open database"""
+    mode = " (dry run)" if dry_run else ""
+    checkpoints = db.get_collection(CHECKPOINT_COLLECTION)
+
+    if restart and not dry_run:
+        await checkpoints.delete_one({"_id": CHECKPOINT_ID})
+    checkpoint = None if restart else await checkpoints.find_one({"_id": CHECKPOINT_ID})
+    last_device_id = checkpoint["lastDeviceId"] if checkpoint else None
+    if last_device_id:
+        print(f"⏩ Resuming after device '{last_device_id}'")
+
+    print("👥 Loading user assignments...")
+    expected = await load_expected_assignments(db)
+    print(f"   {sum(len(users) for users in expected.values())} assignments across {len(expected)} devices")
+
+    devices_scanned = 0
+    devices_changed = 0
+    operations_applied = 0
+    seen_device_ids = set()
+
+    while True:
+        query = {"deviceId": {"$gt": last_device_id}} if last_device_id else {}
+        batch = await db.get_collection("devices").find(
+            query, projection={"deviceId": 1, "assignedUsers": 1}
+        ).sort("deviceId", 1).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            break
+
+        operations = []
+        for device in batch:
+            device_id = device["deviceId"]
+            seen_device_ids.add(device_id)
+            device_operations = build_device_operations(device, expected.get(device_id, set()))
+            if device_operations:
+                devices_changed += 1
+                print(f"  🖥️  {device_id}: {device.get('assignedUsers')} -> {sorted(expected.get(device_id, set()))}")
+                operations.extend(device_operations)
+
+        devices_scanned += len(batch)
+        last_device_id = batch[-1]["deviceId"]
+
+        if not dry_run:
+            if operations:
+                result = await db.get_collection("devices").bulk_write(operations, ordered=False)
+                operations_applied += result.modified_count
+            await checkpoints.update_one(
+                {"_id": CHECKPOINT_ID},
+                {"$set": {"lastDeviceId": last_device_id, "updatedAt": datetime.utcnow()}},
+                upsert=True
+            )
+        print(f"  📦 Batch done: {devices_scanned} devices scanned, last '{last_device_id}'")
+
+    if not dry_run:
+        # Finished: the next run starts from the beginning
+        await checkpoints.delete_one({"_id": CHECKPOINT_ID})
+
+    # Assignments to devices that no longer exist can only be fixed on the user side
+    if not checkpoint:
+        missing = sorted(set(expected) - seen_device_ids)
+        for device_id in missing:
+            print(f"  ⚠️  Device '{device_id}' is assigned to {sorted(expected[device_id])} but does not exist")
+
+    verb = "would be updated" if dry_run else "updated"
+    print(f"\n✅ Synchronization complete{mode}!")
+    print(f"   📈 Devices scanned: {devices_scanned}")
+    print(f"   📈 Devices {verb}: {devices_changed}")
+    if not dry_run:
+        print(f"   📈 Update operations applied: {operations_applied}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sync devices.assignedUsers with users.assignedDevices")
+    parser.add_argument("--dry-run", action="store_true", help="Report the changes without writing them")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Devices per batch")
+    parser.add_argument("--restart", action="store_true", help="Ignore any saved checkpoint and start over")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    asyncio.run(sync_device_assignments())
\ No newline at end of file
+    args = parse_args()
+    asyncio.run(sync_device_assignments(dry_run=args.dry_run, batch_size=args.batch_size, restart=args.restart))
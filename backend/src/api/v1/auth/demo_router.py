@@ -25,7 +25,7 @@ async def login_demo(form_data: OAuth2PasswordRequestForm = None, username: str
         )
     
     # Verify demo user
-    user = verify_demo_user(username, password)
+    user = await verify_demo_user(username, password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
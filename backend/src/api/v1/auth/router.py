@@ -9,30 +9,17 @@ from src.auth import oauth2_scheme, get_current_user, require_role
 from config.database import get_database
 from src.api.v1.auth.schemas import Token
 from src.auth.jwt import create_access_token
-from passlib.context import CryptContext
+from src.crud import insert_if_absent, update_and_return
+from src.serialization import user_codec
+from src.auth.password_utils import verify_password_async, hash_password_async
+from pymongo.errors import DuplicateKeyError
 
 router = APIRouter(prefix="", tags=["authentication"])
 
-crypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def verify_password(plain_password, hashed_password):
-    return crypt_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return crypt_context.hash(password)
-
 @router.post("/register", response_model=UserResponse)
 async def register(user: UserCreate, db = Depends(get_database)):
-    # Check if user already exists
-    existing_user = await db.get_collection("users").find_one({"name": user.name})
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered"
-        )
-    
     # Hash the password
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password_async(user.password)
     
     # Create user document
     from datetime import datetime
@@ -41,16 +28,22 @@ async def register(user: UserCreate, db = Depends(get_database)):
     user_dict["createdAt"] = datetime.utcnow()
     user_dict["updatedAt"] = datetime.utcnow()
     
-    # Insert user into database
-    result = await db.get_collection("users").insert_one(user_dict)
-    created_user = await db.get_collection("users").find_one({"_id": result.inserted_id})
+    # Insert user unless the username is already registered
+    created_user = await insert_if_absent(db.get_collection("users"), {"name": user.name}, user_dict)
+    if not created_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username already registered"
+        )
     
-    # Convert ObjectId to string for JSON serialization
-    created_user["id"] = str(created_user.pop("_id"))
-    created_user["createdAt"] = created_user["createdAt"].isoformat()
-    created_user["updatedAt"] = created_user["updatedAt"].isoformat()
+    # Authorization reads assignments from the devices, so mirror them there
+    if user.assignedDevices:
+        await db.get_collection("devices").update_many(
+            {"deviceId": {"$in": user.assignedDevices}},
+            {"$addToSet": {"assignedUsers": user.name}}
+        )
     
-    return created_user
+    return user_codec.response(created_user)
 
 @router.post("/login", response_model=Token)
 async def login(username: str = Body(...), password: str = Body(...), db = Depends(get_database)):
@@ -64,7 +57,7 @@ async def login(username: str = Body(...), password: str = Body(...), db = Depen
         )
     
     # Verify password
-    if not verify_password(password, user["password"]):
+    if not await verify_password_async(password, user["password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -86,37 +79,21 @@ async def read_users_me(current_user: Dict = Depends(get_current_user), db = Dep
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Prepare response
-    user_response = {
-        "id": str(user["_id"]),
-        "name": user["name"],
-        "role": user["role"],
-        "assignedDevices": user.get("assignedDevices", []),
-        "createdAt": user["createdAt"].isoformat(),
-        "updatedAt": user["updatedAt"].isoformat()
-    }
-    
-    return user_response
+    return user_codec.response(user)
 
 @router.put("/profile", response_model=UserResponse)
 async def update_profile(profile_update: UserProfileUpdate, current_user: Dict = Depends(get_current_user), db = Depends(get_database)):
     """Update current user's profile"""
     from datetime import datetime
     
-    # Get current user from database
-    user = await db.get_collection("users").find_one({"name": current_user["sub"]})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Prepare update data
     update_data = {}
     
-    if profile_update.name is not None:
+    if profile_update.name is not None and profile_update.name != current_user["sub"]:
         # Check if new username is already taken by another user
-        existing_user = await db.get_collection("users").find_one({
-            "name": profile_update.name,
-            "_id": {"$ne": user["_id"]}
-        })
+        existing_user = await db.get_collection("users").find_one(
+            {"name": profile_update.name}, projection={"_id": 1}
+        )
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -126,28 +103,34 @@ async def update_profile(profile_update: UserProfileUpdate, current_user: Dict =
     
     if profile_update.password is not None:
         # Hash the new password
-        update_data["password"] = get_password_hash(profile_update.password)
+        update_data["password"] = await hash_password_async(profile_update.password)
     
     if update_data:
         update_data["updatedAt"] = datetime.utcnow()
         
-        # Update user in database
-        await db.get_collection("users").update_one(
-            {"name": current_user["sub"]}, 
-            {"$set": update_data}
-        )
-    
-    # Get updated user
-    updated_user = await db.get_collection("users").find_one({"name": profile_update.name or current_user["sub"]})
+        # Update user and fetch the result in one round trip
+        try:
+            updated_user = await update_and_return(
+                db.get_collection("users"),
+                {"name": current_user["sub"]},
+                {"$set": update_data}
+            )
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username already taken"
+            )
+        
+        # Authorization reads assignments from the devices, so carry the rename there
+        if updated_user and "name" in update_data:
+            await db.get_collection("devices").update_many(
+                {"assignedUsers": current_user["sub"]},
+                {"$set": {"assignedUsers.$": update_data["name"]}}
+            )
+    else:
+        updated_user = await db.get_collection("users").find_one({"name": current_user["sub"]})
     
-    # Prepare response
-    user_response = {
-        "id": str(updated_user["_id"]),
-        "name": updated_user["name"],
-        "role": updated_user["role"],
-        "assignedDevices": updated_user.get("assignedDevices", []),
-        "createdAt": updated_user["createdAt"].isoformat(),
-        "updatedAt": updated_user["updatedAt"].isoformat()
-    }
+    if not updated_user:
+        raise HTTPException(status_code=404, detail="User not found")
     
-    return user_response
\ No newline at end of file
+    return user_codec.response(updated_user)
@@ -1,49 +1,86 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
 from datetime import datetime
 
 from config.database import get_database
 from src.models.checklist import ChecklistCreate, ChecklistUpdate, ChecklistResponse
 from src.auth import get_current_user, require_role
+from src.crud import insert_if_absent, set_and_return_both
+from src.serialization import checklist_codec
+from src.pagination import fetch_page, NEXT_CURSOR_HEADER
+from src.events import publish_checklist_updated
+from src.readiness import apply_item_change
+from src.checklist_graph import checklist_graph
 
 router = APIRouter(prefix="", tags=["checklist"])
 
+CHECKLIST_SORT = [("taskId", 1)]
+
+async def validate_dependencies(db, task_id: str, dependencies: List[str]):
+    """Reject dependencies on unknown tasks or ones that would form a cycle"""
+    known = set(await db.get_collection("checklist").distinct("taskId", {"taskId": {"$in": dependencies}}))
+    unknown = [dependency for dependency in dependencies if dependency not in known]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown tasks in dependencies: {', '.join(unknown)}")
+    await checklist_graph.ensure_loaded(db)
+    if checklist_graph.depends_on(dependencies, task_id):
+        raise HTTPException(status_code=400, detail="Task dependencies would form a cycle")
+
 @router.post("/", response_model=ChecklistResponse, status_code=status.HTTP_201_CREATED)
 async def create_checklist_item(item: ChecklistCreate, db = Depends(get_database), current_user: dict = Depends(require_role("Admin"))):
-    # Check if item with same taskId already exists
-    existing_item = await db.get_collection("checklist").find_one({"taskId": item.taskId})
-    if existing_item:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Checklist item with this ID already exists"
-        )
+    if item.dependencies:
+        await validate_dependencies(db, item.taskId, item.dependencies)
     
     # Create item document
     item_dict = item.dict()
+    item_dict["completed"] = False
+    item_dict["createdAt"] = datetime.utcnow()
+    item_dict["updatedAt"] = item_dict["createdAt"]
     
-    # Insert item into database
-    result = await db.get_collection("checklist").insert_one(item_dict)
-    created_item = await db.get_collection("checklist").find_one({"_id": result.inserted_id})
-    
-    # Convert ObjectId to string for JSON serialization
-    created_item["id"] = str(created_item.pop("_id"))
-    created_item["createdAt"] = created_item["createdAt"].isoformat()
-    created_item["updatedAt"] = created_item["updatedAt"].isoformat()
+    # Insert item unless one with the same taskId already exists
+    created_item = await insert_if_absent(
+        db.get_collection("checklist"), {"taskId": item.taskId}, item_dict
+    )
+    if not created_item:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Checklist item with this ID already exists"
+        )
+    await apply_item_change(db, None, created_item)
+    checklist_graph.apply_item_change(None, created_item)
     
-    return created_item
+    return checklist_codec.response(created_item, status_code=status.HTTP_201_CREATED)
 
 @router.get("/", response_model=List[ChecklistResponse])
-async def read_checklist_items(skip: int = 0, limit: int = 100, db = Depends(get_database), current_user: dict = Depends(get_current_user)):
-    items_cursor = db.get_collection("checklist").find().skip(skip).limit(limit)
-    items = []
-    async for item in items_cursor:
-        item["id"] = str(item.pop("_id"))
-        item["createdAt"] = item["createdAt"].isoformat()
-        item["updatedAt"] = item["updatedAt"].isoformat()
-        items.append(item)
-    
-    return items
+async def read_checklist_items(
+    skip: int = 0,
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    db = Depends(get_database),
+    current_user: dict = Depends(get_current_user)
+):
+    items, next_cursor = await fetch_page(
+        db.get_collection("checklist"), {}, CHECKLIST_SORT, limit, cursor=cursor, skip=skip
+    )
+    response = checklist_codec.list_response(items)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
+
+@router.get("/next", response_model=List[ChecklistResponse])
+async def read_next_checklist_items(
+    limit: int = Query(10, ge=1),
+    db = Depends(get_database),
+    current_user: dict = Depends(get_current_user)
+):
+    """Incomplete tasks whose dependencies are all completed, highest priority first"""
+    await checklist_graph.ensure_loaded(db)
+    task_ids = checklist_graph.next_actionable(limit)
+    items = await db.get_collection("checklist").find({"taskId": {"$in": task_ids}}).to_list(length=None)
+    position = {task_id: index for index, task_id in enumerate(task_ids)}
+    items.sort(key=lambda item: position[item["taskId"]])
+    return checklist_codec.list_response(items)
 
 @router.get("/{task_id}", response_model=ChecklistResponse)
 async def read_checklist_item(task_id: str, db = Depends(get_database), current_user: dict = Depends(get_current_user)):
@@ -51,19 +88,10 @@ async def read_checklist_item(task_id: str, db = Depends(get_database), current_
     if not item:
         raise HTTPException(status_code=404, detail="Checklist item not found")
     
-    item["id"] = str(item.pop("_id"))
-    item["createdAt"] = item["createdAt"].isoformat()
-    item["updatedAt"] = item["updatedAt"].isoformat()
-    
-    return item
+    return checklist_codec.response(item)
 
 @router.put("/{task_id}", response_model=ChecklistResponse)
 async def update_checklist_item(task_id: str, item_update: ChecklistUpdate, db = Depends(get_database), current_user: dict = Depends(get_current_user)):
-    # Get existing item
-    existing_item = await db.get_collection("checklist").find_one({"taskId": task_id})
-    if not existing_item:
-        raise HTTPException(status_code=404, detail="Checklist item not found")
-    
     # Prepare update data
     update_data = item_update.dict(exclude_unset=True)
     if update_data:
@@ -71,30 +99,41 @@ async def update_checklist_item(task_id: str, item_update: ChecklistUpdate, db =
         
         # If completed status is being updated
         if "completed" in update_data and update_data["completed"]:
+            # Tasks must be completed after everything they depend on
+            await checklist_graph.ensure_loaded(db)
+            unmet = checklist_graph.unmet_dependencies(task_id)
+            if unmet:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail={"message": "Cannot complete task before its dependencies", "blockedBy": unmet}
+                )
             update_data["completedBy"] = current_user["sub"]
             update_data["completedAt"] = datetime.utcnow()
         
-        # Update item in database
-        await db.get_collection("checklist").update_one(
-            {"taskId": task_id}, {"$set": update_data}
+        # Update item in one round trip; the previous version is returned too
+        # so the readiness aggregate can be adjusted by the difference
+        previous_item, updated_item = await set_and_return_both(
+            db.get_collection("checklist"), {"taskId": task_id}, update_data
         )
+        if updated_item:
+            await apply_item_change(db, previous_item, updated_item)
+            checklist_graph.apply_item_change(previous_item, updated_item)
+            publish_checklist_updated(checklist_codec.to_dict(updated_item))
+    else:
+        updated_item = await db.get_collection("checklist").find_one({"taskId": task_id})
     
-    # Get updated item
-    updated_item = await db.get_collection("checklist").find_one({"taskId": task_id})
-    updated_item["id"] = str(updated_item.pop("_id"))
-    updated_item["createdAt"] = updated_item["createdAt"].isoformat()
-    updated_item["updatedAt"] = updated_item["updatedAt"].isoformat()
+    if not updated_item:
+        raise HTTPException(status_code=404, detail="Checklist item not found")
     
-    return updated_item
+    return checklist_codec.response(updated_item)
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_checklist_item(task_id: str, db = Depends(get_database), current_user: dict = Depends(require_role("Admin"))):
-    # Check if item exists
-    existing_item = await db.get_collection("checklist").find_one({"taskId": task_id})
-    if not existing_item:
+    # Delete item, getting it back to know what it contributed to readiness
+    deleted_item = await db.get_collection("checklist").find_one_and_delete({"taskId": task_id})
+    if not deleted_item:
         raise HTTPException(status_code=404, detail="Checklist item not found")
-    
-    # Delete item
-    await db.get_collection("checklist").delete_one({"taskId": task_id})
+    await apply_item_change(db, deleted_item, None)
+    checklist_graph.apply_item_change(deleted_item, None)
     
     return None
\ No newline at end of file
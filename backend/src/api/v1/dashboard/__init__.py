@@ -0,0 +1 @@
+# Dashboard API module
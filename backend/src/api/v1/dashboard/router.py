@@ -0,0 +1,119 @@
+from fastapi import APIRouter, Depends, Query, Response
+from typing import Dict, List
+
+from config.database import get_database
+from src.auth import get_current_user
+from src.serialization import dumps, shutdown_log_codec
+from src.log_storage import SHUTDOWN_LOGS, from_stored, log_query
+
+router = APIRouter(prefix="", tags=["dashboard"])
+
+DEVICE_CARD_FIELDS = {
+    "_id": 0,
+    "deviceId": 1,
+    "name": 1,
+    "status": 1,
+    "location": 1,
+    "lastStartup": 1,
+    "lastShutdown": 1,
+}
+
+def classify_system_health(online: int, total: int) -> Dict:
+    """Classify overall health from the share of devices powered on"""
+    if total == 0:
+        return {"status": "unknown", "message": "No devices available"}
+    percentage = online / total * 100
+    if percentage == 0:
+        return {"status": "shutdown", "message": "All systems offline"}
+    if percentage < 50:
+        return {"status": "warning", "message": "Partial system shutdown"}
+    return {"status": "operational", "message": "Systems operational"}
+
+def _percentage(part: int, whole: int) -> int:
+    return round(part / whole * 100) if whole else 0
+
+@router.get("/summary")
+async def get_dashboard_summary(
+    logs_limit: int = Query(5, ge=0, le=50),
+    include_devices: bool = True,
+    db = Depends(get_database),
+    current_user: Dict = Depends(get_current_user)
+):
+    """Precomputed dashboard data scoped to the caller's devices"""
+    device_match = {}
+    log_match = {}
+    if current_user.get("role") != "Admin":
+        assigned_devices: List[str] = await db.get_collection("devices").distinct(
+            "deviceId", {"assignedUsers": current_user["sub"]}
+        )
+        device_match = {"deviceId": {"$in": assigned_devices}}
+        log_match = log_query({"device": {"$in": assigned_devices}})
+
+    facets = {
+        "statusCounts": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+    }
+    if include_devices:
+        facets["devices"] = [{"$sort": {"deviceId": 1}}, {"$project": DEVICE_CARD_FIELDS}]
+
+    pipeline = [
+        {"$match": device_match},
+        {"$facet": facets},
+        # $facet always emits one document, so these lookups run exactly once
+        {"$lookup": {
+            "from": "checklist",
+            "pipeline": [{"$group": {
+                "_id": None,
+                "total": {"$sum": 1},
+                "completed": {"$sum": {"$cond": [{"$eq": ["$completed", True]}, 1, 0]}},
+                "critical": {"$sum": {"$cond": [{"$eq": ["$isCritical", True]}, 1, 0]}},
+                "criticalCompleted": {"$sum": {"$cond": [
+                    {"$and": [{"$eq": ["$isCritical", True]}, {"$eq": ["$completed", True]}]}, 1, 0
+                ]}},
+            }}],
+            "as": "checklist",
+        }},
+        {"$lookup": {
+            "from": SHUTDOWN_LOGS,
+            "pipeline": [
+                {"$match": log_match},
+                {"$sort": {"timestamp": -1, "_id": -1}},
+                {"$limit": logs_limit or 1},
+            ],
+            "as": "recentLogs",
+        }},
+    ]
+    results = await db.get_collection("devices").aggregate(pipeline).to_list(length=1)
+    result = results[0]
+
+    status_counts = {"on": 0, "off": 0, "maintenance": 0}
+    for row in result["statusCounts"]:
+        status_counts[row["_id"] or "unknown"] = row["count"]
+    total_devices = sum(status_counts.values())
+
+    checklist = result["checklist"][0] if result["checklist"] else {}
+    total_items = checklist.get("total", 0)
+    completed_items = checklist.get("completed", 0)
+    critical_items = checklist.get("critical", 0)
+    critical_completed = checklist.get("criticalCompleted", 0)
+
+    summary = {
+        "devices": {
+            "total": total_devices,
+            "byStatus": status_counts,
+        },
+        "systemHealth": classify_system_health(status_counts["on"], total_devices),
+        "checklist": {
+            "total": total_items,
+            "completed": completed_items,
+            "critical": critical_items,
+            "criticalCompleted": critical_completed,
+            "completionPercentage": _percentage(completed_items, total_items),
+            "criticalCompletionPercentage": _percentage(critical_completed, critical_items),
+            "readyForShutdown": critical_completed == critical_items,
+        },
+        "recentLogs": [shutdown_log_codec.to_dict(from_stored(log)) for log in result["recentLogs"][:logs_limit]],
+    }
+    if include_devices:
+        summary["deviceList"] = result["devices"]
+
+    return Response(content=dumps(summary), media_type="application/json")
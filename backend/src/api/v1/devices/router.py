@@ -1,58 +1,106 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from typing import Dict, List, Optional
 from datetime import datetime
-import asyncio
 
 from config.database import get_database
+from config.settings import settings
 from src.models.device import DeviceCreate, DeviceUpdate, DeviceResponse
 from src.auth import get_current_user, require_role
+from src.crud import insert_if_absent, update_and_return
+from src.serialization import device_codec, job_codec
+from src.pagination import fetch_page, NEXT_CURSOR_HEADER
+from src.events import publish_device_status, publish_device_updated, publish_startup_wave
+from src.jobs import job_manager, job_handler
+from src.power import PowerError, power_manager
+from src.power.sequencer import plan_waves, run_waves
+from src.power.dependencies import DependencyCycleError, dependency_graph, plan_dependency_waves
 
 router = APIRouter(prefix="", tags=["devices"])
 
+DEVICE_SORT = [("deviceId", 1)]
+
+async def validate_shutdown_dependencies(db, device_id: str, shutdown_after: List[str]):
+    """Reject dependencies on unknown devices or ones that would form a cycle"""
+    if device_id in shutdown_after:
+        raise HTTPException(status_code=400, detail="A device cannot depend on itself")
+    known = set(await db.get_collection("devices").distinct("deviceId", {"deviceId": {"$in": shutdown_after}}))
+    unknown = [dependency for dependency in shutdown_after if dependency not in known]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown devices in shutdownAfter: {', '.join(unknown)}")
+    
+    # Check the whole dependency graph as it would be after this change
+    cursor = db.get_collection("devices").find(
+        {"shutdownAfter.0": {"$exists": True}}, projection={"deviceId": 1, "shutdownAfter": 1}
+    )
+    devices = {device["deviceId"]: device async for device in cursor}
+    devices[device_id] = {"deviceId": device_id, "shutdownAfter": shutdown_after}
+    graph_ids = set(devices) | {dependency for device in devices.values() for dependency in device["shutdownAfter"]}
+    try:
+        plan_dependency_waves(dependency_graph(graph_ids, devices))
+    except DependencyCycleError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/", response_model=DeviceResponse, status_code=status.HTTP_201_CREATED)
 async def create_device(device: DeviceCreate, db = Depends(get_database), current_user: dict = Depends(require_role("Admin"))):
-    # Check if device with same deviceId already exists
-    existing_device = await db.get_collection("devices").find_one({"deviceId": device.deviceId})
-    if existing_device:
+    # Create device document
+    if device.shutdownAfter:
+        await validate_shutdown_dependencies(db, device.deviceId, device.shutdownAfter)
+    
+    device_dict = device.dict()
+    # Users may have been assigned this deviceId before it existed
+    device_dict["assignedUsers"] = await db.get_collection("users").distinct(
+        "name", {"assignedDevices": device.deviceId}
+    )
+    device_dict["createdAt"] = datetime.utcnow()
+    device_dict["updatedAt"] = device_dict["createdAt"]
+    
+    # Insert device unless one with the same deviceId already exists
+    created_device = await insert_if_absent(
+        db.get_collection("devices"), {"deviceId": device.deviceId}, device_dict
+    )
+    if not created_device:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Device with this ID already exists"
         )
     
-    # Create device document
-    device_dict = device.dict()
-    
-    # Insert device into database
-    result = await db.get_collection("devices").insert_one(device_dict)
-    created_device = await db.get_collection("devices").find_one({"_id": result.inserted_id})
-    
-    # Convert ObjectId to string for JSON serialization
-    created_device["id"] = str(created_device.pop("_id"))
-    created_device["createdAt"] = created_device["createdAt"].isoformat()
-    created_device["updatedAt"] = created_device["updatedAt"].isoformat()
-    if created_device.get("lastShutdown"):
-        created_device["lastShutdown"] = created_device["lastShutdown"].isoformat()
-    if created_device.get("lastStartup"):
-        created_device["lastStartup"] = created_device["lastStartup"].isoformat()
-    
-    return created_device
+    return device_codec.response(created_device, status_code=status.HTTP_201_CREATED)
 
 @router.get("/", response_model=List[DeviceResponse])
-async def read_devices(skip: int = 0, limit: int = 100, db = Depends(get_database), current_user: dict = Depends(get_current_user)):
-    devices_cursor = db.get_collection("devices").find().skip(skip).limit(limit)
-    devices = []
-    async for device in devices_cursor:
-        device["id"] = str(device.pop("_id"))
-        device["createdAt"] = device["createdAt"].isoformat()
-        device["updatedAt"] = device["updatedAt"].isoformat()
-        if device.get("lastShutdown"):
-            device["lastShutdown"] = device["lastShutdown"].isoformat()
-        if device.get("lastStartup"):
-            device["lastStartup"] = device["lastStartup"].isoformat()
-        devices.append(device)
-    
-    return devices
+async def read_devices(
+    skip: int = 0,
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    db = Depends(get_database),
+    current_user: dict = Depends(get_current_user)
+):
+    # Keyset pagination on the unique deviceId index; the next page's cursor
+    # is returned in the X-Next-Cursor header
+    devices, next_cursor = await fetch_page(
+        db.get_collection("devices"), {}, DEVICE_SORT, limit, cursor=cursor, skip=skip
+    )
+    response = device_codec.list_response(devices)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
+
+@router.get("/mine", response_model=List[DeviceResponse])
+async def read_my_devices(
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    db = Depends(get_database),
+    current_user: dict = Depends(get_current_user)
+):
+    """Devices assigned to the caller, paged like GET /devices"""
+    devices, next_cursor = await fetch_page(
+        db.get_collection("devices"), {"assignedUsers": current_user["sub"]}, DEVICE_SORT, limit, cursor=cursor
+    )
+    response = device_codec.list_response(devices)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
 
 @router.get("/{device_id}", response_model=DeviceResponse)
 async def read_device(device_id: str, db = Depends(get_database), current_user: dict = Depends(get_current_user)):
@@ -60,46 +108,32 @@ async def read_device(device_id: str, db = Depends(get_database), current_user:
     if not device:
         raise HTTPException(status_code=404, detail="Device not found")
     
-    device["id"] = str(device.pop("_id"))
-    device["createdAt"] = device["createdAt"].isoformat()
-    device["updatedAt"] = device["updatedAt"].isoformat()
-    if device.get("lastShutdown"):
-        device["lastShutdown"] = device["lastShutdown"].isoformat()
-    if device.get("lastStartup"):
-        device["lastStartup"] = device["lastStartup"].isoformat()
-    
-    return device
+    return device_codec.response(device)
 
 @router.put("/{device_id}", response_model=DeviceResponse)
 async def update_device(device_id: str, device_update: DeviceUpdate, db = Depends(get_database), current_user: dict = Depends(require_role("Admin"))):
-    # Get existing device
-    existing_device = await db.get_collection("devices").find_one({"deviceId": device_id})
-    if not existing_device:
-        raise HTTPException(status_code=404, detail="Device not found")
-    
     # Prepare update data
     update_data = device_update.dict(exclude_unset=True)
+    if update_data.get("shutdownAfter"):
+        await validate_shutdown_dependencies(db, device_id, update_data["shutdownAfter"])
     if update_data:
         update_data["updatedAt"] = datetime.utcnow()
         
-        # Update device in database
-        await db.get_collection("devices").update_one(
-            {"deviceId": device_id}, {"$set": update_data}
+        # Update device and fetch the result in one round trip
+        updated_device = await update_and_return(
+            db.get_collection("devices"), {"deviceId": device_id}, {"$set": update_data}
         )
+        if updated_device:
+            publish_device_updated(device_codec.to_dict(updated_device))
+    else:
+        updated_device = await db.get_collection("devices").find_one({"deviceId": device_id})
     
-    # Get updated device
-    updated_device = await db.get_collection("devices").find_one({"deviceId": device_id})
-    updated_device["id"] = str(updated_device.pop("_id"))
-    updated_device["createdAt"] = updated_device["createdAt"].isoformat()
-    updated_device["updatedAt"] = updated_device["updatedAt"].isoformat()
-    if updated_device.get("lastShutdown"):
-        updated_device["lastShutdown"] = updated_device["lastShutdown"].isoformat()
-    if updated_device.get("lastStartup"):
-        updated_device["lastStartup"] = updated_device["lastStartup"].isoformat()
-    
-    return updated_device
+    if not updated_device:
+        raise HTTPException(status_code=404, detail="Device not found")
+    
+    return device_codec.response(updated_device)
 
-@router.post("/start/{device_id}")
+@router.post("/start/{device_id}", status_code=status.HTTP_202_ACCEPTED)
 async def start_device(device_id: str, db = Depends(get_database), current_user: dict = Depends(require_role("Admin"))):
     """Start/power on a device. Admin only."""
     # Get existing device
@@ -114,53 +148,99 @@ async def start_device(device_id: str, db = Depends(get_database), current_user:
             detail="Device is already powered on"
         )
     
-    # Simulate startup process (3 second delay)
-    await asyncio.sleep(3)
-    
-    # Update device status to "on"
-    await db.get_collection("devices").update_one(
-        {"deviceId": device_id}, 
-        {"$set": {"status": "on", "lastStartup": datetime.utcnow(), "updatedAt": datetime.utcnow()}}
-    )
-    
-    return {
-        "status": "success",
-        "message": f"Device {device_id} started successfully",
-        "deviceId": device_id,
-        "newStatus": "on"
-    }
+    # The power operation runs as a background job; poll /shutdown/jobs/{jobId}
+    job = await job_manager.submit("startup", {"deviceIds": [device_id]}, current_user["sub"])
+    return job_codec.response(job, status_code=status.HTTP_202_ACCEPTED)
 
-@router.post("/start-all")
+@router.post("/start-all", status_code=status.HTTP_202_ACCEPTED)
 async def start_all_devices(db = Depends(get_database), current_user: dict = Depends(require_role("Admin"))):
     """Start all devices that are currently off. Admin only."""
     # Get all devices that are off or in maintenance
-    off_devices_cursor = db.get_collection("devices").find({"status": {"$in": ["off", "maintenance"]}})
-    off_devices = []
-    async for device in off_devices_cursor:
-        off_devices.append(device)
+    off_devices_cursor = db.get_collection("devices").find(
+        {"status": {"$in": ["off", "maintenance"]}}, projection={"deviceId": 1}
+    )
+    device_ids = [device["deviceId"] async for device in off_devices_cursor]
     
-    if not off_devices:
-        return {
+    if not device_ids:
+        return JSONResponse({
             "status": "info",
             "message": "All devices are already powered on",
             "devicesStarted": 0
-        }
-    
-    # Simulate startup process for all devices (5 second delay)
-    await asyncio.sleep(5)
+        })
     
-    # Update all off devices to "on" status
-    device_ids = [device["deviceId"] for device in off_devices]
-    await db.get_collection("devices").update_many(
+    job = await job_manager.submit("startup", {"deviceIds": device_ids}, current_user["sub"])
+    return job_codec.response(job, status_code=status.HTTP_202_ACCEPTED)
+
+@job_handler("startup")
+async def run_startup_job(db, job: Dict, context) -> Dict:
+    device_ids = job["params"]["deviceIds"]
+    devices = await db.get_collection("devices").find(
         {"deviceId": {"$in": device_ids}},
-        {"$set": {"status": "on", "lastStartup": datetime.utcnow(), "updatedAt": datetime.utcnow()}}
+        projection={"deviceId": 1, "type": 1, "power": 1, "location": 1, "power_consumption": 1}
+    ).to_list(length=None)
+    
+    # Stagger power-on in waves that keep each circuit within its wattage budget
+    plan = plan_waves(
+        devices, settings.POWER_ON_BUDGET_WATTS, settings.POWER_ON_DEFAULT_WATTS, settings.power_on_circuit_budgets
     )
+    waves_finished = {circuit: 0 for circuit in plan}
+    
+    durations: Dict[str, float] = {}
+    failed_devices: List[Dict] = []
     
+    async def report_progress():
+        await context.progress(
+            len(durations) + len(failed_devices), len(devices),
+            waves={
+                circuit: {"completed": waves_finished[circuit], "total": len(waves)}
+                for circuit, waves in plan.items()
+            }
+        )
+    
+    async def wave_finished(circuit: str, number: int, count: int, wave: List[Dict]):
+        waves_finished[circuit] = number
+        publish_startup_wave(job["jobId"], circuit, number, count, [device["deviceId"] for device in wave])
+        await report_progress()
+    
+    async def start(device: Dict):
+        device_id = device["deviceId"]
+        try:
+            duration = await power_manager.power_on(device)
+        except PowerError as e:
+            failed_devices.append({"deviceId": device_id, "error": str(e)})
+        else:
+            # Update each device to "on" as soon as it is up
+            started_at = datetime.utcnow()
+            await db.get_collection("devices").update_one(
+                {"deviceId": device_id},
+                {"$set": {"status": "on", "lastStartup": started_at, "updatedAt": started_at}}
+            )
+            publish_device_status(device_id, "on", lastStartup=started_at)
+            durations[device_id] = round(duration, 2)
+        await report_progress()
+    
+    await report_progress()
+    await run_waves(plan, start, wave_finished)
+    
+    started_devices = [device_id for device_id in device_ids if device_id in durations]
+    if len(device_ids) == 1:
+        if not started_devices:
+            raise PowerError(failed_devices[0]["error"] if failed_devices else "Device not found")
+        message = f"Device {device_ids[0]} started successfully"
+    else:
+        message = f"Successfully started {len(started_devices)} devices"
+        if failed_devices:
+            message += f", {len(failed_devices)} failed"
     return {
-        "status": "success",
-        "message": f"Successfully started {len(off_devices)} devices",
-        "devicesStarted": len(off_devices),
-        "startedDevices": device_ids
+        "message": message,
+        "devicesStarted": len(started_devices),
+        "startedDevices": started_devices,
+        "durations": durations,
+        "failedDevices": failed_devices,
+        "waves": {
+            circuit: [[device["deviceId"] for device in wave] for wave in waves]
+            for circuit, waves in plan.items()
+        }
     }
 
 @router.delete("/{device_id}", status_code=status.HTTP_204_NO_CONTENT)
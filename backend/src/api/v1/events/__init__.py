@@ -0,0 +1 @@
+# Events API module
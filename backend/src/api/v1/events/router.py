@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
+from typing import Dict, List, Optional
+import asyncio
+
+from config.database import get_database
+from config.settings import settings
+from src.auth.jwt import verify_token
+from src.events import event_hub, format_sse
+
+router = APIRouter(prefix="", tags=["events"])
+
+# EventSource cannot send an Authorization header, so the stream also
+# accepts the access token as a query parameter
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login", auto_error=False)
+
+def get_stream_user(token: Optional[str] = None, header_token: Optional[str] = Depends(optional_oauth2_scheme)) -> Dict:
+    token = header_token or token
+    payload = verify_token(token) if token else None
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+async def _event_stream(request: Request, subscription):
+    # Tell the browser how long to wait before reconnecting
+    yield b"retry: 3000\n\n"
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=settings.EVENT_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield b": keep-alive\n\n"
+                continue
+
+            if event is None:
+                break
+            yield format_sse(event)
+
+            if subscription.dropped and subscription.queue.empty():
+                # Events after the overflow were lost; the client must refetch
+                yield b"event: resync\ndata: {}\n\n"
+                break
+    finally:
+        event_hub.unsubscribe(subscription)
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    db = Depends(get_database),
+    current_user: Dict = Depends(get_stream_user)
+):
+    """Server-sent stream of device status and checklist changes"""
+    device_ids: Optional[List[str]] = None
+    if current_user.get("role") != "Admin":
+        device_ids = await db.get_collection("devices").distinct(
+            "deviceId", {"assignedUsers": current_user["sub"]}
+        )
+
+    subscription = event_hub.subscribe(device_ids)
+    return StreamingResponse(
+        _event_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
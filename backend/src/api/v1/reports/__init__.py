@@ -0,0 +1 @@
+# Reports API module
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+
+from config.database import get_database
+from src.auth import get_current_user
+from src.api.v1.shutdown_logs.router import parse_log_dates
+from src.reporting import get_shutdown_stats
+
+router = APIRouter(prefix="", tags=["reports"])
+
+@router.get("/stats")
+async def read_shutdown_stats(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    top: int = Query(10, ge=1, le=100),
+    db = Depends(get_database),
+    current_user: dict = Depends(get_current_user)
+):
+    """Shutdown totals, success rate and the most active users and devices, from the rollups"""
+    # Rollup buckets are naive UTC, like the log timestamps
+    start, end = parse_log_dates(start_date, end_date)
+    return await get_shutdown_stats(db, start, end, top)
@@ -1,74 +1,237 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Dict
+from typing import Dict, List
 from datetime import datetime, timedelta
-import asyncio
 
 from config.database import get_database
-from src.models.shutdown import ShutdownCreate
+from src.models.shutdown import ShutdownCreate, BulkShutdownRequest
 from src.auth import get_current_user
+from src.events import publish_device_status
+from src.jobs import job_manager, job_handler
+from src.serialization import job_codec
+from src.readiness import get_readiness
+from src.log_storage import SHUTDOWN_LOGS, from_stored, log_query, write_shutdown_logs
+from src.power import PowerError, power_manager
+from src.power.dependencies import (
+    DependencyCycleError, dependency_graph, outside_predecessors, plan_dependency_waves, run_in_dependency_order
+)
 
 router = APIRouter(prefix="", tags=["shutdown"])
 
+def build_shutdown_log(device_id: str, user: str, log_status: str, reason: str, duration: float = 0) -> Dict:
+    """Build a shutdown log document ready for insertion"""
+    shutdown_log = ShutdownCreate(
+        device=device_id,
+        user=user,
+        userName=user,
+        status=log_status,
+        reason=reason,
+        duration=duration
+    ).dict()
+    
+    now = datetime.utcnow()
+    # Bulk shutdowns log many devices in the same instant, so the device ID
+    # keeps log IDs unique
+    shutdown_log["logId"] = f"log-{now.timestamp()}-{device_id}"
+    shutdown_log["timestamp"] = now
+    return shutdown_log
+
+async def power_off_device(db, device: Dict) -> float:
+    """Power a device off, record its new status and return the measured duration"""
+    duration = await power_manager.power_off(device)
+    
+    # Update device status
+    device_id = device["deviceId"]
+    shutdown_at = datetime.utcnow()
+    await db.get_collection("devices").update_one(
+        {"deviceId": device_id}, 
+        {"$set": {"status": "off", "lastShutdown": shutdown_at, "updatedAt": shutdown_at}}
+    )
+    publish_device_status(device_id, "off", lastShutdown=shutdown_at)
+    return round(duration, 2)
+
+async def all_devices_off(db) -> bool:
+    """Check if all devices are now powered off"""
+    # Existence check answered from the status index, whatever the fleet
+    # size; devices without a status count as on
+    device_on = await db.get_collection("devices").find_one(
+        {"status": {"$in": ["on", None]}}, projection={"_id": 1}
+    )
+    return device_on is None
+
+async def dependencies_still_on(db, device_ids, devices: Dict[str, Dict]) -> Dict[str, List[str]]:
+    """Map each device to the predecessors outside ``device_ids`` that are still on"""
+    outside = outside_predecessors(device_ids, devices)
+    if not outside:
+        return {}
+    # Devices without a status count as on; deleted devices hold nothing up
+    still_on = set(await db.get_collection("devices").distinct(
+        "deviceId",
+        {"deviceId": {"$in": sorted(set().union(*outside.values()))}, "status": {"$in": ["on", None]}}
+    ))
+    return {
+        device_id: sorted(predecessors & still_on)
+        for device_id, predecessors in outside.items() if predecessors & still_on
+    }
+
 @router.post("/validate-checklist")
 async def validate_checklist(db = Depends(get_database), current_user: dict = Depends(get_current_user)):
-    # Get all critical checklist items
-    critical_items_cursor = db.get_collection("checklist").find({"isCritical": True})
-    critical_items = []
-    async for item in critical_items_cursor:
-        critical_items.append(item)
+    # Counts and incomplete task IDs are maintained by the checklist router
+    readiness = await get_readiness(db)
+    incomplete_ids = readiness["incompleteTaskIds"]
     
-    # Check if any critical items are not completed
-    incomplete_items = [item for item in critical_items if not item.get("completed", False)]
-    
-    if incomplete_items:
+    if incomplete_ids:
+        # Descriptions are only needed when shutdown is being refused
+        incomplete_cursor = db.get_collection("checklist").find(
+            {"taskId": {"$in": incomplete_ids}}, projection={"_id": 0, "taskId": 1, "description": 1}
+        ).sort("taskId", 1)
         return {
             "allCompleted": False,
-            "totalCriticalItems": len(critical_items),
-            "completedItems": len(critical_items) - len(incomplete_items),
+            "totalCriticalItems": readiness["criticalTotal"],
+            "completedItems": readiness["criticalCompleted"],
             "incompleteItems": [
                 {
                     "taskId": item["taskId"],
                     "description": item["description"]
-                } for item in incomplete_items
+                } async for item in incomplete_cursor
             ]
         }
     
     return {
         "allCompleted": True,
-        "totalCriticalItems": len(critical_items),
-        "completedItems": len(critical_items),
+        "totalCriticalItems": readiness["criticalTotal"],
+        "completedItems": readiness["criticalCompleted"],
         "incompleteItems": []
     }
 
-@router.post("/initiate/{device_id}")
+@router.post("/initiate/{device_id}", status_code=status.HTTP_202_ACCEPTED)
 async def initiate_shutdown(device_id: str, db = Depends(get_database), current_user: dict = Depends(get_current_user)):
     # Verify the user has access to this device
-    user_devices = await db.get_collection("users").find_one(
-        {"name": current_user["sub"], "assignedDevices": {"$in": [device_id]}}
+    assigned_device = await db.get_collection("devices").find_one(
+        {"deviceId": device_id, "assignedUsers": current_user["sub"]}, projection={"deviceId": 1, "shutdownAfter": 1}
     )
-    if not user_devices:
+    if not assigned_device:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have permission to shutdown this device"
         )
     
+    # Devices this one must wait for have to be off already
+    blocking = await dependencies_still_on(db, [device_id], {device_id: assigned_device})
+    if blocking:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Cannot shutdown: devices it depends on are still on",
+                "devices": blocking[device_id]
+            }
+        )
+    
     # Validate checklist before shutdown
     validation_result = await validate_checklist(db, current_user)
     if not validation_result["allCompleted"]:
         # Create failed shutdown log
-        shutdown_log = ShutdownCreate(
-            device=device_id,
-            user=current_user["sub"],
-            userName=current_user["sub"],
-            status="failed",
-            reason="Critical checklist items not completed"
-        ).dict()
-        
-        shutdown_log["logId"] = f"log-{datetime.utcnow().timestamp()}"
-        shutdown_log["timestamp"] = datetime.utcnow()
+        shutdown_log = build_shutdown_log(
+            device_id, current_user["sub"], "failed", "Critical checklist items not completed"
+        )
+        await write_shutdown_logs(db, shutdown_log)
         
-        await db.get_collection("shutdownLogs").insert_one(shutdown_log)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "message": "Cannot shutdown: critical checklist items incomplete",
+                "incompleteItems": validation_result["incompleteItems"]
+            }
+        )
+    
+    # The power operation runs as a background job; poll /jobs/{jobId}
+    job = await job_manager.submit("shutdown", {"deviceId": device_id}, current_user["sub"])
+    return job_codec.response(job, status_code=status.HTTP_202_ACCEPTED)
+
+@job_handler("shutdown")
+async def run_shutdown_job(db, job: Dict, context) -> Dict:
+    device_id = job["params"]["deviceId"]
+    await context.progress(0, 1)
+    
+    device = await db.get_collection("devices").find_one({"deviceId": device_id})
+    if not device:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Device not found")
+    
+    # A dependency may have been powered on since the request was validated
+    blocking = await dependencies_still_on(db, [device_id], {device_id: device})
+    if blocking:
+        reason = f"Skipped: dependency {blocking[device_id][0]} still on"
+        await write_shutdown_logs(db, build_shutdown_log(device_id, job["user"], "failed", reason))
+        raise PowerError(reason)
+    
+    try:
+        duration = await power_off_device(db, device)
+    except PowerError as e:
+        failed_log = build_shutdown_log(device_id, job["user"], "failed", str(e))
+        await write_shutdown_logs(db, failed_log)
+        raise
+    
+    # Create successful shutdown log
+    shutdown_log = build_shutdown_log(device_id, job["user"], "success", "Manual shutdown", duration)
+    await write_shutdown_logs(db, shutdown_log)
+    await context.progress(1, 1)
+    
+    return {
+        "message": f"Device {device_id} shutdown successfully",
+        "deviceId": device_id,
+        "allDevicesOff": await all_devices_off(db)
+    }
+
+@router.post("/bulk", status_code=status.HTTP_202_ACCEPTED)
+async def initiate_bulk_shutdown(request: BulkShutdownRequest, db = Depends(get_database), current_user: dict = Depends(get_current_user)):
+    """Shut down several devices in one job, validating the checklist once"""
+    # Preserve request order but drop duplicates
+    device_ids = list(dict.fromkeys(request.device_ids))
+    
+    # Verify the user has access to every device with a single lookup, which
+    # also fetches the shutdown dependencies between them
+    assigned_cursor = db.get_collection("devices").find(
+        {"deviceId": {"$in": device_ids}, "assignedUsers": current_user["sub"]},
+        projection={"deviceId": 1, "shutdownAfter": 1}
+    )
+    assigned_devices = {device["deviceId"]: device async for device in assigned_cursor}
+    forbidden = [device_id for device_id in device_ids if device_id not in assigned_devices]
+    if forbidden:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={
+                "message": "You don't have permission to shutdown these devices",
+                "devices": forbidden
+            }
+        )
+    
+    try:
+        plan_dependency_waves(dependency_graph(device_ids, assigned_devices))
+    except DependencyCycleError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": str(e), "devices": e.cycle}
+        )
+    
+    # Devices outside the batch that these wait for have to be off already
+    blocking = await dependencies_still_on(db, device_ids, assigned_devices)
+    if blocking:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Cannot shutdown: devices they depend on are still on",
+                "devices": blocking
+            }
+        )
+    
+    # Validate checklist once for the whole batch
+    validation_result = await validate_checklist(db, current_user)
+    if not validation_result["allCompleted"]:
+        failed_logs = [
+            build_shutdown_log(device_id, current_user["sub"], "failed", "Critical checklist items not completed")
+            for device_id in device_ids
+        ]
+        await write_shutdown_logs(db, failed_logs)
         
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -78,44 +241,105 @@ async def initiate_shutdown(device_id: str, db = Depends(get_database), current_
             }
         )
     
-    # Simulate shutdown process (2 second delay)
-    await asyncio.sleep(2)
+    job = await job_manager.submit(
+        "bulk_shutdown",
+        {"deviceIds": device_ids, "reason": request.reason or "Bulk shutdown"},
+        current_user["sub"]
+    )
+    return job_codec.response(job, status_code=status.HTTP_202_ACCEPTED)
+
+@job_handler("bulk_shutdown")
+async def run_bulk_shutdown_job(db, job: Dict, context) -> Dict:
+    device_ids = job["params"]["deviceIds"]
+    reason = job["params"]["reason"]
+    user = job["user"]
     
-    # Update device status
-    await db.get_collection("devices").update_one(
-        {"deviceId": device_id}, 
-        {"$set": {"status": "off", "lastShutdown": datetime.utcnow(), "updatedAt": datetime.utcnow()}}
+    devices_cursor = db.get_collection("devices").find(
+        {"deviceId": {"$in": device_ids}},
+        projection={"deviceId": 1, "status": 1, "type": 1, "power": 1, "shutdownAfter": 1}
     )
+    devices = {device["deviceId"]: device async for device in devices_cursor}
     
-    # Create successful shutdown log
-    shutdown_log = ShutdownCreate(
-        device=device_id,
-        user=current_user["sub"],
-        userName=current_user["sub"],
-        status="success",
-        reason="Manual shutdown"
-    ).dict()
+    # Dependencies may have changed since the request was validated
+    # A cycle fails the job with DependencyCycleError's message
+    predecessors = dependency_graph(device_ids, devices)
+    waves = plan_dependency_waves(predecessors)
+    # Devices outside the batch may have been powered on since as well
+    blocking = await dependencies_still_on(db, device_ids, devices)
+    
+    # Each device starts as soon as the devices it depends on are off;
+    # concurrency is limited per power driver
+    logs_by_device: Dict[str, Dict] = {}
+    await context.progress(0, len(device_ids))
+    
+    async def record(log: Dict):
+        logs_by_device[log["device"]] = log
+        await context.progress(len(logs_by_device), len(device_ids))
     
-    shutdown_log["logId"] = f"log-{datetime.utcnow().timestamp()}"
-    shutdown_log["timestamp"] = datetime.utcnow()
-    shutdown_log["duration"] = 2  # Simulated shutdown duration
+    async def shut_down(device_id: str) -> bool:
+        device = devices.get(device_id)
+        if device_id in blocking:
+            await record(build_shutdown_log(
+                device_id, user, "failed", f"Skipped: dependency {blocking[device_id][0]} still on"
+            ))
+            return False
+        if device is None:
+            await record(build_shutdown_log(device_id, user, "failed", "Device not found"))
+        elif device.get("status", "on") == "off":
+            await record(build_shutdown_log(device_id, user, "failed", "Device is already off"))
+        else:
+            try:
+                duration = await power_off_device(db, device)
+                await record(build_shutdown_log(device_id, user, "success", reason, duration))
+            except Exception as e:
+                await record(build_shutdown_log(device_id, user, "failed", str(e)))
+                return False
+        # Missing or already-off devices cannot hold up their dependents
+        return True
     
-    await db.get_collection("shutdownLogs").insert_one(shutdown_log)
+    async def skip(device_id: str, blocked_by: str):
+        await record(build_shutdown_log(
+            device_id, user, "failed", f"Skipped: dependency {blocked_by} did not shut down"
+        ))
     
-    # Check if all devices are now powered off
-    all_devices_cursor = db.get_collection("devices").find({})
-    all_devices_off = True
-    async for device in all_devices_cursor:
-        if device.get("status", "on") == "on":
-            all_devices_off = False
-            break
+    await run_in_dependency_order(predecessors, shut_down, skip)
+    logs = [logs_by_device[device_id] for device_id in device_ids]
     
+    # The whole batch goes to the write-behind buffer together
+    await write_shutdown_logs(db, logs)
+    
+    results = [
+        {
+            "device_id": log["device"],
+            "status": log["status"],
+            "message": log["reason"],
+            "log_id": log["logId"],
+            "duration": log["duration"]
+        }
+        for log in logs
+    ]
+    successful = sum(1 for log in logs if log["status"] == "success")
     return {
-        "status": "success",
-        "message": f"Device {device_id} shutdown successfully",
-        "allDevicesOff": all_devices_off
+        "results": results,
+        "summary": {
+            "total": len(logs),
+            "successful": successful,
+            "failed": len(logs) - successful
+        },
+        "waves": waves,
+        "allDevicesOff": await all_devices_off(db)
     }
 
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Get the status and progress of a background power job"""
+    job = await job_manager.get(job_id)
+    # Users only see their own jobs; Admins see every job
+    if not job or (current_user.get("role") != "Admin" and job["user"] != current_user["sub"]):
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job_codec.response(job)
+
 @router.get("/status/{device_id}")
 async def get_device_shutdown_status(device_id: str, db = Depends(get_database), current_user: dict = Depends(get_current_user)):
     # Get device status
@@ -124,10 +348,11 @@ async def get_device_shutdown_status(device_id: str, db = Depends(get_database),
         raise HTTPException(status_code=404, detail="Device not found")
     
     # Get last shutdown log for this device
-    last_log = await db.get_collection("shutdownLogs").find_one(
-        {"device": device_id}, 
+    last_log = await db.get_collection(SHUTDOWN_LOGS).find_one(
+        log_query({"device": device_id}), 
         sort=[("timestamp", -1)]
     )
+    last_log = from_stored(last_log) if last_log else None
     
     status_info = {
         "deviceId": device_id,
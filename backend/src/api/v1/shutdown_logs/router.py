@@ -1,33 +1,209 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Optional
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+import csv
+import io
 
+from config.settings import settings
 from config.database import get_database
 from src.models.shutdown import ShutdownCreate, ShutdownResponse
 from src.auth import get_current_user, require_role
+from src.crud import insert_and_return
+from src.serialization import shutdown_log_codec
+from src.pagination import decode_cursor, encode_cursor, fetch_page, NEXT_CURSOR_HEADER
+from src.archive import read_archived
+from src.reporting import record_shutdown_logs
+from src.log_storage import SHUTDOWN_LOGS, from_stored, log_projection, log_query, to_stored
 
 router = APIRouter(prefix="", tags=["shutdown-logs"])
 
+SHUTDOWN_LOG_SORT = [("timestamp", -1), ("_id", -1)]
+
+EXPORT_COLUMNS = ["logId", "device", "user", "userName", "status", "timestamp", "duration", "reason"]
+
+def _parse_log_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    # Stored and archived timestamps are naive UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def parse_log_dates(start_date: Optional[str], end_date: Optional[str]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    try:
+        return _parse_log_date(start_date), _parse_log_date(end_date)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Dates must be in ISO format"
+        )
+
+def build_log_filter(
+    device: Optional[str] = None,
+    user: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> Dict:
+    """Build the shutdown log query shared by the list and export endpoints"""
+    query_filter = {}
+    
+    # Stored field paths differ when logs are kept in a time-series collection
+    if device:
+        query_filter["device"] = device
+    if user:
+        query_filter["user"] = user
+    
+    # Handle date filtering
+    start, end = parse_log_dates(start_date, end_date)
+    if start or end:
+        timestamp_filter = {}
+        if start:
+            timestamp_filter["$gte"] = start
+        if end:
+            timestamp_filter["$lte"] = end
+        query_filter["timestamp"] = timestamp_filter
+    
+    return log_query(query_filter)
+
+def build_archive_matcher(
+    device: Optional[str] = None,
+    user: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    before: Optional[List] = None
+):
+    """Match archived logs as build_log_filter does, optionally only those sorting after ``before``"""
+    def matches(log: Dict) -> bool:
+        timestamp = log.get("timestamp")
+        if device and log.get("device") != device:
+            return False
+        if user and log.get("user") != user:
+            return False
+        if (start or end) and not isinstance(timestamp, datetime):
+            return False
+        if (start and timestamp < start) or (end and timestamp > end):
+            return False
+        return before is None or (timestamp, log["_id"]) < tuple(before)
+    return matches
+
+def _read_archived_logs(
+    device: Optional[str],
+    user: Optional[str],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    before: Optional[List] = None
+) -> AsyncIterator[Dict]:
+    """Archived logs matching the filter, newest first, optionally only those sorting after ``before``"""
+    start, end = parse_log_dates(start_date, end_date)
+    if before is not None and (end is None or before[0] < end):
+        end = before[0]
+    return read_archived(SHUTDOWN_LOGS, build_archive_matcher(device, user, start, end, before), start, end)
+
+async def fetch_log_page(
+    db,
+    device: Optional[str],
+    user: Optional[str],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0
+) -> Tuple[List[Dict], Optional[str]]:
+    """Page through stored logs, continuing into archived days once they run out"""
+    logs, next_cursor = await fetch_page(
+        db.get_collection(SHUTDOWN_LOGS), build_log_filter(device, user, start_date, end_date),
+        SHUTDOWN_LOG_SORT, limit, cursor=cursor, skip=skip
+    )
+    logs = [from_stored(log) for log in logs]
+    if next_cursor:
+        return logs, next_cursor
+    
+    # Archived logs are older than every stored one, so they follow the last
+    # stored log (or the cursor, when this page has none)
+    if logs:
+        before = [logs[-1]["timestamp"], logs[-1]["_id"]]
+        archive_skip = 0
+    else:
+        before = decode_cursor(cursor, SHUTDOWN_LOG_SORT) if cursor else None
+        archive_skip = 0
+        if skip and not cursor:
+            stored = await db.get_collection(SHUTDOWN_LOGS).count_documents(
+                build_log_filter(device, user, start_date, end_date)
+            )
+            archive_skip = max(0, skip - stored)
+    
+    needed = limit + 1 - len(logs)
+    async for log in _read_archived_logs(device, user, start_date, end_date, before):
+        if archive_skip:
+            archive_skip -= 1
+            continue
+        logs.append(log)
+        needed -= 1
+        if needed == 0:
+            break
+    
+    if len(logs) > limit:
+        logs = logs[:limit]
+        next_cursor = encode_cursor(logs[-1], SHUTDOWN_LOG_SORT)
+    return logs, next_cursor
+
+def _csv_row(log: Dict) -> str:
+    buffer = io.StringIO()
+    row = []
+    for column in EXPORT_COLUMNS:
+        value = log.get(column)
+        row.append(value.isoformat() if isinstance(value, datetime) else value)
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue()
+
+async def _export_logs(
+    cursor,
+    device: Optional[str],
+    user: Optional[str],
+    start_date: Optional[str],
+    end_date: Optional[str]
+) -> AsyncIterator[Dict]:
+    """Stored logs, then archived ones, newest first"""
+    last = None
+    async for log in cursor:
+        last = log
+        yield from_stored(log)
+    # Bounded by the last stored log, as the list endpoint is, so logs both
+    # archived and still stored after an interrupted retention run appear once
+    before = [last["timestamp"], last["_id"]] if last else None
+    async for log in _read_archived_logs(device, user, start_date, end_date, before):
+        yield log
+
+async def _stream_export(logs: AsyncIterator[Dict], export_format: str) -> AsyncIterator[bytes]:
+    if export_format == "csv":
+        yield ",".join(EXPORT_COLUMNS).encode() + b"\r\n"
+        async for log in logs:
+            yield _csv_row(log).encode()
+    else:
+        async for log in logs:
+            yield shutdown_log_codec.dumps(log) + b"\n"
+
 @router.post("/", response_model=ShutdownResponse, status_code=status.HTTP_201_CREATED)
 async def create_shutdown_log(log: ShutdownCreate, db = Depends(get_database), current_user: dict = Depends(get_current_user)):
     # Create log document
     log_dict = log.dict()
+    log_dict["logId"] = f"log-{datetime.utcnow().timestamp()}"
+    log_dict["timestamp"] = datetime.utcnow()
     
     # Insert log into database
-    result = await db.get_collection("shutdownLogs").insert_one(log_dict)
-    created_log = await db.get_collection("shutdownLogs").find_one({"_id": result.inserted_id})
-    
-    # Convert ObjectId to string for JSON serialization
-    created_log["id"] = str(created_log.pop("_id"))
-    created_log["timestamp"] = created_log["timestamp"].isoformat()
+    created_log = await insert_and_return(db.get_collection(SHUTDOWN_LOGS), to_stored(log_dict))
+    await record_shutdown_logs(db.get_collection(SHUTDOWN_LOGS), [created_log])
     
-    return created_log
+    return shutdown_log_codec.response(from_stored(created_log), status_code=status.HTTP_201_CREATED)
 
 @router.get("/", response_model=List[ShutdownResponse])
 async def read_shutdown_logs(
     skip: int = 0, 
-    limit: int = 100, 
+    limit: int = Query(100, ge=1), 
+    cursor: Optional[str] = None,
     device: Optional[str] = None,
     user: Optional[str] = None,
     start_date: Optional[str] = None,
@@ -35,40 +211,42 @@ async def read_shutdown_logs(
     db = Depends(get_database), 
     current_user: dict = Depends(get_current_user)
 ):
-    # Build query filter
-    query_filter = {}
-    
-    if device:
-        query_filter["device"] = device
-    if user:
-        query_filter["user"] = user
-    
-    # Handle date filtering
-    if start_date or end_date:
-        timestamp_filter = {}
-        if start_date:
-            timestamp_filter["$gte"] = datetime.fromisoformat(start_date)
-        if end_date:
-            timestamp_filter["$lte"] = datetime.fromisoformat(end_date)
-        if timestamp_filter:
-            query_filter["timestamp"] = timestamp_filter
-    
-    logs_cursor = db.get_collection("shutdownLogs").find(query_filter).skip(skip).limit(limit)
-    logs = []
-    async for log in logs_cursor:
-        log["id"] = str(log.pop("_id"))
-        log["timestamp"] = log["timestamp"].isoformat()
-        logs.append(log)
+    # Newest first, paginated by (timestamp, _id) so deep pages stay cheap
+    logs, next_cursor = await fetch_log_page(db, device, user, start_date, end_date, limit, cursor=cursor, skip=skip)
+    response = shutdown_log_codec.list_response(logs)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
+
+@router.get("/export")
+async def export_shutdown_logs(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    device: Optional[str] = None,
+    user: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    db = Depends(get_database),
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream matching shutdown logs as CSV or NDJSON without buffering them"""
+    query_filter = build_log_filter(device, user, start_date, end_date)
+    cursor = db.get_collection(SHUTDOWN_LOGS).find(
+        query_filter, projection=log_projection(EXPORT_COLUMNS)
+    ).sort(SHUTDOWN_LOG_SORT).batch_size(settings.EXPORT_BATCH_SIZE)
     
-    return logs
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"shutdown-logs-{datetime.utcnow().strftime('%Y-%m-%d')}.{format}"
+    return StreamingResponse(
+        # Days past the retention window are read from the archive, one at a time
+        _stream_export(_export_logs(cursor, device, user, start_date, end_date), format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @router.get("/{log_id}", response_model=ShutdownResponse)
 async def read_shutdown_log(log_id: str, db = Depends(get_database), current_user: dict = Depends(get_current_user)):
-    log = await db.get_collection("shutdownLogs").find_one({"logId": log_id})
+    log = await db.get_collection(SHUTDOWN_LOGS).find_one({"logId": log_id})
     if not log:
         raise HTTPException(status_code=404, detail="Shutdown log not found")
     
-    log["id"] = str(log.pop("_id"))
-    log["timestamp"] = log["timestamp"].isoformat()
-    
-    return log
\ No newline at end of file
+    return shutdown_log_codec.response(from_stored(log))
@@ -0,0 +1 @@
+# System API module
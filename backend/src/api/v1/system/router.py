@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends
+from typing import Dict
+
+from config.settings import settings
+from config.database import db, get_database
+from src.models import indexes
+from src import archive, readiness
+from src.auth import require_role
+from src.auth.password_utils import password_hasher
+from src.auth.jwt import token_cache
+from src.events import event_hub
+from src.jobs import job_manager
+from src.write_behind import write_behind
+from src.power import power_manager
+from src.checklist_graph import checklist_graph
+
+router = APIRouter(prefix="", tags=["system"])
+
+@router.get("/stats/database")
+async def get_database_pool_stats(current_user: Dict = Depends(require_role("Admin"))):
+    """Get MongoDB connection pool configuration and live usage - Admin only"""
+    return db.get_pool_stats()
+
+@router.get("/stats/indexes")
+async def get_index_report(current_user: Dict = Depends(require_role("Admin"))):
+    """Get the result of the last index reconciliation - Admin only"""
+    if indexes.last_index_report is None:
+        return {"status": "pending"}
+    return indexes.last_index_report
+
+@router.get("/stats/password-hashing")
+async def get_password_hashing_stats(current_user: Dict = Depends(require_role("Admin"))):
+    """Get password hashing pool usage - Admin only"""
+    return password_hasher.get_stats()
+
+@router.get("/stats/token-cache")
+async def get_token_cache_stats(current_user: Dict = Depends(require_role("Admin"))):
+    """Get verified token cache hit rate - Admin only"""
+    return token_cache.get_stats()
+
+
+@router.get("/stats/events")
+async def get_event_hub_stats(current_user: Dict = Depends(require_role("Admin"))):
+    """Get live update subscriber and delivery counts - Admin only"""
+    return event_hub.get_stats()
+
+@router.get("/stats/jobs")
+async def get_job_stats(current_user: Dict = Depends(require_role("Admin"))):
+    """Get background job worker and queue usage - Admin only"""
+    return job_manager.get_stats()
+
+@router.get("/stats/checklist-readiness")
+async def get_checklist_readiness(database = Depends(get_database), current_user: Dict = Depends(require_role("Admin"))):
+    """Get the materialized checklist readiness and how often it drifted - Admin only"""
+    return {
+        "readiness": await readiness.get_readiness(database),
+        "driftCorrections": readiness.drift_corrections,
+    }
+
+@router.get("/stats/checklist-graph")
+async def get_checklist_graph_stats(current_user: Dict = Depends(require_role("Admin"))):
+    """Get actionable and blocked checklist task counts - Admin only"""
+    return checklist_graph.get_stats()
+
+@router.get("/stats/log-retention")
+async def get_log_retention_report(current_user: Dict = Depends(require_role("Admin"))):
+    """Get the retention settings and the result of the last archive run - Admin only"""
+    return {
+        "retentionDays": settings.LOG_RETENTION_DAYS,
+        "lastRun": archive.last_retention_report,
+    }
+
+@router.get("/stats/write-behind")
+async def get_write_behind_stats(current_user: Dict = Depends(require_role("Admin"))):
+    """Get buffered shutdown log writes and flush counts - Admin only"""
+    return write_behind.get_stats()
+
+@router.get("/stats/power")
+async def get_power_driver_stats(current_user: Dict = Depends(require_role("Admin"))):
+    """Get per-driver power call concurrency, failures and timeouts - Admin only"""
+    return power_manager.get_stats()
@@ -2,10 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List, Dict
 from datetime import datetime
+from pymongo import UpdateMany
 
 from config.database import get_database
 from src.models.user import UserResponse, UserCreate
 from src.auth import get_current_user, require_role
+from src.crud import update_and_return
+from src.serialization import user_codec
 
 router = APIRouter(prefix="", tags=["users"])
 
@@ -15,19 +18,8 @@ async def get_all_users(
     current_user: Dict = Depends(require_role("Admin"))
 ):
     """Get all users - Admin only"""
-    users = []
-    async for user in db.get_collection("users").find():
-        user_response = {
-            "id": str(user["_id"]),
-            "name": user["name"],
-            "role": user["role"],
-            "assignedDevices": user.get("assignedDevices", []),
-            "createdAt": user["createdAt"].isoformat(),
-            "updatedAt": user["updatedAt"].isoformat()
-        }
-        users.append(user_response)
-    
-    return users
+    users = await db.get_collection("users").find(projection={"password": 0}).to_list(length=None)
+    return user_codec.list_response(users)
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user_by_id(
@@ -39,19 +31,12 @@ async def get_user_by_id(
     from bson import ObjectId
     try:
         user = await db.get_collection("users").find_one({"_id": ObjectId(user_id)})
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        return {
-            "id": str(user["_id"]),
-            "name": user["name"],
-            "role": user["role"],
-            "assignedDevices": user.get("assignedDevices", []),
-            "createdAt": user["createdAt"].isoformat(),
-            "updatedAt": user["updatedAt"].isoformat()
-        }
     except Exception as e:
         raise HTTPException(status_code=400, detail="Invalid user ID")
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return user_codec.response(user)
 
 @router.put("/{user_id}/assign-devices")
 async def assign_devices_to_user(
@@ -64,30 +49,44 @@ async def assign_devices_to_user(
     from bson import ObjectId
     
     try:
-        # Verify user exists
-        user = await db.get_collection("users").find_one({"_id": ObjectId(user_id)})
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+        user_object_id = ObjectId(user_id)
         
-        # Verify all devices exist
+        # Verify all devices exist with a single query
+        existing_ids = set(await db.get_collection("devices").distinct(
+            "deviceId", {"deviceId": {"$in": device_ids}}
+        ))
         for device_id in device_ids:
-            device = await db.get_collection("devices").find_one({"deviceId": device_id})
-            if not device:
+            if device_id not in existing_ids:
                 raise HTTPException(status_code=404, detail=f"Device {device_id} not found")
         
         # Update user's assigned devices
-        result = await db.get_collection("users").update_one(
-            {"_id": ObjectId(user_id)},
+        user = await update_and_return(
+            db.get_collection("users"),
+            {"_id": user_object_id},
             {
                 "$set": {
                     "assignedDevices": device_ids,
                     "updatedAt": datetime.utcnow()
                 }
-            }
+            },
+            projection={"name": 1}
         )
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
         
-        if result.modified_count == 0:
-            raise HTTPException(status_code=400, detail="Failed to update user")
+        # Mirror the new assignment onto devices.assignedUsers in one round trip:
+        # add the user to the assigned devices, drop them from any others
+        user_name = user["name"]
+        await db.get_collection("devices").bulk_write([
+            UpdateMany(
+                {"deviceId": {"$in": device_ids}},
+                {"$addToSet": {"assignedUsers": user_name}}
+            ),
+            UpdateMany(
+                {"deviceId": {"$nin": device_ids}, "assignedUsers": user_name},
+                {"$pull": {"assignedUsers": user_name}}
+            ),
+        ], ordered=False)
         
         return {"message": f"Successfully assigned {len(device_ids)} devices to user"}
         
@@ -107,30 +106,18 @@ async def remove_devices_from_user(
     from bson import ObjectId
     
     try:
-        # Verify user exists
-        user = await db.get_collection("users").find_one({"_id": ObjectId(user_id)})
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        # Get current assigned devices
-        current_devices = user.get("assignedDevices", [])
-        
-        # Remove specified devices
-        updated_devices = [device for device in current_devices if device not in device_ids]
-        
-        # Update user's assigned devices
-        result = await db.get_collection("users").update_one(
+        # Remove specified devices from the user's assignments
+        user = await update_and_return(
+            db.get_collection("users"),
             {"_id": ObjectId(user_id)},
             {
-                "$set": {
-                    "assignedDevices": updated_devices,
-                    "updatedAt": datetime.utcnow()
-                }
-            }
+                "$pullAll": {"assignedDevices": device_ids},
+                "$set": {"updatedAt": datetime.utcnow()}
+            },
+            projection={"name": 1}
         )
-        
-        if result.modified_count == 0:
-            raise HTTPException(status_code=400, detail="Failed to update user")
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
         
         # Also update devices collection to remove this user from assignedUsers
         user_name = user["name"]
@@ -152,19 +139,29 @@ async def get_engineers_with_devices(
     current_user: Dict = Depends(require_role("Admin"))
 ):
     """Get all engineers with their assigned devices - Admin only"""
+    pipeline = [
+        {"$match": {"role": "Engineer"}},
+        {"$lookup": {
+            "from": "devices",
+            "localField": "assignedDevices",
+            "foreignField": "deviceId",
+            "as": "devices",
+        }},
+    ]
     engineers = []
-    async for user in db.get_collection("users").find({"role": "Engineer"}):
-        # Get device details for assigned devices
-        assigned_device_details = []
-        for device_id in user.get("assignedDevices", []):
-            device = await db.get_collection("devices").find_one({"deviceId": device_id})
-            if device:
-                assigned_device_details.append({
-                    "deviceId": device["deviceId"],
-                    "name": device["name"],
-                    "status": device["status"],
-                    "location": device.get("location")
-                })
+    async for user in db.get_collection("users").aggregate(pipeline):
+        # $lookup returns devices in collection order; keep the assignment order
+        devices_by_id = {device["deviceId"]: device for device in user["devices"]}
+        assigned_device_details = [
+            {
+                "deviceId": device["deviceId"],
+                "name": device["name"],
+                "status": device["status"],
+                "location": device.get("location")
+            }
+            for device in (devices_by_id.get(device_id) for device_id in user.get("assignedDevices", []))
+            if device
+        ]
         
         engineer_info = {
             "id": str(user["_id"]),
@@ -177,4 +174,4 @@ async def get_engineers_with_devices(
         }
         engineers.append(engineer_info)
     
-    return engineers
\ No newline at end of file
+    return engineers
@@ -0,0 +1,187 @@
+"""
+Log retention and cold archive.
+
+Shutdown logs and audit logs older than ``LOG_RETENTION_DAYS`` are moved out
+of MongoDB into gzip-compressed JSON Lines files on local disk, one
+directory per collection and day::
+
+    <LOG_ARCHIVE_DIR>/shutdownLogs/date=2026-01-31/part-<n>.jsonl.gz
+
+Each batch of up to ``LOG_ARCHIVE_BATCH_SIZE`` documents is written to its
+own part file (via a temporary file and a rename) and only then deleted from
+MongoDB. A run interrupted between the two leaves documents that are both
+archived and stored; the next run finds their IDs in the day's existing
+parts and only deletes them, so nothing is archived twice.
+
+Lines are MongoDB extended JSON, so ObjectIds and dates read back unchanged.
+Shutdown logs are archived in their flat form whatever the storage layout.
+Reads of past days go through ``read_archived``, which loads one day at a
+time; file access runs in a worker thread to keep the event loop free.
+"""
+
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set
+from datetime import datetime, timedelta
+import asyncio
+import gzip
+import logging
+import os
+import time
+
+from bson import json_util
+
+from config.settings import settings
+from src.log_storage import SHUTDOWN_LOGS, from_stored
+
+logger = logging.getLogger(__name__)
+
+# Archived collections and the date field their retention is based on
+ARCHIVED_COLLECTIONS = {SHUTDOWN_LOGS: "timestamp", "audit_logs": "timestamp"}
+
+PARTITION_PREFIX = "date="
+
+# Deletes by _id from a time-series collection need MongoDB 7.0; earlier
+# versions only delete on the metaField
+TIMESERIES_DELETE_MIN_VERSION = 7
+
+class RetentionUnsupportedError(RuntimeError):
+    """The server cannot delete archived documents from the log storage"""
+
+# Result of the most recent retention run, exposed through the system API
+last_retention_report: Optional[Dict] = None
+
+def _day(timestamp: datetime) -> datetime:
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _partition_dir(collection_name: str, day: datetime) -> str:
+    return os.path.join(settings.LOG_ARCHIVE_DIR, collection_name, f"{PARTITION_PREFIX}{day.strftime('%Y-%m-%d')}")
+
+def archived_days(collection_name: str) -> List[datetime]:
+    """Days with an archive partition, oldest first"""
+    try:
+        entries = os.listdir(os.path.join(settings.LOG_ARCHIVE_DIR, collection_name))
+    except FileNotFoundError:
+        return []
+    days = []
+    for entry in entries:
+        if entry.startswith(PARTITION_PREFIX):
+            try:
+                days.append(datetime.strptime(entry[len(PARTITION_PREFIX):], "%Y-%m-%d"))
+            except ValueError:
+                continue
+    return sorted(days)
+
+def _load_day(collection_name: str, day: datetime) -> List[Dict]:
+    directory = _partition_dir(collection_name, day)
+    documents = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".jsonl.gz"):
+            continue
+        with gzip.open(os.path.join(directory, name), "rt", encoding="utf-8") as part:
+            documents.extend(json_util.loads(line) for line in part if line.strip())
+    return documents
+
+def _archived_ids(collection_name: str, day: datetime) -> Set:
+    if not os.path.isdir(_partition_dir(collection_name, day)):
+        return set()
+    return {document["_id"] for document in _load_day(collection_name, day)}
+
+def _write_part(collection_name: str, day: datetime, documents: List[Dict]):
+    directory = _partition_dir(collection_name, day)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"part-{time.time_ns()}.jsonl.gz")
+    temporary = path + ".tmp"
+    with gzip.open(temporary, "wt", encoding="utf-8") as part:
+        for document in documents:
+            part.write(json_util.dumps(document, json_options=json_util.RELAXED_JSON_OPTIONS))
+            part.write("\n")
+    # Only a complete part becomes visible to readers
+    os.replace(temporary, path)
+
+async def archive_collection(db, collection_name: str, cutoff: datetime, batch_size: int) -> Dict:
+    """Move every document of ``collection_name`` dated before ``cutoff`` to the archive"""
+    field = ARCHIVED_COLLECTIONS[collection_name]
+    collection = db.get_collection(collection_name)
+    archived = deleted = 0
+    while True:
+        oldest = await collection.find_one({field: {"$lt": cutoff}}, sort=[(field, 1)], projection={field: 1})
+        if oldest is None:
+            break
+        day = _day(oldest[field])
+        day_filter = {field: {"$gte": day, "$lt": min(day + timedelta(days=1), cutoff)}}
+        already_archived = await asyncio.to_thread(_archived_ids, collection_name, day)
+
+        while True:
+            batch = await collection.find(day_filter).sort([(field, 1), ("_id", 1)]).limit(batch_size).to_list(length=batch_size)
+            if not batch:
+                break
+            documents = [
+                from_stored(document) if collection_name == SHUTDOWN_LOGS else document
+                for document in batch if document["_id"] not in already_archived
+            ]
+            if documents:
+                await asyncio.to_thread(_write_part, collection_name, day, documents)
+                archived += len(documents)
+            result = await collection.delete_many({"_id": {"$in": [document["_id"] for document in batch]}})
+            deleted += result.deleted_count
+    return {"archived": archived, "deleted": deleted}
+
+async def check_retention_support(db):
+    """Raise RetentionUnsupportedError if shutdown logs are time-series on a server before 7.0"""
+    if not settings.SHUTDOWN_LOGS_TIMESERIES:
+        return
+    build_info = await db.get_collection(SHUTDOWN_LOGS).database.command("buildInfo")
+    if build_info.get("versionArray", [0])[0] < TIMESERIES_DELETE_MIN_VERSION:
+        raise RetentionUnsupportedError(
+            f"Log retention with SHUTDOWN_LOGS_TIMESERIES needs MongoDB "
+            f"{TIMESERIES_DELETE_MIN_VERSION}.0+, server is {build_info.get('version')}"
+        )
+
+async def apply_retention(db) -> Dict:
+    """Archive whole days older than LOG_RETENTION_DAYS from every archived collection"""
+    global last_retention_report
+    # Checked before anything is archived, so nothing is archived again and again
+    await check_retention_support(db)
+    cutoff = _day(datetime.utcnow()) - timedelta(days=settings.LOG_RETENTION_DAYS)
+    started = time.perf_counter()
+    report = {"cutoff": cutoff, "collections": {}}
+    for collection_name in ARCHIVED_COLLECTIONS:
+        report["collections"][collection_name] = await archive_collection(
+            db, collection_name, cutoff, settings.LOG_ARCHIVE_BATCH_SIZE
+        )
+    report["seconds"] = round(time.perf_counter() - started, 2)
+    report["finishedAt"] = datetime.utcnow()
+    last_retention_report = report
+    return report
+
+async def run_periodic_retention(db, interval_seconds: int):
+    while True:
+        try:
+            report = await apply_retention(db)
+            logger.info(f"Log retention finished: {report}")
+        except RetentionUnsupportedError as e:
+            logger.error(f"Log retention disabled: {e}")
+            return
+        except Exception as e:
+            logger.error(f"Log retention failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
+def _sort_key(document: Dict):
+    return (document.get("timestamp") or datetime.min, document["_id"])
+
+async def read_archived(
+    collection_name: str,
+    matches: Callable[[Dict], bool],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> AsyncIterator[Dict]:
+    """Yield archived documents dated within [start, end] that ``matches`` accepts, newest first"""
+    days = [
+        day for day in archived_days(collection_name)
+        if (start is None or day + timedelta(days=1) > start) and (end is None or day <= end)
+    ]
+    for day in reversed(days):
+        documents = await asyncio.to_thread(_load_day, collection_name, day)
+        documents = [document for document in documents if matches(document)]
+        documents.sort(key=_sort_key, reverse=True)
+        for document in documents:
+            yield document
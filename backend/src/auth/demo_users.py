@@ -1,17 +1,6 @@
 # Demo users for testing without database connection
 from datetime import datetime
-from passlib.context import CryptContext
-
-# Password context for hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against a hashed password"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-def hash_password(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+from src.auth.password_utils import verify_password, hash_password, verify_password_async
 
 # Pre-hashed passwords for demo users
 DEMO_USERS = {
@@ -39,12 +28,12 @@ def get_demo_user(username: str):
     """Get demo user by username"""
     return DEMO_USERS.get(username)
 
-def verify_demo_user(username: str, password: str):
+async def verify_demo_user(username: str, password: str):
     """Verify demo user credentials"""
     user = get_demo_user(username)
     if not user:
         return None
     
-    if verify_password(password, user["password_hash"]):
+    if await verify_password_async(password, user["password_hash"]):
         return user
     return None
\ No newline at end of file
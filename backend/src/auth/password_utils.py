@@ -1,4 +1,12 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from typing import Dict
+import asyncio
+import threading
+import time
+
+from config.settings import settings
 
 # Create password context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -9,4 +17,102 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def hash_password(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+class PasswordHashExecutor:
+    """Runs bcrypt work on a dedicated, size-limited thread pool.
+
+    bcrypt releases the GIL, so hashing on worker threads keeps the event loop
+    free. Calls beyond the worker count wait in a bounded queue; once that is
+    full new calls are rejected with 503 instead of piling up.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.run_time_total = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    async def run(self, func, *args):
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        submitted_at = time.perf_counter()
+
+        def timed_call():
+            started_at = time.perf_counter()
+            result = func(*args)
+            return result, started_at - submitted_at, time.perf_counter() - started_at
+
+        with self._pending_lock:
+            self._pending += 1
+            self.peak_pending = max(self.peak_pending, self._pending)
+        future = self._get_executor().submit(timed_call)
+        # A cancelled caller (e.g. a disconnected client) leaves work that has
+        # started running on its thread, so the slot is only freed once the
+        # work is finished or was cancelled before it started
+        future.add_done_callback(self._release)
+        result, wait_time, run_time = await asyncio.wrap_future(future)
+
+        self.completed += 1
+        self.wait_time_total += wait_time
+        self.wait_time_max = max(self.wait_time_max, wait_time)
+        self.run_time_total += run_time
+        return result
+
+    def _release(self, future):
+        # Runs on the thread that finished or cancelled the work
+        with self._pending_lock:
+            self._pending -= 1
+
+    def get_stats(self) -> Dict:
+        completed = self.completed or 1
+        return {
+            "maxWorkers": self.max_workers,
+            "maxQueue": self.max_queue,
+            "inFlight": self._pending,
+            "queued": max(0, self._pending - self.max_workers),
+            "peakInFlight": self.peak_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avgWaitMs": round(self.wait_time_total / completed * 1000, 3),
+            "maxWaitMs": round(self.wait_time_max * 1000, 3),
+            "avgRunMs": round(self.run_time_total / completed * 1000, 3),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+password_hasher = PasswordHashExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password hashing pool"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the password hashing pool"""
+    return await password_hasher.run(hash_password, password)
@@ -0,0 +1,182 @@
+"""
+Checklist task dependencies.
+
+A checklist item's ``dependencies`` lists the taskIds that must be completed
+before it (migration 004). The graph is loaded from the checklist collection
+once and then kept up to date by the checklist router as it changes items.
+Each task carries a count of its incomplete prerequisites, so completing a
+task only touches its direct dependents, and the tasks whose count is zero
+form the set of actionable tasks without scanning the checklist.
+
+Prerequisites that do not exist (e.g. deleted tasks) do not block anything.
+Tasks on a dependency cycle never become actionable. The periodic readiness
+recompute also reloads the graph, correcting drift from writes made outside
+this process.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+
+class ChecklistGraph:
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        # Changes applied while a load reads the collection, replayed onto it
+        self._pending: Optional[List[Tuple[Optional[Dict], Optional[Dict]]]] = None
+        self.reset()
+
+    def reset(self):
+        """Forget the graph; it is loaded again on next use"""
+        self.loaded = False
+        self._dependencies: Dict[str, List[str]] = {}
+        # Keyed by prerequisite, which may not exist (yet)
+        self._dependents: Dict[str, Set[str]] = {}
+        self._priority: Dict[str, int] = {}
+        self._completed: Set[str] = set()
+        self._blocked_by: Dict[str, int] = {}
+        self._ready: Set[str] = set()
+
+    async def load(self, db):
+        """Rebuild the graph from the checklist collection"""
+        async with self._lock:
+            await self._load(db)
+
+    async def ensure_loaded(self, db):
+        if self.loaded:
+            return
+        async with self._lock:
+            if not self.loaded:
+                await self._load(db)
+
+    async def _load(self, db):
+        # The current graph keeps serving while the collection is read. Changes
+        # made meanwhile may be missing from the read, so they are replayed
+        # onto the new graph; each sets an item's state, so replaying one the
+        # read already saw is harmless
+        self._pending = []
+        try:
+            cursor = db.get_collection("checklist").find(
+                {}, projection={"_id": 0, "taskId": 1, "dependencies": 1, "priority": 1, "completed": 1}
+            )
+            items = [item async for item in cursor]
+        finally:
+            pending, self._pending = self._pending, None
+        self.reset()
+        self.add_items(items)
+        self.loaded = True
+        for before, after in pending:
+            self._apply(before, after)
+
+    def add_items(self, items: Iterable[Dict]):
+        items = list(items)
+        for item in items:
+            task_id = item["taskId"]
+            self._dependencies[task_id] = [
+                dependency for dependency in item.get("dependencies") or [] if dependency != task_id
+            ]
+            self._priority[task_id] = item.get("priority") or 1
+            if item.get("completed"):
+                self._completed.add(task_id)
+            for dependency in self._dependencies[task_id]:
+                self._dependents.setdefault(dependency, set()).add(task_id)
+        # Counted once every item is known so prerequisites listed later count too
+        for item in items:
+            self._recount(item["taskId"])
+        for task_id in {item["taskId"] for item in items if not item.get("completed")}:
+            for dependent in self._dependents.get(task_id, ()):
+                self._recount(dependent)
+
+    def _is_incomplete(self, task_id: str) -> bool:
+        return task_id in self._dependencies and task_id not in self._completed
+
+    def _recount(self, task_id: str):
+        blocked_by = sum(1 for dependency in self._dependencies[task_id] if self._is_incomplete(dependency))
+        self._blocked_by[task_id] = blocked_by
+        self._update_ready(task_id)
+
+    def _update_ready(self, task_id: str):
+        if self._is_incomplete(task_id) and self._blocked_by[task_id] == 0:
+            self._ready.add(task_id)
+        else:
+            self._ready.discard(task_id)
+
+    def _adjust_dependents(self, task_id: str, delta: int):
+        for dependent in self._dependents.get(task_id, ()):
+            if dependent in self._blocked_by:
+                self._blocked_by[dependent] += delta
+                self._update_ready(dependent)
+
+    def remove(self, task_id: str):
+        if task_id not in self._dependencies:
+            return
+        if self._is_incomplete(task_id):
+            self._adjust_dependents(task_id, -1)
+        for dependency in self._dependencies.pop(task_id):
+            dependents = self._dependents.get(dependency)
+            if dependents is not None:
+                dependents.discard(task_id)
+                if not dependents:
+                    del self._dependents[dependency]
+        self._priority.pop(task_id, None)
+        self._blocked_by.pop(task_id, None)
+        self._completed.discard(task_id)
+        self._ready.discard(task_id)
+
+    def set_completed(self, task_id: str, completed: bool):
+        if task_id not in self._dependencies or (task_id in self._completed) == completed:
+            return
+        if completed:
+            self._completed.add(task_id)
+        else:
+            self._completed.discard(task_id)
+        self._update_ready(task_id)
+        self._adjust_dependents(task_id, -1 if completed else 1)
+
+    def apply_item_change(self, before: Optional[Dict], after: Optional[Dict]):
+        """Fold one checklist item change into the graph, as for readiness"""
+        if self._pending is not None:
+            self._pending.append((before, after))
+        if self.loaded:
+            # Otherwise built in full on first use
+            self._apply(before, after)
+
+    def _apply(self, before: Optional[Dict], after: Optional[Dict]):
+        if after is None:
+            self.remove(before["taskId"])
+        elif before is None or (before.get("dependencies") or []) != (after.get("dependencies") or []):
+            self.remove(after["taskId"])
+            self.add_items([after])
+        else:
+            self._priority[after["taskId"]] = after.get("priority") or 1
+            self.set_completed(after["taskId"], bool(after.get("completed")))
+
+    def depends_on(self, task_ids: Iterable[str], target: str) -> bool:
+        """Whether any of ``task_ids`` is ``target`` or (transitively) depends on it"""
+        stack, seen = list(task_ids), set()
+        while stack:
+            task_id = stack.pop()
+            if task_id == target:
+                return True
+            if task_id not in seen:
+                seen.add(task_id)
+                stack.extend(self._dependencies.get(task_id, ()))
+        return False
+
+    def unmet_dependencies(self, task_id: str) -> List[str]:
+        """Prerequisites of ``task_id`` that are not completed yet"""
+        return [dependency for dependency in self._dependencies.get(task_id, []) if self._is_incomplete(dependency)]
+
+    def next_actionable(self, limit: Optional[int] = None) -> List[str]:
+        """Incomplete tasks with every prerequisite done, highest priority first"""
+        ready = sorted(self._ready, key=lambda task_id: (-self._priority[task_id], task_id))
+        return ready if limit is None else ready[:limit]
+
+    def get_stats(self) -> Dict:
+        return {
+            "loaded": self.loaded,
+            "tasks": len(self._dependencies),
+            "completed": len(self._completed),
+            "actionable": len(self._ready),
+            "blocked": sum(1 for task_id, count in self._blocked_by.items() if count and self._is_incomplete(task_id)),
+        }
+
+checklist_graph = ChecklistGraph()
@@ -0,0 +1,54 @@
+"""
+Shared data-access helpers.
+
+Each helper performs a mutation in a single MongoDB round trip and returns
+the resulting document, so routers never need a follow-up ``find_one``.
+"""
+
+from typing import Dict, Optional, Tuple
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+async def insert_and_return(collection, document: Dict) -> Dict:
+    """Insert a document and return it in memory with its generated ``_id``"""
+    result = await collection.insert_one(document)
+    document["_id"] = result.inserted_id
+    return document
+
+async def insert_if_absent(collection, query: Dict, document: Dict) -> Optional[Dict]:
+    """Atomically insert ``document`` unless a document matching ``query`` exists.
+
+    Returns the inserted document, or ``None`` if a matching document was
+    already present.
+    """
+    document.setdefault("_id", ObjectId())
+    existing = await collection.find_one_and_update(
+        query,
+        {"$setOnInsert": document},
+        upsert=True,
+        projection={"_id": 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if existing is not None:
+        return None
+    return document
+
+async def update_and_return(collection, query: Dict, update: Dict, **kwargs) -> Optional[Dict]:
+    """Apply ``update`` to the first match and return the updated document, or ``None``"""
+    return await collection.find_one_and_update(
+        query, update, return_document=ReturnDocument.AFTER, **kwargs
+    )
+
+async def set_and_return_both(collection, query: Dict, fields: Dict) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """``$set`` ``fields`` on the first match and return the document before and after.
+
+    The server returns the previous version and the new one is derived from
+    it, so callers that need to diff a change still make one round trip.
+    Returns ``(None, None)`` if nothing matched.
+    """
+    previous = await collection.find_one_and_update(
+        query, {"$set": fields}, return_document=ReturnDocument.BEFORE
+    )
+    if previous is None:
+        return None, None
+    return previous, {**previous, **fields}
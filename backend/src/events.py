@@ -0,0 +1,107 @@
+"""
+In-process pub/sub hub for live updates.
+
+Routers publish device and checklist changes as they commit them; each
+connected client owns a bounded queue that the event stream drains. A
+subscriber that falls behind far enough to fill its queue is dropped
+rather than allowed to slow down publishers or grow memory without bound.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set
+from datetime import datetime
+import asyncio
+import itertools
+
+from config.settings import settings
+from src.serialization import dumps
+
+class Subscription:
+    """One client's view of the hub: a bounded queue plus an optional device filter"""
+
+    def __init__(self, max_queue: int, device_ids: Optional[Iterable[str]] = None):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        # None means every device; otherwise device events are filtered
+        self.device_ids: Optional[Set[str]] = set(device_ids) if device_ids is not None else None
+        self.dropped = False
+
+    def wants(self, event: Dict) -> bool:
+        device_id = event["data"].get("deviceId")
+        return self.device_ids is None or device_id is None or device_id in self.device_ids
+
+class EventHub:
+    def __init__(self, max_queue: int):
+        self.max_queue = max_queue
+        self._subscribers: Set[Subscription] = set()
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.delivered = 0
+        self.dropped_subscribers = 0
+
+    def subscribe(self, device_ids: Optional[Iterable[str]] = None) -> Subscription:
+        subscription = Subscription(self.max_queue, device_ids)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, event_type: str, data: Dict):
+        """Fan an event out to every interested subscriber without awaiting"""
+        event = {
+            "id": next(self._ids),
+            "type": event_type,
+            "data": data,
+            "timestamp": datetime.utcnow(),
+        }
+        self.published += 1
+        for subscription in list(self._subscribers):
+            if not subscription.wants(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                # Slow consumer: cut it loose, the client resyncs on reconnect
+                subscription.dropped = True
+                self.unsubscribe(subscription)
+                self.dropped_subscribers += 1
+
+    def close(self):
+        """Wake every stream with a sentinel so open responses finish on shutdown"""
+        for subscription in list(self._subscribers):
+            subscription.dropped = True
+            try:
+                subscription.queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+        self._subscribers.clear()
+
+    def get_stats(self) -> Dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "maxQueue": self.max_queue,
+            "published": self.published,
+            "delivered": self.delivered,
+            "droppedSubscribers": self.dropped_subscribers,
+        }
+
+def format_sse(event: Dict) -> bytes:
+    """Encode an event in the text/event-stream wire format"""
+    payload = dumps({"type": event["type"], "timestamp": event["timestamp"], **event["data"]})
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event["id"], event["type"].encode(), payload)
+
+event_hub = EventHub(max_queue=settings.EVENT_QUEUE_SIZE)
+
+def publish_device_status(device_id: str, new_status: str, **extra):
+    event_hub.publish("device.status", {"deviceId": device_id, "status": new_status, **extra})
+
+def publish_device_updated(device: Dict):
+    event_hub.publish("device.updated", {"deviceId": device["deviceId"], "device": device})
+
+def publish_checklist_updated(item: Dict):
+    event_hub.publish("checklist.updated", {"taskId": item["taskId"], "item": item})
+
+def publish_startup_wave(job_id: str, circuit: str, wave: int, waves: int, device_ids: List[str]):
+    event_hub.publish("startup.wave", {
+        "jobId": job_id, "circuit": circuit, "wave": wave, "waves": waves, "deviceIds": device_ids,
+    })
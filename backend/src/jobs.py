@@ -0,0 +1,223 @@
+"""
+Background job subsystem.
+
+Long-running power operations are recorded in the ``jobs`` collection and
+executed by a fixed number of worker tasks, so the request that starts one
+returns ``202`` as soon as it is queued. Job state is persisted at every
+transition. On startup, queued jobs are queued again and jobs that were
+mid-run are marked failed, because a partly applied power operation cannot
+be safely replayed.
+"""
+
+from typing import Awaitable, Callable, Dict, List, Optional
+from datetime import datetime
+from fastapi import HTTPException, status
+import asyncio
+import logging
+import uuid
+
+from config.settings import settings
+from src.crud import insert_and_return, update_and_return
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+JobHandler = Callable[..., Awaitable[Optional[Dict]]]
+
+_handlers: Dict[str, JobHandler] = {}
+
+def job_handler(job_type: str):
+    """Register the coroutine that performs jobs of ``job_type``.
+
+    Handlers are called as ``handler(db, job, context)`` and return the
+    job's result document.
+    """
+    def register(func: JobHandler) -> JobHandler:
+        _handlers[job_type] = func
+        return func
+    return register
+
+class JobContext:
+    """Lets a running handler persist its progress"""
+
+    def __init__(self, collection, job_id: str):
+        self._collection = collection
+        self.job_id = job_id
+        self._lock = asyncio.Lock()
+
+    async def progress(self, completed: int, total: int, **details):
+        """Record ``completed`` of ``total`` units, plus any handler-specific detail"""
+        progress = {"completed": completed, "total": total, **details}
+        # Handlers report from many coroutines at once; writes on different
+        # pool connections could land out of order and move progress back,
+        # so they are sent one at a time in call order
+        async with self._lock:
+            await self._collection.update_one(
+                {"jobId": self.job_id},
+                {"$set": {"progress": progress, "updatedAt": datetime.utcnow()}},
+            )
+
+class JobManager:
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.database = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running = 0
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+        self.requeued = 0
+        self.interrupted = 0
+
+    @property
+    def collection(self):
+        return self.database.get_collection("jobs")
+
+    async def start(self, database):
+        """Start the workers and recover jobs left over from a previous run"""
+        self.database = database
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        # Requeueing may wait on a full queue, so it must not hold up startup
+        self._tasks.append(asyncio.create_task(self.recover()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def recover(self):
+        try:
+            now = datetime.utcnow()
+            interrupted = await self.collection.update_many(
+                {"status": JOB_RUNNING},
+                {"$set": {
+                    "status": JOB_FAILED,
+                    "error": "Interrupted by server restart",
+                    "finishedAt": now,
+                    "updatedAt": now,
+                }},
+            )
+            self.interrupted += interrupted.modified_count
+
+            requeued = 0
+            async for job in self.collection.find({"status": JOB_QUEUED}, projection={"jobId": 1}).sort("createdAt", 1):
+                await self._queue.put(job["jobId"])
+                requeued += 1
+            self.requeued += requeued
+        except Exception as e:
+            logger.error(f"Job recovery failed: {e}")
+            return
+
+        if interrupted.modified_count or requeued:
+            logger.info(f"Recovered jobs: {requeued} requeued, {interrupted.modified_count} marked failed")
+
+    async def submit(self, job_type: str, params: Dict, user: str) -> Dict:
+        """Persist a job and queue it for the workers"""
+        if job_type not in _handlers:
+            raise ValueError(f"No handler registered for job type {job_type!r}")
+        if self._queue is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Job service is not running",
+            )
+        if self._queue.full():
+            self._reject()
+
+        now = datetime.utcnow()
+        job = await insert_and_return(self.collection, {
+            "jobId": uuid.uuid4().hex,
+            "type": job_type,
+            "status": JOB_QUEUED,
+            "user": user,
+            "params": params,
+            "progress": {"completed": 0, "total": 0},
+            "result": None,
+            "error": None,
+            "createdAt": now,
+            "updatedAt": now,
+        })
+        try:
+            self._queue.put_nowait(job["jobId"])
+        except asyncio.QueueFull:
+            # Filled by other submits or recovery while the job was inserted
+            await self.collection.delete_one({"jobId": job["jobId"]})
+            self._reject()
+        self.submitted += 1
+        return job
+
+    def _reject(self):
+        self.rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many pending jobs, please retry",
+            headers={"Retry-After": "5"},
+        )
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        return await self.collection.find_one({"jobId": job_id})
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"Job {job_id} could not be recorded: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        # Claim the job atomically so a recovered duplicate is never run twice
+        job = await update_and_return(
+            self.collection,
+            {"jobId": job_id, "status": JOB_QUEUED},
+            {"$set": {"status": JOB_RUNNING, "startedAt": datetime.utcnow(), "updatedAt": datetime.utcnow()}},
+        )
+        if job is None:
+            return
+
+        self._running += 1
+        try:
+            result = await _handlers[job["type"]](self.database, job, JobContext(self.collection, job_id))
+            update = {"status": JOB_SUCCEEDED, "result": result or {}}
+            self.succeeded += 1
+        except asyncio.CancelledError:
+            raise
+        except HTTPException as e:
+            update = {"status": JOB_FAILED, "error": str(e.detail)}
+            self.failed += 1
+        except Exception as e:
+            logger.error(f"Job {job_id} ({job['type']}) failed: {e}")
+            update = {"status": JOB_FAILED, "error": str(e)}
+            self.failed += 1
+        finally:
+            self._running -= 1
+
+        now = datetime.utcnow()
+        update.update({"finishedAt": now, "updatedAt": now})
+        await self.collection.update_one({"jobId": job_id}, {"$set": update})
+
+    def get_stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "maxQueue": self.max_queue,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": self._running,
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "requeued": self.requeued,
+            "interrupted": self.interrupted,
+        }
+
+job_manager = JobManager(workers=settings.JOB_WORKERS, max_queue=settings.JOB_MAX_QUEUE)
@@ -0,0 +1,58 @@
+"""
+Shutdown log storage layout.
+
+With ``SHUTDOWN_LOGS_TIMESERIES`` enabled, shutdown logs live in a MongoDB
+time-series collection: ``timestamp`` is the timeField and ``device``,
+``user`` and ``status`` are grouped under the ``meta`` metaField. MongoDB
+buckets logs by meta value and time and compresses each bucket by column, so
+date range scans read far fewer, smaller documents.
+
+Routers keep working with flat logs. ``to_stored`` and ``log_query`` map a
+flat log or filter onto the stored layout, and ``from_stored`` flattens a
+stored log back. Logs stored before the switch are flat already and are
+returned unchanged.
+"""
+
+from typing import Dict, List, Union
+
+from config.settings import settings
+from src.write_behind import write_behind
+
+SHUTDOWN_LOGS = "shutdownLogs"
+META_FIELD = "meta"
+META_FIELDS = ("device", "user", "status")
+
+TIMESERIES_OPTIONS = {"timeField": "timestamp", "metaField": META_FIELD, "granularity": "seconds"}
+
+def log_field(name: str) -> str:
+    """Stored path of a flat log field"""
+    if settings.SHUTDOWN_LOGS_TIMESERIES and name in META_FIELDS:
+        return f"{META_FIELD}.{name}"
+    return name
+
+def log_query(query: Dict) -> Dict:
+    """Map a filter on flat log fields onto the stored layout"""
+    return {log_field(field): condition for field, condition in query.items()}
+
+def log_projection(fields: List[str]) -> Dict:
+    return {log_field(field): 1 for field in fields}
+
+def to_stored(log: Dict) -> Dict:
+    if not settings.SHUTDOWN_LOGS_TIMESERIES or META_FIELD in log:
+        return log
+    stored = {field: value for field, value in log.items() if field not in META_FIELDS}
+    stored[META_FIELD] = {field: log[field] for field in META_FIELDS if field in log}
+    return stored
+
+def from_stored(log: Dict) -> Dict:
+    meta = log.get(META_FIELD)
+    if not isinstance(meta, dict):
+        return log
+    flat = {field: value for field, value in log.items() if field != META_FIELD}
+    flat.update(meta)
+    return flat
+
+async def write_shutdown_logs(db, logs: Union[Dict, List[Dict]], wait=None):
+    """Queue shutdown logs for insertion through the write-behind buffer"""
+    logs = logs if isinstance(logs, list) else [logs]
+    await write_behind.insert(db.get_collection(SHUTDOWN_LOGS), [to_stored(log) for log in logs], wait=wait)
@@ -2,4 +2,5 @@
 from .user import UserBase, UserCreate, UserUpdate, UserInDB, UserResponse
 from .device import DeviceBase, DeviceCreate, DeviceUpdate, DeviceInDB, DeviceResponse
 from .checklist import ChecklistBase, ChecklistCreate, ChecklistUpdate, ChecklistInDB, ChecklistResponse
-from .shutdown import ShutdownBase, ShutdownCreate, ShutdownInDB, ShutdownResponse
\ No newline at end of file
+from .shutdown import ShutdownBase, ShutdownCreate, BulkShutdownRequest, ShutdownInDB, ShutdownResponse
+from .job import JobResponse
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class ChecklistBase(BaseModel):
@@ -7,6 +7,8 @@ class ChecklistBase(BaseModel):
     description: str = Field(..., description="Task description")
     category: str = Field(..., description="Task category: safety, security, backup, network")
     isCritical: bool = Field(default=True, description="Whether the task is critical for shutdown")
+    dependencies: List[str] = Field(default_factory=list, description="Task IDs that must be completed first")
+    priority: int = Field(default=1, ge=1, le=4, description="Priority: 1=low, 2=medium, 3=high, 4=critical")
 
 class ChecklistCreate(ChecklistBase):
     pass
@@ -1,11 +1,12 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class DeviceBase(BaseModel):
     deviceId: str = Field(..., description="Unique device identifier")
     name: str = Field(..., description="Device name")
     status: str = Field(default="on", description="Device power status: on, off, maintenance")
+    shutdownAfter: List[str] = Field(default_factory=list, description="Devices that must be off before this one is shut down")
 
 class DeviceCreate(DeviceBase):
     location: Optional[str] = Field(None, description="Physical location of the device")
@@ -13,6 +14,7 @@ class DeviceCreate(DeviceBase):
 class DeviceUpdate(BaseModel):
     status: Optional[str] = Field(None, description="Updated device power status")
     location: Optional[str] = Field(None, description="Updated physical location")
+    shutdownAfter: Optional[List[str]] = Field(None, description="Updated shutdown dependencies")
 
 class DeviceInDB(DeviceBase):
     id: str = Field(..., alias="_id", description="Device ID")
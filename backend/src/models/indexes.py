@@ -0,0 +1,159 @@
+"""
+Declarative index registry.
+
+Indexes are declared next to the models for the fields the routers actually
+query, and reconciled against the live database on startup.
+"""
+
+from typing import Dict, List, Optional
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+import logging
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    "users": [
+        # Login, /me and profile updates look users up by name
+        IndexModel([("name", ASCENDING)], unique=True),
+        IndexModel([("role", ASCENDING)]),
+    ],
+    "devices": [
+        IndexModel([("deviceId", ASCENDING)], unique=True),
+        # Status filters and the "all devices off" check after each shutdown
+        IndexModel([("status", ASCENDING)]),
+        # /devices/mine pages and shutdown authorization filter on assignedUsers
+        IndexModel([("assignedUsers", ASCENDING), ("deviceId", ASCENDING)]),
+    ],
+    "checklist": [
+        IndexModel([("taskId", ASCENDING)], unique=True),
+        # validate_checklist filters on isCritical
+        IndexModel([("isCritical", ASCENDING), ("completed", ASCENDING)]),
+    ],
+    "shutdownLogs": [
+        IndexModel([("logId", ASCENDING)]),
+        # Time-series buckets are already clustered by time; secondary
+        # indexes cover the meta filters in newest-first order
+        IndexModel([("meta.device", ASCENDING), ("timestamp", DESCENDING)]),
+        IndexModel([("meta.user", ASCENDING), ("timestamp", DESCENDING)]),
+    ] if settings.SHUTDOWN_LOGS_TIMESERIES else [
+        IndexModel([("logId", ASCENDING)]),
+        # Keyset pagination order, optionally narrowed by device or user;
+        # also serves last-shutdown lookups per device
+        IndexModel([("timestamp", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("device", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("user", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    "shutdownStats": [
+        # /reports/stats reads one granularity over a bucket range
+        IndexModel([("granularity", ASCENDING), ("bucket", ASCENDING)]),
+    ],
+    "jobs": [
+        IndexModel([("jobId", ASCENDING)], unique=True),
+        # Startup recovery looks for queued and running jobs
+        IndexModel([("status", ASCENDING), ("createdAt", ASCENDING)]),
+    ],
+}
+
+# Result of the most recent reconciliation, exposed through the system API
+last_index_report: Optional[Dict] = None
+
+def _key_signature(key) -> tuple:
+    """Normalise an index key pattern so registry and server formats compare equal"""
+    items = key.items() if hasattr(key, "items") else key
+    return tuple(
+        (field, int(direction) if isinstance(direction, (int, float)) else direction)
+        for field, direction in items
+    )
+
+async def _index_usage(collection) -> Dict[str, int]:
+    """Return access counts per index name, or an empty dict if unavailable"""
+    usage = {}
+    try:
+        async for stat in collection.aggregate([{"$indexStats": {}}]):
+            usage[stat["name"]] = stat.get("accesses", {}).get("ops", 0)
+    except Exception:
+        pass
+    return usage
+
+async def _reconcile(database, report: Dict):
+    """Add every registry collection's created, mismatched, unused and failed indexes to ``report``"""
+    for collection_name, models in INDEX_REGISTRY.items():
+        collection = database[collection_name]
+        existing = await collection.index_information()
+        existing_by_key = {
+            _key_signature(info["key"]): (name, info) for name, info in existing.items()
+        }
+
+        declared_keys = set()
+        missing = []
+        for model in models:
+            spec = model.document
+            signature = _key_signature(spec["key"])
+            declared_keys.add(signature)
+
+            match = existing_by_key.get(signature)
+            if match is None:
+                missing.append(model)
+                continue
+
+            name, info = match
+            if bool(info.get("unique", False)) != bool(spec.get("unique", False)):
+                report["mismatched"].append({
+                    "collection": collection_name,
+                    "index": name,
+                    "expected": {"unique": bool(spec.get("unique", False))},
+                    "actual": {"unique": bool(info.get("unique", False))},
+                })
+
+        undeclared = [
+            name for signature, (name, _) in existing_by_key.items()
+            if name != "_id_" and signature not in declared_keys
+        ]
+        if undeclared:
+            usage = await _index_usage(collection)
+            for name in undeclared:
+                report["unused"].append({
+                    "collection": collection_name,
+                    "index": name,
+                    "ops": usage.get(name),
+                })
+
+        for model in missing:
+            name = model.document["name"]
+            try:
+                await collection.create_indexes([model])
+                report["created"].append({"collection": collection_name, "index": name})
+            except OperationFailure as e:
+                report["failed"].append({"collection": collection_name, "index": name, "error": str(e)})
+
+async def reconcile_indexes(database) -> Dict:
+    """Diff declared indexes against ``index_information()`` and create missing ones.
+
+    Indexes that exist but are not declared are reported as unused, and
+    indexes whose key pattern matches but whose options differ are reported
+    as mismatched. Neither kind is dropped automatically. Startup runs this
+    as a background task, so any error is logged and recorded under
+    ``error`` instead of being raised.
+    """
+    global last_index_report
+    report = {"created": [], "mismatched": [], "unused": [], "failed": []}
+    try:
+        await _reconcile(database, report)
+    except Exception as e:
+        report["error"] = str(e)
+        logger.error(f"Index reconciliation failed: {e}")
+
+    for entry in report["created"]:
+        logger.info(f"Created index {entry['collection']}.{entry['index']}")
+    for entry in report["mismatched"]:
+        logger.warning(f"Index {entry['collection']}.{entry['index']} options differ from registry: {entry}")
+    for entry in report["unused"]:
+        logger.warning(f"Index {entry['collection']}.{entry['index']} is not declared in the registry (ops: {entry['ops']})")
+    for entry in report["failed"]:
+        logger.error(f"Failed to create index {entry['collection']}.{entry['index']}: {entry['error']}")
+
+    last_index_report = report
+    return report
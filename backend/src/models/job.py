@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+class JobResponse(BaseModel):
+    id: str = Field(..., alias="_id", description="Job ID")
+    jobId: str = Field(..., description="Unique job identifier")
+    type: str = Field(..., description="Job type, e.g. shutdown or startup")
+    status: str = Field(..., description="Job status: queued, running, succeeded or failed")
+    user: str = Field(..., description="User who submitted the job")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Job parameters")
+    progress: Dict[str, Any] = Field(default_factory=dict, description="Units of work completed out of total, plus job-specific detail")
+    result: Optional[Dict[str, Any]] = Field(None, description="Result of a finished job")
+    error: Optional[str] = Field(None, description="Reason a failed job failed")
+    createdAt: datetime = Field(..., description="When the job was submitted")
+    startedAt: Optional[datetime] = Field(None, description="When a worker picked the job up")
+    finishedAt: Optional[datetime] = Field(None, description="When the job finished")
+
+    class Config:
+        populate_by_name = True
+        json_encoders = {
+            datetime: lambda v: v.isoformat()
+        }
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class ShutdownBase(BaseModel):
@@ -10,13 +10,17 @@ class ShutdownBase(BaseModel):
 
 class ShutdownCreate(ShutdownBase):
     reason: Optional[str] = Field(None, description="Reason for failure if shutdown failed")
-    duration: int = Field(default=0, description="Duration of shutdown process in seconds")
+    duration: float = Field(default=0, description="Measured duration of the power operation in seconds")
+
+class BulkShutdownRequest(BaseModel):
+    device_ids: List[str] = Field(..., min_length=1, description="Device IDs to shut down")
+    reason: Optional[str] = Field(None, description="Reason recorded on each shutdown log")
 
 class ShutdownInDB(ShutdownBase):
     id: str = Field(..., alias="_id", description="Shutdown log ID")
     logId: str = Field(..., description="Unique log identifier")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Timestamp of shutdown attempt")
-    duration: int = Field(default=0, description="Duration of shutdown process in seconds")
+    duration: float = Field(default=0, description="Measured duration of the power operation in seconds")
     reason: Optional[str] = Field(None, description="Reason for failure if shutdown failed")
     
     class Config:
@@ -29,7 +33,7 @@ class ShutdownResponse(ShutdownBase):
     id: str = Field(..., alias="_id", description="Shutdown log ID")
     logId: str = Field(..., description="Unique log identifier")
     timestamp: datetime = Field(..., description="Timestamp of shutdown attempt")
-    duration: int = Field(..., description="Duration of shutdown process in seconds")
+    duration: float = Field(..., description="Measured duration of the power operation in seconds")
     reason: Optional[str] = Field(None, description="Reason for failure if shutdown failed")
     
     class Config:
@@ -0,0 +1,65 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are addressed by the sort-key values of the last document returned,
+encoded as an opaque token, so fetching page N is a bounded index range
+scan instead of walking every skipped document.
+"""
+
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+from bson import json_util
+import base64
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(document: Dict, sort: List[Tuple[str, int]]) -> str:
+    """Build an opaque cursor from the sort-key values of ``document``"""
+    values = [document.get(field) for field, _ in sort]
+    raw = json_util.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: List[Tuple[str, int]]) -> List:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        values = None
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+    return values
+
+def keyset_filter(sort: List[Tuple[str, int]], values: List) -> Dict:
+    """Match documents strictly after ``values`` in ``sort`` order"""
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {prev_field: values[j] for j, (prev_field, _) in enumerate(sort[:i])}
+        clause[field] = {"$gt" if direction > 0 else "$lt": values[i]}
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+async def fetch_page(
+    collection,
+    query: Dict,
+    sort: List[Tuple[str, int]],
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+) -> Tuple[List[Dict], Optional[str]]:
+    """Fetch one page of ``query`` in ``sort`` order.
+
+    Returns the documents and the cursor for the next page, or ``None`` when
+    this is the last page. ``skip`` is only honoured when no cursor is given.
+    """
+    if cursor:
+        after = keyset_filter(sort, decode_cursor(cursor, sort))
+        query = {"$and": [query, after]} if query else after
+        skip = 0
+
+    # Fetch one extra document to know whether another page exists
+    documents = await collection.find(query).sort(sort).skip(skip).limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(documents[-1], sort)
+    return documents, next_cursor
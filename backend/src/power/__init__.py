@@ -0,0 +1,3 @@
+# Power control drivers
+from .base import PowerDriver, PowerError
+from .manager import PowerManager, power_manager
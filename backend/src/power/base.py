@@ -0,0 +1,81 @@
+"""
+Base class for power drivers.
+
+A driver turns one device on or off. Every driver has its own concurrency
+limit and timeout, so a slow PDU waiting on its outlet relay only queues
+calls to other outlets of that kind and never holds up BMCs behind it.
+"""
+
+from typing import Dict
+import asyncio
+import time
+
+class PowerError(Exception):
+    """A device could not be powered on or off"""
+
+class PowerDriver:
+    name = "base"
+
+    def __init__(self, concurrency: int, timeout: float):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._active = 0
+        self._waiting = 0
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+
+    async def power_off(self, device: Dict) -> float:
+        """Power ``device`` off and return how long it took, in seconds"""
+        return await self._call(device, on=False)
+
+    async def power_on(self, device: Dict) -> float:
+        """Power ``device`` on and return how long it took, in seconds"""
+        return await self._call(device, on=True)
+
+    async def _call(self, device: Dict, on: bool) -> float:
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            # Also when the caller is cancelled while queued for a slot
+            self._waiting -= 1
+        self._active += 1
+        self.calls += 1
+        # Only time spent on the device counts, not time queued for a slot
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.set_power(device, on), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.failures += 1
+            raise PowerError(f"{self.name} driver timed out after {self.timeout}s") from None
+        except PowerError:
+            self.failures += 1
+            raise
+        except Exception as e:
+            self.failures += 1
+            raise PowerError(f"{self.name} driver failed: {e}") from e
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+        return time.perf_counter() - started
+
+    async def set_power(self, device: Dict, on: bool):
+        """Switch the device and return once it has reached the new state"""
+        raise NotImplementedError
+
+    async def close(self):
+        """Release any connections held open between calls"""
+
+    def get_stats(self) -> Dict:
+        return {
+            "concurrency": self.concurrency,
+            "timeoutSeconds": self.timeout,
+            "active": self._active,
+            "waiting": self._waiting,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+        }
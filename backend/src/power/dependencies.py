@@ -0,0 +1,124 @@
+"""
+Shutdown ordering between devices.
+
+A device's ``shutdownAfter`` lists devices that must be off before it is
+powered off (storage after the compute using it, switches after everything).
+The planner sorts a set of devices into waves (every device in a wave only
+depends on earlier waves) and rejects cycles. Execution does not wait for
+whole waves: each device starts as soon as its own predecessors are off, so
+a full shutdown takes as long as the longest dependency chain. When a device
+fails, everything downstream of it is skipped and left on. A device whose
+predecessor is not being shut down with it is only powered off once that
+predecessor is already off.
+"""
+
+from typing import Awaitable, Callable, Dict, Iterable, List, Set
+import asyncio
+
+class DependencyCycleError(ValueError):
+    def __init__(self, cycle: List[str]):
+        self.cycle = cycle
+        super().__init__(f"Shutdown dependencies form a cycle: {' -> '.join(cycle)}")
+
+def dependency_graph(device_ids: Iterable[str], devices: Dict[str, Dict]) -> Dict[str, Set[str]]:
+    """Map each device to the predecessors it must wait for.
+
+    Only edges between ``device_ids`` count; predecessors outside the set
+    are not shut down now and must already be off (see
+    ``outside_predecessors``).
+    """
+    device_ids = list(device_ids)
+    members = set(device_ids)
+    return {
+        device_id: {
+            predecessor for predecessor in (devices.get(device_id) or {}).get("shutdownAfter") or []
+            if predecessor in members and predecessor != device_id
+        }
+        for device_id in device_ids
+    }
+
+def outside_predecessors(device_ids: Iterable[str], devices: Dict[str, Dict]) -> Dict[str, Set[str]]:
+    """Map each device to the predecessors it lists that are not in ``device_ids``"""
+    device_ids = list(device_ids)
+    members = set(device_ids)
+    outside = {
+        device_id: {
+            predecessor for predecessor in (devices.get(device_id) or {}).get("shutdownAfter") or []
+            if predecessor not in members
+        }
+        for device_id in device_ids
+    }
+    return {device_id: predecessors for device_id, predecessors in outside.items() if predecessors}
+
+def _find_cycle(predecessors: Dict[str, Set[str]], nodes: Set[str]) -> List[str]:
+    """Return one cycle among ``nodes``, all of which are known to be on cycles or behind them"""
+    path: List[str] = []
+    on_path: Dict[str, int] = {}
+    node = min(nodes)
+    while node not in on_path:
+        on_path[node] = len(path)
+        path.append(node)
+        node = min(predecessor for predecessor in predecessors[node] if predecessor in nodes)
+    return path[on_path[node]:] + [node]
+
+def plan_dependency_waves(predecessors: Dict[str, Set[str]]) -> List[List[str]]:
+    """Topologically sort the graph into waves, raising DependencyCycleError on a cycle"""
+    remaining = {node: set(preds) for node, preds in predecessors.items()}
+    dependents: Dict[str, List[str]] = {node: [] for node in predecessors}
+    for node, preds in predecessors.items():
+        for predecessor in preds:
+            dependents[predecessor].append(node)
+
+    waves = []
+    ready = sorted(node for node, preds in remaining.items() if not preds)
+    while ready:
+        waves.append(ready)
+        next_ready = []
+        for node in ready:
+            del remaining[node]
+            for dependent in dependents[node]:
+                remaining[dependent].discard(node)
+                if not remaining[dependent]:
+                    next_ready.append(dependent)
+        ready = sorted(next_ready)
+
+    if remaining:
+        raise DependencyCycleError(_find_cycle(predecessors, set(remaining)))
+    return waves
+
+async def run_in_dependency_order(
+    predecessors: Dict[str, Set[str]],
+    action: Callable[[str], Awaitable[bool]],
+    skip: Callable[[str, str], Awaitable[None]],
+):
+    """Run ``action`` on every node once its predecessors are done.
+
+    ``action`` returns whether the node may be relied on by its dependents.
+    A node with a failed or skipped predecessor is not run; ``skip(node,
+    predecessor)`` is awaited for it instead. If ``action`` or ``skip``
+    raises, the other nodes are cancelled and the exception propagates. The
+    graph must be acyclic; plan it with ``plan_dependency_waves`` first.
+    """
+    loop = asyncio.get_running_loop()
+    done: Dict[str, asyncio.Future] = {node: loop.create_future() for node in predecessors}
+
+    async def run(node: str):
+        ok = False
+        try:
+            for predecessor in sorted(predecessors[node]):
+                if not await done[predecessor]:
+                    await skip(node, predecessor)
+                    return
+            ok = await action(node)
+        finally:
+            done[node].set_result(ok)
+
+    tasks = [asyncio.create_task(run(node)) for node in predecessors]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # Leave no power operation running unobserved once the caller fails
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -0,0 +1,144 @@
+"""
+Power drivers.
+
+Devices choose their driver and its address through an optional ``power``
+sub-document, e.g. ``{"driver": "ipmi", "host": "10.0.0.21"}`` or
+``{"driver": "snmp_pdu", "host": "10.0.0.5", "outlet": 7}``.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import os
+
+from .base import PowerDriver, PowerError
+
+def _power_config(device: Dict) -> Dict:
+    return device.get("power") or {}
+
+def _require_host(driver: PowerDriver, device: Dict) -> str:
+    host = _power_config(device).get("host")
+    if not host:
+        raise PowerError(f"Device {device['deviceId']} has no power.host for the {driver.name} driver")
+    return host
+
+async def _run_command(args: List[str], env: Optional[Dict[str, str]] = None):
+    """Run an external power tool and fail with its stderr if it exits non-zero"""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            env={**os.environ, **env} if env else None
+        )
+    except FileNotFoundError:
+        raise PowerError(f"{args[0]} is not installed")
+    try:
+        _, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        # Timed out: do not leave the tool running
+        process.kill()
+        await process.wait()
+        raise
+    if process.returncode != 0:
+        raise PowerError(stderr.decode(errors="replace").strip() or f"{args[0]} exited with {process.returncode}")
+
+class SimulatedDriver(PowerDriver):
+    """Pretends to switch the device, taking a fixed time"""
+    name = "simulated"
+
+    def __init__(self, concurrency: int, timeout: float, off_seconds: float = 2, on_seconds: float = 3):
+        super().__init__(concurrency, timeout)
+        self.off_seconds = off_seconds
+        self.on_seconds = on_seconds
+
+    async def set_power(self, device: Dict, on: bool):
+        await asyncio.sleep(self.on_seconds if on else self.off_seconds)
+
+class IPMIDriver(PowerDriver):
+    """Server BMCs, through ``ipmitool chassis power``"""
+    name = "ipmi"
+
+    def __init__(self, concurrency: int, timeout: float, username: str, password: str):
+        super().__init__(concurrency, timeout)
+        self.username = username
+        self.password = password
+
+    async def set_power(self, device: Dict, on: bool):
+        config = _power_config(device)
+        # -E reads the password from the environment so it does not show up in ps
+        await _run_command([
+            "ipmitool", "-I", "lanplus", "-H", _require_host(self, device),
+            "-U", config.get("username", self.username), "-E",
+            "chassis", "power", "on" if on else "off",
+        ], env={"IPMI_PASSWORD": config.get("password", self.password)})
+
+class SNMPPDUDriver(PowerDriver):
+    """Switched PDU outlets, through ``snmpset`` on the outlet control OID"""
+    name = "snmp_pdu"
+
+    # APC PowerNet-MIB sPDUOutletCtl; 1 = on, 2 = off
+    OUTLET_CONTROL_OID = "1.3.6.1.4.1.318.1.1.4.4.2.1.3"
+    OUTLET_ON = 1
+    OUTLET_OFF = 2
+
+    def __init__(self, concurrency: int, timeout: float, community: str):
+        super().__init__(concurrency, timeout)
+        self.community = community
+
+    async def set_power(self, device: Dict, on: bool):
+        config = _power_config(device)
+        outlet = config.get("outlet")
+        if outlet is None:
+            raise PowerError(f"Device {device['deviceId']} has no power.outlet for the {self.name} driver")
+        await _run_command([
+            "snmpset", "-v2c", "-c", config.get("community", self.community), _require_host(self, device),
+            f"{config.get('oid', self.OUTLET_CONTROL_OID)}.{outlet}", "i",
+            str(self.OUTLET_ON if on else self.OUTLET_OFF),
+        ])
+
+class TCPSimulatorDriver(PowerDriver):
+    """Talks to the power simulator (``src.power.simulator``) over TCP.
+
+    Connections are kept open and reused, up to one per concurrent call.
+    """
+    name = "tcp_simulator"
+
+    def __init__(self, concurrency: int, timeout: float, host: str, port: int):
+        super().__init__(concurrency, timeout)
+        self.host = host
+        self.port = port
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.connections_opened = 0
+
+    async def _connection(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        self.connections_opened += 1
+        return await asyncio.open_connection(self.host, self.port)
+
+    async def set_power(self, device: Dict, on: bool):
+        reader, writer = await self._connection()
+        reusable = False
+        try:
+            writer.write(f"{'ON' if on else 'OFF'} {device['deviceId']}\n".encode())
+            await writer.drain()
+            reply = (await reader.readline()).decode().strip()
+            if not reply:
+                raise PowerError("Power simulator closed the connection")
+            reusable = True
+            if not reply.startswith("OK"):
+                raise PowerError(reply.removeprefix("ERR").strip() or reply)
+        finally:
+            if reusable:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+
+    def get_stats(self) -> Dict:
+        return {**super().get_stats(), "connectionsOpened": self.connections_opened, "idleConnections": len(self._idle)}
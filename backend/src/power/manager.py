@@ -0,0 +1,71 @@
+"""
+Chooses the power driver for each device.
+
+A device's ``power.driver`` wins; otherwise its ``type`` is looked up in
+``POWER_DRIVER_TYPES`` (e.g. ``server:ipmi,pdu:snmp_pdu``), and anything left
+over uses ``POWER_DEFAULT_DRIVER``.
+"""
+
+from typing import Dict
+import asyncio
+
+from config.settings import settings
+from .base import PowerDriver, PowerError
+from .drivers import IPMIDriver, SimulatedDriver, SNMPPDUDriver, TCPSimulatorDriver
+
+class PowerManager:
+    def __init__(self, drivers: Dict[str, PowerDriver], driver_types: Dict[str, str], default_driver: str):
+        self.drivers = drivers
+        self.driver_types = driver_types
+        self.default_driver = default_driver
+
+    def driver_for(self, device: Dict) -> PowerDriver:
+        name = (device.get("power") or {}).get("driver") \
+            or self.driver_types.get(device.get("type")) \
+            or self.default_driver
+        driver = self.drivers.get(name)
+        if driver is None:
+            raise PowerError(f"Unknown power driver {name!r} for device {device['deviceId']}")
+        return driver
+
+    async def power_off(self, device: Dict) -> float:
+        """Power ``device`` off with its driver and return the measured duration"""
+        return await self.driver_for(device).power_off(device)
+
+    async def power_on(self, device: Dict) -> float:
+        """Power ``device`` on with its driver and return the measured duration"""
+        return await self.driver_for(device).power_on(device)
+
+    async def close(self):
+        await asyncio.gather(*(driver.close() for driver in self.drivers.values()))
+
+    def get_stats(self) -> Dict:
+        return {
+            "defaultDriver": self.default_driver,
+            "driverTypes": self.driver_types,
+            "drivers": {name: driver.get_stats() for name, driver in self.drivers.items()},
+        }
+
+def build_power_manager() -> PowerManager:
+    drivers = [
+        SimulatedDriver(settings.POWER_SIMULATED_CONCURRENCY, settings.POWER_SIMULATED_TIMEOUT_SECONDS),
+        IPMIDriver(
+            settings.POWER_IPMI_CONCURRENCY, settings.POWER_IPMI_TIMEOUT_SECONDS,
+            username=settings.IPMI_USERNAME, password=settings.IPMI_PASSWORD,
+        ),
+        SNMPPDUDriver(
+            settings.POWER_SNMP_PDU_CONCURRENCY, settings.POWER_SNMP_PDU_TIMEOUT_SECONDS,
+            community=settings.SNMP_COMMUNITY,
+        ),
+        TCPSimulatorDriver(
+            settings.POWER_TCP_SIMULATOR_CONCURRENCY, settings.POWER_TCP_SIMULATOR_TIMEOUT_SECONDS,
+            host=settings.POWER_TCP_SIMULATOR_HOST, port=settings.POWER_TCP_SIMULATOR_PORT,
+        ),
+    ]
+    return PowerManager(
+        {driver.name: driver for driver in drivers},
+        settings.power_driver_types,
+        settings.POWER_DEFAULT_DRIVER,
+    )
+
+power_manager = build_power_manager()
@@ -0,0 +1,79 @@
+"""
+Staggered power-on.
+
+Switching every device on at once can trip breakers with the combined inrush
+current, while starting them one at a time is far too slow. Devices are
+grouped by circuit (``power.circuit``, else their ``location``) and each
+circuit's devices are packed into waves whose combined
+``power_consumption.watts`` fits that circuit's budget. A circuit starts its
+next wave as soon as its previous wave is up; circuits do not wait for one
+another.
+"""
+
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+
+DEFAULT_CIRCUIT = "default"
+
+def circuit_of(device: Dict) -> str:
+    return (device.get("power") or {}).get("circuit") or device.get("location") or DEFAULT_CIRCUIT
+
+def watts_of(device: Dict, default_watts: int) -> int:
+    # Migration 003 creates power_consumption.watts as 0 until it is filled in
+    watts = (device.get("power_consumption") or {}).get("watts") or 0
+    return watts if watts > 0 else default_watts
+
+def plan_waves(
+    devices: List[Dict],
+    default_budget: int,
+    default_watts: int,
+    circuit_budgets: Optional[Dict[str, int]] = None,
+) -> Dict[str, List[List[Dict]]]:
+    """Pack each circuit's devices into as few waves as fit its wattage budget.
+
+    First-fit decreasing: the largest loads are placed first, each into the
+    earliest wave with room for it. A device drawing more than the whole
+    budget gets a wave of its own.
+    """
+    circuit_budgets = circuit_budgets or {}
+    by_circuit: Dict[str, List[Dict]] = {}
+    for device in devices:
+        by_circuit.setdefault(circuit_of(device), []).append(device)
+
+    plan = {}
+    for circuit, circuit_devices in by_circuit.items():
+        budget = circuit_budgets.get(circuit, default_budget)
+        waves: List[List[Dict]] = []
+        loads: List[int] = []
+        for device in sorted(circuit_devices, key=lambda d: (-watts_of(d, default_watts), d["deviceId"])):
+            watts = watts_of(device, default_watts)
+            for index, load in enumerate(loads):
+                if load + watts <= budget:
+                    waves[index].append(device)
+                    loads[index] += watts
+                    break
+            else:
+                waves.append([device])
+                loads.append(watts)
+        plan[circuit] = waves
+    return plan
+
+WaveCallback = Callable[[str, int, int, List[Dict]], Awaitable[None]]
+
+async def run_waves(
+    plan: Dict[str, List[List[Dict]]],
+    start_device: Callable[[Dict], Awaitable[None]],
+    on_wave_finished: Optional[WaveCallback] = None,
+):
+    """Start every circuit's waves in order, all circuits in parallel.
+
+    ``on_wave_finished(circuit, wave_number, wave_count, devices)`` is awaited
+    after each wave; ``start_device`` is expected to handle its own failures.
+    """
+    async def run_circuit(circuit: str, waves: List[List[Dict]]):
+        for number, wave in enumerate(waves, start=1):
+            await asyncio.gather(*(start_device(device) for device in wave))
+            if on_wave_finished is not None:
+                await on_wave_finished(circuit, number, len(waves), wave)
+
+    await asyncio.gather(*(run_circuit(circuit, waves) for circuit, waves in plan.items()))
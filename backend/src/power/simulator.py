@@ -0,0 +1,73 @@
+"""
+Local power simulator for testing the TCP driver.
+
+Speaks a line protocol: the client sends ``ON <deviceId>`` or
+``OFF <deviceId>`` and, after a simulated switching delay, gets back
+``OK <seconds>`` or ``ERR <message>``. Several commands may be sent over one
+connection.
+
+Run standalone with ``python -m src.power.simulator --port 9100``.
+"""
+
+from typing import Dict, Optional, Set
+import argparse
+import asyncio
+import random
+import time
+
+class PowerSimulator:
+    def __init__(self, delay: float = 0.5, jitter: float = 0.0, failing_devices: Optional[Set[str]] = None):
+        self.delay = delay
+        self.jitter = jitter
+        self.failing_devices = failing_devices or set()
+        self.states: Dict[str, str] = {}
+        self.connections = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start listening and return the bound port"""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while line := await reader.readline():
+                writer.write((await self._command(line.decode().strip()) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _command(self, line: str) -> str:
+        action, _, device_id = line.partition(" ")
+        if action not in ("ON", "OFF") or not device_id:
+            return f"ERR unknown command {line!r}"
+        started = time.perf_counter()
+        await asyncio.sleep(self.delay + random.uniform(0, self.jitter))
+        if device_id in self.failing_devices:
+            return f"ERR {device_id} did not respond"
+        self.states[device_id] = action.lower()
+        return f"OK {time.perf_counter() - started:.3f}"
+
+async def _serve(host: str, port: int, delay: float, jitter: float):
+    simulator = PowerSimulator(delay=delay, jitter=jitter)
+    bound_port = await simulator.start(host, port)
+    print(f"Power simulator listening on {host}:{bound_port}")
+    await asyncio.Event().wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local power simulator for the tcp_simulator driver")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--delay", type=float, default=0.5, help="Seconds each power command takes")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay, up to this many seconds")
+    args = parser.parse_args()
+    asyncio.run(_serve(args.host, args.port, args.delay, args.jitter))
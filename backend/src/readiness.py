@@ -0,0 +1,158 @@
+"""
+Materialized checklist readiness.
+
+Shutdown validation only needs to know how many critical checklist items
+exist, how many are complete and which are not. Those figures live in one
+document in ``checklistReadiness`` that the checklist router updates as it
+changes items, so validating before a shutdown is a single ``_id`` read.
+A periodic full recompute corrects any drift, e.g. from writes made
+outside the API, and reloads the checklist dependency graph likewise.
+"""
+
+from typing import Dict, Optional
+from datetime import datetime
+import asyncio
+import logging
+
+from pymongo.errors import DuplicateKeyError
+
+from src.checklist_graph import checklist_graph
+
+logger = logging.getLogger(__name__)
+
+READINESS_COLLECTION = "checklistReadiness"
+READINESS_ID = "critical"
+
+# Recompute attempts before giving up when checklist changes keep landing
+RECOMPUTE_ATTEMPTS = 5
+
+# Number of recomputes that found the stored aggregate out of date
+drift_corrections = 0
+
+def _is_critical(item: Optional[Dict]) -> bool:
+    return bool(item) and bool(item.get("isCritical", False))
+
+def _is_critical_and_done(item: Optional[Dict]) -> bool:
+    return _is_critical(item) and bool(item.get("completed", False))
+
+def _with_task(task_ids, task_id: str, present: bool) -> Dict:
+    """Pipeline expression for ``task_ids`` with ``task_id`` added or removed"""
+    # $literal keeps a taskId starting with "$" from being read as a field path
+    task = {"$literal": task_id}
+    if present:
+        return {"$cond": [{"$in": [task, task_ids]}, task_ids, {"$concatArrays": [task_ids, [task]]}]}
+    return {"$setDifference": [task_ids, [task]]}
+
+async def apply_item_change(db, before: Optional[Dict], after: Optional[Dict]):
+    """Fold one checklist item change into the readiness aggregate.
+
+    ``before`` and ``after`` are the item as it was and as it now is; either
+    is ``None`` for a create or a delete. The change sets the item's
+    membership of ``criticalTaskIds`` and ``incompleteTaskIds`` and the
+    counts are derived from those, so applying a change that a concurrent
+    recompute already saw leaves the aggregate unchanged.
+    """
+    task_id = (after or before)["taskId"]
+    critical = _is_critical(after)
+    incomplete = critical and not _is_critical_and_done(after)
+
+    update = [
+        {"$set": {
+            "criticalTaskIds": _with_task("$criticalTaskIds", task_id, critical),
+            "incompleteTaskIds": _with_task({"$ifNull": ["$incompleteTaskIds", []]}, task_id, incomplete),
+            # The version lets a concurrent recompute detect that it missed this change
+            "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]},
+            "updatedAt": datetime.utcnow(),
+        }},
+        {"$set": {
+            "criticalTotal": {"$size": "$criticalTaskIds"},
+            "criticalCompleted": {"$subtract": [{"$size": "$criticalTaskIds"}, {"$size": "$incompleteTaskIds"}]},
+        }},
+    ]
+    result = await db.get_collection(READINESS_COLLECTION).update_one(
+        {"_id": READINESS_ID, "criticalTaskIds": {"$type": "array"}}, update
+    )
+    if not result.matched_count:
+        # Missing, or stored before criticalTaskIds was kept: build it in full
+        await recompute_readiness(db)
+
+async def _aggregate_checklist(db) -> Dict:
+    pipeline = [
+        {"$match": {"isCritical": True}},
+        {"$sort": {"taskId": 1}},
+        {"$group": {
+            "_id": None,
+            "criticalTotal": {"$sum": 1},
+            "criticalCompleted": {"$sum": {"$cond": [{"$eq": ["$completed", True]}, 1, 0]}},
+            "criticalTaskIds": {"$push": "$taskId"},
+            "incompleteTaskIds": {"$push": {"$cond": [{"$eq": ["$completed", True]}, "$$REMOVE", "$taskId"]}},
+        }},
+    ]
+    result = await db.get_collection("checklist").aggregate(pipeline).to_list(length=1)
+    return result[0] if result else {"criticalTotal": 0, "criticalCompleted": 0, "criticalTaskIds": [], "incompleteTaskIds": []}
+
+async def recompute_readiness(db) -> Dict:
+    """Rebuild the aggregate from the checklist collection.
+
+    The rebuilt document only replaces the stored one if no change was
+    applied to it while the checklist was aggregated; otherwise the
+    aggregation is retried, so a recompute never undoes a concurrent change.
+    """
+    global drift_corrections
+    collection = db.get_collection(READINESS_COLLECTION)
+    for _ in range(RECOMPUTE_ATTEMPTS):
+        previous = await collection.find_one({"_id": READINESS_ID})
+        totals = await _aggregate_checklist(db)
+
+        now = datetime.utcnow()
+        readiness = {
+            "_id": READINESS_ID,
+            "criticalTotal": totals["criticalTotal"],
+            "criticalCompleted": totals["criticalCompleted"],
+            "criticalTaskIds": totals["criticalTaskIds"],
+            "incompleteTaskIds": totals["incompleteTaskIds"],
+            "version": (previous or {}).get("version", 0) + 1,
+            "updatedAt": now,
+            "recomputedAt": now,
+        }
+        if previous is None:
+            try:
+                await collection.insert_one(readiness)
+            except DuplicateKeyError:
+                continue
+            return readiness
+
+        # Aggregates stored before versioning have no version field
+        replaced = await collection.find_one_and_replace(
+            {"_id": READINESS_ID, "version": previous.get("version", {"$exists": False})}, readiness
+        )
+        if replaced is None:
+            continue
+        if (
+            previous.get("criticalTotal") != readiness["criticalTotal"]
+            or previous.get("criticalCompleted") != readiness["criticalCompleted"]
+            or sorted(previous.get("incompleteTaskIds", [])) != sorted(readiness["incompleteTaskIds"])
+        ):
+            drift_corrections += 1
+            logger.warning(f"Checklist readiness was out of date and has been recomputed: {readiness}")
+        return readiness
+
+    # The checklist kept changing; the incrementally maintained aggregate stays
+    logger.warning("Checklist readiness recompute skipped: the checklist changed during every attempt")
+    return await collection.find_one({"_id": READINESS_ID}) or readiness
+
+async def get_readiness(db) -> Dict:
+    """Read the aggregate, building it on first use"""
+    readiness = await db.get_collection(READINESS_COLLECTION).find_one({"_id": READINESS_ID})
+    if readiness is None:
+        readiness = await recompute_readiness(db)
+    return readiness
+
+async def run_periodic_recompute(db, interval_seconds: int):
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await recompute_readiness(db)
+            await checklist_graph.load(db)
+        except Exception as e:
+            logger.error(f"Checklist readiness recompute failed: {e}")
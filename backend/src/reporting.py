@@ -0,0 +1,253 @@
+"""
+Pre-aggregated shutdown statistics.
+
+Reports are built from rollup documents in ``shutdownStats`` instead of the
+raw shutdown logs. There is one document per granularity (hour and day),
+time bucket and dimension value: every device, every user, every status, and
+"all" for the overall totals. Each holds the number of shutdowns, how many
+succeeded and failed, and the summed duration of the successful ones.
+
+Rollups are updated whenever shutdown logs are written: the write-behind
+buffer reports every stored batch, and the batch is folded in with one
+``bulk_write`` of ``$inc`` upserts. A stats query over a year reads the
+daily documents for whole days and hourly ones only for partial days at the
+edges, so its cost depends on the number of buckets, not on the number of
+logs. History written before rollups existed, or rollups that drifted, are
+rebuilt with ``backfill_rollups`` (see ``scripts/backfill_shutdown_stats.py``),
+which reads archived days from the log archive.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+
+from src.write_behind import write_behind
+from src.archive import read_archived
+from src.log_storage import SHUTDOWN_LOGS, from_stored, log_projection
+
+STATS_COLLECTION = "shutdownStats"
+
+GRANULARITIES = ("hour", "day")
+DIMENSIONS = ("all", "device", "user", "status")
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _dimension_keys(log: Dict) -> Iterable[Tuple[str, str]]:
+    yield "all", "all"
+    yield "device", log.get("device") or "unknown"
+    yield "user", log.get("user") or "unknown"
+    yield "status", log.get("status") or "unknown"
+
+def _accumulate(totals: Dict[Tuple, Dict], log: Dict):
+    """Add one log to the in-memory rollups keyed by (granularity, bucket, dimension, key)"""
+    timestamp = log.get("timestamp")
+    if not isinstance(timestamp, datetime):
+        return
+    successful = log.get("status") == "success"
+    for granularity in GRANULARITIES:
+        bucket = bucket_start(timestamp, granularity)
+        for dimension, key in _dimension_keys(log):
+            rollup = totals.get((granularity, bucket, dimension, key))
+            if rollup is None:
+                rollup = totals[(granularity, bucket, dimension, key)] = {
+                    "count": 0, "successful": 0, "failed": 0, "durationTotal": 0.0,
+                }
+                if dimension == "user" and log.get("userName"):
+                    rollup["name"] = log["userName"]
+            rollup["count"] += 1
+            if successful:
+                rollup["successful"] += 1
+                rollup["durationTotal"] += log.get("duration") or 0
+            elif log.get("status") == "failed":
+                rollup["failed"] += 1
+
+def _rollup_id(granularity: str, bucket: datetime, dimension: str, key: str) -> str:
+    return f"{granularity}:{bucket.isoformat()}:{dimension}:{key}"
+
+def _rollup_document(rollup_key: Tuple, rollup: Dict) -> Dict:
+    granularity, bucket, dimension, key = rollup_key
+    return {
+        "_id": _rollup_id(*rollup_key),
+        "granularity": granularity,
+        "bucket": bucket,
+        "dimension": dimension,
+        "key": key,
+        **rollup,
+    }
+
+async def record_shutdown_logs(collection, logs: List[Dict]):
+    """Fold newly stored shutdown logs into the rollups.
+
+    ``collection`` is the shutdown log collection; the rollups live next to
+    it in the same database.
+    """
+    totals: Dict[Tuple, Dict] = {}
+    for log in logs:
+        _accumulate(totals, from_stored(log))
+    if not totals:
+        return
+
+    operations = []
+    for rollup_key, rollup in totals.items():
+        granularity, bucket, dimension, key = rollup_key
+        update = {
+            "$inc": {field: rollup[field] for field in ("count", "successful", "failed", "durationTotal")},
+            "$setOnInsert": {"granularity": granularity, "bucket": bucket, "dimension": dimension, "key": key},
+        }
+        if "name" in rollup:
+            update["$set"] = {"name": rollup["name"]}
+        operations.append(UpdateOne({"_id": _rollup_id(*rollup_key)}, update, upsert=True))
+    await collection.database.get_collection(STATS_COLLECTION).bulk_write(operations, ordered=False)
+
+# Every shutdown log write, buffered or not, goes through the write-behind buffer
+write_behind.on_written(SHUTDOWN_LOGS, record_shutdown_logs)
+
+async def backfill_rollups(db, start: datetime, end: datetime, include_today: bool = False) -> int:
+    """Rebuild the rollups of every whole day in [start, end) from the logs.
+
+    Logs moved to the archive by retention are read from there, so archived
+    days keep their statistics. Days are processed one at a time so memory
+    is bounded by one day's rollups. Returns the number of logs read.
+
+    A day's rollups are replaced after its logs are read, which would drop
+    the updates for logs written in between, so the current day (UTC) and
+    later are refused unless ``include_today`` is set with the API stopped.
+    """
+    stats = db.get_collection(STATS_COLLECTION)
+    day = bucket_start(start, "day")
+    today = bucket_start(datetime.utcnow(), "day")
+    if not include_today and end > today:
+        raise ValueError(
+            f"Refusing to backfill {today.date()} or later while shutdown logs may still be written; "
+            f"stop the API and pass include_today"
+        )
+    logs_read = 0
+    while day < end:
+        next_day = day + timedelta(days=1)
+        totals: Dict[Tuple, Dict] = {}
+        stored_ids = set()
+        cursor = db.get_collection(SHUTDOWN_LOGS).find(
+            {"timestamp": {"$gte": day, "$lt": next_day}},
+            projection=log_projection(["timestamp", "device", "user", "userName", "status", "duration"])
+        )
+        async for log in cursor:
+            stored_ids.add(log["_id"])
+            _accumulate(totals, from_stored(log))
+            logs_read += 1
+
+        # The day's archive partition; an interrupted retention run can leave
+        # logs both archived and stored
+        archived = read_archived(SHUTDOWN_LOGS, lambda log: log["_id"] not in stored_ids, day, day)
+        async for log in archived:
+            _accumulate(totals, log)
+            logs_read += 1
+
+        await stats.delete_many({"granularity": {"$in": list(GRANULARITIES)}, "bucket": {"$gte": day, "$lt": next_day}})
+        if totals:
+            await stats.insert_many(
+                [_rollup_document(rollup_key, rollup) for rollup_key, rollup in totals.items()], ordered=False
+            )
+        day = next_day
+    return logs_read
+
+def _ceil(timestamp: datetime, granularity: str) -> datetime:
+    floor = bucket_start(timestamp, granularity)
+    if floor == timestamp:
+        return floor
+    return floor + (timedelta(hours=1) if granularity == "hour" else timedelta(days=1))
+
+def bucket_ranges(start: Optional[datetime], end: Optional[datetime]) -> List[Dict]:
+    """Rollup filters covering [start, end): daily buckets for whole days, hourly at the edges.
+
+    Bounds are widened to whole hours, the rollups' finest resolution.
+    """
+    start = bucket_start(start, "hour") if start else None
+    end = _ceil(end, "hour") if end else None
+    first_day = _ceil(start, "day") if start else None
+    last_day = bucket_start(end, "day") if end else None
+
+    def bucket_filter(granularity: str, low: Optional[datetime], high: Optional[datetime]) -> Dict:
+        bounds = {}
+        if low is not None:
+            bounds["$gte"] = low
+        if high is not None:
+            bounds["$lt"] = high
+        query = {"granularity": granularity}
+        if bounds:
+            query["bucket"] = bounds
+        return query
+
+    if first_day and last_day and first_day >= last_day:
+        return [bucket_filter("hour", start, end)] if start < end else []
+    ranges = [bucket_filter("day", first_day, last_day)]
+    if start and start < first_day:
+        ranges.append(bucket_filter("hour", start, first_day))
+    if end and last_day < end:
+        ranges.append(bucket_filter("hour", last_day, end))
+    return ranges
+
+async def get_shutdown_stats(db, start: Optional[datetime] = None, end: Optional[datetime] = None, top: int = 10) -> Dict:
+    """Summarise shutdowns in [start, end) from the rollups"""
+    ranges = bucket_ranges(start, end)
+    if not ranges:
+        totals = []
+    else:
+        pipeline = [
+            {"$match": {"$or": ranges}},
+            # $last then takes the name from the newest bucket
+            {"$sort": {"bucket": 1}},
+            {"$group": {
+                "_id": {"dimension": "$dimension", "key": "$key"},
+                "count": {"$sum": "$count"},
+                "successful": {"$sum": "$successful"},
+                "failed": {"$sum": "$failed"},
+                "durationTotal": {"$sum": "$durationTotal"},
+                "name": {"$last": "$name"},
+            }},
+        ]
+        totals = await db.get_collection(STATS_COLLECTION).aggregate(pipeline).to_list(length=None)
+
+    by_dimension: Dict[str, List[Dict]] = {dimension: [] for dimension in DIMENSIONS}
+    for total in totals:
+        by_dimension[total["_id"]["dimension"]].append(total)
+
+    def average_duration(total: Dict) -> float:
+        return round(total["durationTotal"] / total["successful"], 2) if total["successful"] else 0
+
+    overall = by_dimension["all"][0] if by_dimension["all"] else {"count": 0, "successful": 0, "failed": 0, "durationTotal": 0}
+    users = sorted(by_dimension["user"], key=lambda total: (-total["count"], total["_id"]["key"]))[:top]
+    devices = sorted(by_dimension["device"], key=lambda total: (-total["count"], total["_id"]["key"]))[:top]
+
+    device_ids = [total["_id"]["key"] for total in devices]
+    names = {
+        device["deviceId"]: device.get("name")
+        async for device in db.get_collection("devices").find(
+            {"deviceId": {"$in": device_ids}}, projection={"deviceId": 1, "name": 1}
+        )
+    }
+
+    return {
+        "total_shutdowns": overall["count"],
+        "successful_shutdowns": overall["successful"],
+        "failed_shutdowns": overall["failed"],
+        "success_rate": round(overall["successful"] / overall["count"] * 100, 2) if overall["count"] else 0,
+        "average_duration": average_duration(overall),
+        "by_status": {total["_id"]["key"]: total["count"] for total in by_dimension["status"]},
+        "most_active_users": [
+            {"user_id": total["_id"]["key"], "username": total.get("name"), "shutdown_count": total["count"]}
+            for total in users
+        ],
+        "device_statistics": [
+            {
+                "device_id": total["_id"]["key"],
+                "device_name": names.get(total["_id"]["key"]),
+                "shutdown_count": total["count"],
+                "average_duration": average_duration(total),
+            }
+            for total in devices
+        ],
+    }
@@ -0,0 +1,68 @@
+"""
+Fast JSON serialization for MongoDB documents.
+
+Each response model gets a codec that maps raw BSON documents straight to
+JSON bytes with orjson. ObjectId and datetime values are encoded natively,
+so handlers no longer convert ``_id`` and timestamps by hand, and FastAPI
+does not re-validate and re-encode the result.
+"""
+
+from typing import Any, Dict, Iterable, Type
+from fastapi import Response
+from pydantic import BaseModel
+from bson import ObjectId
+import orjson
+
+from config.settings import settings
+from src.models.device import DeviceResponse
+from src.models.checklist import ChecklistResponse
+from src.models.shutdown import ShutdownResponse
+from src.models.user import UserResponse
+from src.models.job import JobResponse
+
+def _default(value: Any):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps(data: Any) -> bytes:
+    """Serialize data that may contain ObjectId and datetime values"""
+    return orjson.dumps(data, default=_default)
+
+class ModelCodec:
+    """Projects raw documents onto the fields of a response model"""
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self._fields = []
+        for name, field in model.model_fields.items():
+            key = field.alias or name
+            source = "_id" if key == "_id" else name
+            default = None if field.is_required() else field.get_default(call_default_factory=True)
+            self._fields.append((key, source, default))
+
+    def to_dict(self, document: Dict) -> Dict:
+        item = {key: document.get(source, default) for key, source, default in self._fields}
+        if settings.VALIDATE_RESPONSES:
+            self.model.model_validate(
+                {key: str(value) if isinstance(value, ObjectId) else value for key, value in item.items()}
+            )
+        return item
+
+    def dumps(self, document: Dict) -> bytes:
+        return dumps(self.to_dict(document))
+
+    def dumps_many(self, documents: Iterable[Dict]) -> bytes:
+        return dumps([self.to_dict(document) for document in documents])
+
+    def response(self, document: Dict, status_code: int = 200) -> Response:
+        return Response(content=self.dumps(document), status_code=status_code, media_type="application/json")
+
+    def list_response(self, documents: Iterable[Dict]) -> Response:
+        return Response(content=self.dumps_many(documents), media_type="application/json")
+
+device_codec = ModelCodec(DeviceResponse)
+checklist_codec = ModelCodec(ChecklistResponse)
+shutdown_log_codec = ModelCodec(ShutdownResponse)
+user_codec = ModelCodec(UserResponse)
+job_codec = ModelCodec(JobResponse)
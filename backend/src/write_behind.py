@@ -0,0 +1,222 @@
+"""
+Write-behind buffer for append-only records.
+
+Shutdown logs (and other insert-only records such as audit events) are not
+read back by the request that creates them, so they do not have to be
+written one ``insert_one`` at a time. The buffer collects them per
+collection and writes each collection's backlog with a single unordered
+``insert_many`` once ``batch_size`` documents are waiting or every
+``flush_interval`` seconds, whichever comes first.
+
+Callers that must know the record is stored pass ``wait=True`` (or enable
+``WRITE_BEHIND_WAIT_FOR_FLUSH``) and are resumed once their batch is
+written. Anything still buffered is flushed when the server stops. Until the
+buffer is started, e.g. in scripts and tests, inserts are written
+immediately.
+
+A batch that fails with a connection error (e.g. ``AutoReconnect`` or
+``NetworkTimeout``) is kept and written again on each following flush, up to
+``max_retries`` times; its documents only count as failed once those are
+used up, or straight away for any other error. A retried batch keeps its
+``_id``s, so documents the failed attempt did store are recognised by their
+duplicate-key errors and not lost or written twice.
+
+Listeners registered with ``on_written`` are given every batch that was
+stored, e.g. to keep aggregates of the records up to date.
+"""
+
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+import asyncio
+import logging
+
+from pymongo.errors import BulkWriteError, ConnectionFailure
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+WrittenListener = Callable[[object, List[Dict]], Awaitable[None]]
+
+class _Batch:
+    """Documents waiting for one collection, plus the callers waiting on them"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.documents: List[Dict] = []
+        self.waiters: List[asyncio.Future] = []
+        self.attempts = 0
+
+class WriteBehindBuffer:
+    def __init__(self, batch_size: int, flush_interval: float, wait_for_flush: bool = False, max_retries: int = 3):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.wait_for_flush = wait_for_flush
+        self.max_retries = max_retries
+        self._pending: Dict[str, _Batch] = {}
+        self._pending_count = 0
+        # Batches that failed with a connection error, written first on the next flush
+        self._retrying: List[_Batch] = []
+        self._flush_now: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._listeners: Dict[str, List[WrittenListener]] = {}
+        self.buffered = 0
+        self.written = 0
+        self.failed = 0
+        self.retries = 0
+        self.flushes = 0
+
+    def on_written(self, collection_name: str, listener: WrittenListener):
+        """Call ``listener(collection, documents)`` with each batch stored in ``collection_name``"""
+        self._listeners.setdefault(collection_name, []).append(listener)
+
+    async def _notify(self, collection, documents: List[Dict]):
+        for listener in self._listeners.get(collection.name, ()):
+            try:
+                await listener(collection, documents)
+            except Exception as e:
+                logger.error(f"Write-behind listener for {collection.name} failed: {e}")
+
+    def start(self):
+        self._closing = False
+        self._flush_now = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write everything still buffered"""
+        if self._task is None:
+            return
+        self._closing = True
+        self._flush_now.set()
+        await self._task
+        self._task = None
+        # Anything added while the last flush was in progress
+        await self.flush()
+
+    async def insert(self, collection, documents: Union[Dict, List[Dict]], wait: Optional[bool] = None):
+        """Queue ``documents`` for ``collection``.
+
+        With ``wait`` (default ``WRITE_BEHIND_WAIT_FOR_FLUSH``) this returns
+        only after the batch holding them is written, and raises if that
+        write failed.
+        """
+        documents = documents if isinstance(documents, list) else [documents]
+        if not documents:
+            return
+        if self._task is None:
+            await collection.insert_many(documents, ordered=False)
+            await self._notify(collection, documents)
+            return
+
+        batch = self._pending.get(collection.name)
+        if batch is None:
+            batch = self._pending[collection.name] = _Batch(collection)
+        batch.documents.extend(documents)
+        self._pending_count += len(documents)
+        self.buffered += len(documents)
+
+        waiter = None
+        if self.wait_for_flush if wait is None else wait:
+            waiter = asyncio.get_running_loop().create_future()
+            batch.waiters.append(waiter)
+
+        if self._pending_count >= self.batch_size:
+            self._flush_now.set()
+        if waiter is not None:
+            await waiter
+
+    async def flush(self):
+        """Write every buffered batch now"""
+        retrying, self._retrying = self._retrying, []
+        pending, self._pending = self._pending, {}
+        self._pending_count = 0
+        for batch in retrying + list(pending.values()):
+            await self._write(batch)
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Write-behind flush failed: {e}")
+
+    async def _write(self, batch: _Batch):
+        count = len(batch.documents)
+        stored = batch.documents
+        error: Optional[Exception] = None
+        batch.attempts += 1
+        try:
+            await batch.collection.insert_many(batch.documents, ordered=False)
+            self.written += count
+        except BulkWriteError as e:
+            # Unordered: every document without its own error was still inserted
+            write_errors = e.details.get("writeErrors", [])
+            if batch.attempts > 1:
+                # Stored by an earlier attempt whose reply was lost
+                write_errors = [
+                    write_error for write_error in write_errors
+                    if not (write_error.get("code") == 11000 and "_id" in (write_error.get("keyPattern") or {}))
+                ]
+            failed_indexes = {write_error["index"] for write_error in write_errors}
+            stored = [document for index, document in enumerate(batch.documents) if index not in failed_indexes]
+            self.written += len(stored)
+            if failed_indexes:
+                self.failed += len(failed_indexes)
+                error = e
+                logger.error(f"Write-behind insert into {batch.collection.name} lost {len(failed_indexes)} of {count} documents: {e}")
+        except ConnectionFailure as e:
+            if batch.attempts <= self.max_retries and not self._closing:
+                self.retries += 1
+                self._retrying.append(batch)
+                logger.warning(
+                    f"Write-behind insert into {batch.collection.name} failed, retrying {count} documents "
+                    f"on the next flush (attempt {batch.attempts} of {self.max_retries + 1}): {e}"
+                )
+                return
+            self.failed += count
+            stored = []
+            error = e
+            logger.error(f"Write-behind insert into {batch.collection.name} lost {count} documents after {batch.attempts} attempts: {e}")
+        except Exception as e:
+            self.failed += count
+            stored = []
+            error = e
+            logger.error(f"Write-behind insert into {batch.collection.name} lost {count} documents: {e}")
+        self.flushes += 1
+        if stored:
+            await self._notify(batch.collection, stored)
+
+        for waiter in batch.waiters:
+            if waiter.done():
+                continue
+            if error is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(error)
+
+    def get_stats(self) -> Dict:
+        return {
+            "running": self._task is not None,
+            "batchSize": self.batch_size,
+            "flushIntervalSeconds": self.flush_interval,
+            "waitForFlush": self.wait_for_flush,
+            "pending": self._pending_count,
+            "retrying": sum(len(batch.documents) for batch in self._retrying),
+            "retries": self.retries,
+            "buffered": self.buffered,
+            "written": self.written,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
+
+write_behind = WriteBehindBuffer(
+    batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+    flush_interval=settings.WRITE_BEHIND_FLUSH_SECONDS,
+    wait_for_flush=settings.WRITE_BEHIND_WAIT_FOR_FLUSH,
+    max_retries=settings.WRITE_BEHIND_MAX_RETRIES,
+)
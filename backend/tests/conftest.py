@@ -15,6 +15,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from main import app
 from config.settings import settings
 from config.database import db
+from src.checklist_graph import checklist_graph
 
 # Test Database Configuration
 TEST_MONGODB_URL = "mongodb://localhost:27017"
@@ -74,6 +75,8 @@ async def clean_database(test_db):
     collections = await test_db.list_collection_names()
     for collection_name in collections:
         await test_db[collection_name].delete_many({})
+    # Tests write to the checklist directly, so rebuild the graph on next use
+    checklist_graph.reset()
     yield test_db
 
 # Test Data Fixtures
@@ -0,0 +1,147 @@
+"""
+Test cases for log retention and the cold archive.
+Tests moving old logs to archive files and reading them back through the API.
+"""
+
+import json
+import pytest
+from datetime import datetime, timedelta
+
+from config.settings import settings
+from src import archive
+from src.api.v1.shutdown_logs.router import export_shutdown_logs, read_shutdown_logs
+from src.log_storage import TIMESERIES_OPTIONS, to_stored
+
+USER = {"sub": "testuser", "role": "Engineer"}
+
+def make_log(log_id, days_ago):
+    timestamp = datetime.utcnow() - timedelta(days=days_ago)
+    return {"logId": log_id, "device": "TEST-001", "user": "testuser", "userName": "testuser", "status": "success", "timestamp": timestamp, "duration": 1.0}
+
+async def read_export(response):
+    return b"".join([chunk async for chunk in response.body_iterator]).decode()
+
+@pytest.fixture
+def retention(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "LOG_ARCHIVE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "LOG_RETENTION_DAYS", 30)
+    monkeypatch.setattr(settings, "LOG_ARCHIVE_BATCH_SIZE", 2)
+    return tmp_path
+
+class TestLogRetention:
+    """Test moving logs past the retention window to the archive."""
+
+    @pytest.mark.asyncio
+    async def test_old_logs_archived_and_deleted(self, clean_database, retention):
+        """Test that only whole days past the window leave MongoDB, into daily partitions."""
+        await clean_database.shutdownLogs.insert_many([make_log(f"log-{days}", days) for days in (1, 29, 40, 41, 41, 90)])
+        await clean_database.audit_logs.insert_many([{"action": "login", "timestamp": datetime.utcnow() - timedelta(days=days)} for days in (5, 60)])
+
+        report = await archive.apply_retention(clean_database)
+
+        assert report["collections"]["shutdownLogs"] == {"archived": 4, "deleted": 4}
+        assert report["collections"]["audit_logs"] == {"archived": 1, "deleted": 1}
+        remaining = await clean_database.shutdownLogs.distinct("logId")
+        assert sorted(remaining) == ["log-1", "log-29"]
+        assert len(archive.archived_days("shutdownLogs")) == 3
+
+    @pytest.mark.asyncio
+    async def test_interrupted_run_not_archived_twice(self, clean_database, retention):
+        """Test that documents already archived but not yet deleted are only deleted."""
+        await clean_database.shutdownLogs.insert_many([make_log("log-old", 40)])
+        await archive.apply_retention(clean_database)
+        day = archive.archived_days("shutdownLogs")[0]
+        await clean_database.shutdownLogs.insert_many(archive._load_day("shutdownLogs", day))
+
+        report = await archive.apply_retention(clean_database)
+
+        assert report["collections"]["shutdownLogs"] == {"archived": 0, "deleted": 1}
+        assert len(archive._load_day("shutdownLogs", day)) == 1
+
+    @pytest.mark.asyncio
+    async def test_timeseries_layout_archived(self, clean_database, retention, monkeypatch):
+        """Test that retention deletes from a time-series shutdownLogs and archives the logs flat."""
+        build_info = await clean_database.command("buildInfo")
+        if build_info["versionArray"][0] < archive.TIMESERIES_DELETE_MIN_VERSION:
+            pytest.skip("deletes by _id from time-series collections need MongoDB 7.0")
+        monkeypatch.setattr(settings, "SHUTDOWN_LOGS_TIMESERIES", True)
+        await clean_database.drop_collection("shutdownLogs")
+        await clean_database.create_collection("shutdownLogs", timeseries=TIMESERIES_OPTIONS)
+        try:
+            await clean_database.shutdownLogs.insert_many([to_stored(make_log(f"log-{days}", days)) for days in (1, 40, 41)])
+
+            report = await archive.apply_retention(clean_database)
+
+            assert report["collections"]["shutdownLogs"] == {"archived": 2, "deleted": 2}
+            assert await clean_database.shutdownLogs.distinct("meta.device") == ["TEST-001"]
+            assert await clean_database.shutdownLogs.count_documents({}) == 1
+            archived = archive._load_day("shutdownLogs", archive.archived_days("shutdownLogs")[0])
+            assert archived[0]["device"] == "TEST-001" and "meta" not in archived[0]
+        finally:
+            # Later tests expect a regular collection
+            await clean_database.drop_collection("shutdownLogs")
+
+    @pytest.mark.asyncio
+    async def test_timeseries_retention_refused_before_7(self, retention, monkeypatch):
+        """Test that retention archives nothing when the server cannot delete from a time-series collection."""
+        monkeypatch.setattr(settings, "SHUTDOWN_LOGS_TIMESERIES", True)
+
+        class OldServer:
+            async def command(self, name):
+                return {"version": "6.0.5", "versionArray": [6, 0, 5, 0]}
+
+        class Collection:
+            database = OldServer()
+
+        class Database:
+            def get_collection(self, name):
+                return Collection()
+
+        with pytest.raises(archive.RetentionUnsupportedError):
+            await archive.apply_retention(Database())
+        assert archive.archived_days("shutdownLogs") == []
+
+class TestArchivedReads:
+    """Test that archived logs are still listed and exported."""
+
+    @pytest.mark.asyncio
+    async def test_list_and_export_merge_archive(self, clean_database, retention):
+        """Test that pages continue from stored logs into archived days, newest first."""
+        await clean_database.shutdownLogs.insert_many([make_log(f"log-{days}", days) for days in (1, 2, 40, 50, 60)])
+        await archive.apply_retention(clean_database)
+
+        response = await read_shutdown_logs(limit=3, db=clean_database, current_user=USER)
+        assert [log["logId"] for log in json.loads(response.body)] == ["log-1", "log-2", "log-40"]
+
+        next_page = await read_shutdown_logs(limit=3, cursor=response.headers["X-Next-Cursor"], db=clean_database, current_user=USER)
+        assert [log["logId"] for log in json.loads(next_page.body)] == ["log-50", "log-60"]
+        assert "X-Next-Cursor" not in next_page.headers
+
+        start_date = (datetime.utcnow() - timedelta(days=55)).isoformat()
+        end_date = (datetime.utcnow() - timedelta(days=30)).isoformat()
+        export = await export_shutdown_logs(format="csv", start_date=start_date, end_date=end_date, db=clean_database, current_user=USER)
+        assert [line.split(",")[0] for line in (await read_export(export)).splitlines()[1:]] == ["log-40", "log-50"]
+
+    @pytest.mark.asyncio
+    async def test_timezone_aware_dates_accepted(self, clean_database, retention):
+        """Test that dates with a UTC offset filter archived logs instead of failing."""
+        await clean_database.shutdownLogs.insert_many([make_log(f"log-{days}", days) for days in (1, 40)])
+        await archive.apply_retention(clean_database)
+
+        start_date = (datetime.utcnow() - timedelta(days=45)).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+        response = await read_shutdown_logs(limit=100, start_date=start_date, db=clean_database, current_user=USER)
+
+        assert response.status_code == 200
+        assert [log["logId"] for log in json.loads(response.body)] == ["log-1", "log-40"]
+
+    @pytest.mark.asyncio
+    async def test_export_skips_logs_still_stored(self, clean_database, retention):
+        """Test that logs left both archived and stored by an interrupted run are exported once."""
+        await clean_database.shutdownLogs.insert_many([make_log(f"log-{days}", days) for days in (1, 40)])
+        await archive.apply_retention(clean_database)
+        day = archive.archived_days("shutdownLogs")[0]
+        await clean_database.shutdownLogs.insert_many(archive._load_day("shutdownLogs", day))
+
+        export = await export_shutdown_logs(format="csv", db=clean_database, current_user=USER)
+
+        assert [line.split(",")[0] for line in (await read_export(export)).splitlines()[1:]] == ["log-1", "log-40"]
@@ -3,9 +3,14 @@ Test cases for authentication endpoints.
 Tests user registration, login, JWT token validation, and role-based access.
 """
 
+import asyncio
+import time
 import pytest
+from fastapi import HTTPException
 from httpx import AsyncClient
 
+from src.auth.password_utils import PasswordHashExecutor, password_hasher
+
 class TestAuthRegistration:
     """Test user registration functionality."""
     
@@ -122,6 +127,7 @@ class TestAuthLogin:
         
         assert response.status_code == 401
         assert "incorrect username or password" in response.json()["detail"]["message"].lower()
+        assert response.headers["WWW-Authenticate"] == "Bearer"
     
     @pytest.mark.asyncio
     async def test_login_inactive_user(self, async_client: AsyncClient, clean_database, sample_user_data):
@@ -145,6 +151,18 @@ class TestAuthLogin:
         
         assert response.status_code == 400
         assert "inactive user" in response.json()["detail"]["message"].lower()
+    
+    @pytest.mark.asyncio
+    async def test_login_rejected_when_hashing_pool_saturated(self, async_client: AsyncClient, clean_database, monkeypatch):
+        """Test that logins beyond the password hashing queue get 503 with Retry-After."""
+        # Stored directly: the login is rejected before the hash is checked
+        await clean_database.users.insert_one({"name": "engineer1", "password": "not-checked", "role": "Engineer"})
+        monkeypatch.setattr(password_hasher, "_pending", password_hasher.max_workers + password_hasher.max_queue)
+        
+        response = await async_client.post("/api/v1/auth/login", json={"username": "engineer1", "password": "secret"})
+        
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
 
 class TestAuthProtectedRoutes:
     """Test protected routes and JWT token validation."""
@@ -250,4 +268,25 @@ class TestAuthRoleBasedAccess:
         response = await async_client.get("/api/v1/devices", headers=auth_headers_user)
         
         assert response.status_code == 200
-        assert isinstance(response.json(), list)
\ No newline at end of file
+        assert isinstance(response.json(), list)
+
+class TestPasswordHashExecutor:
+    """Test the bounded password hashing pool."""
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_keeps_slot_until_work_finishes(self):
+        """Test that hashing abandoned by its caller still counts against the queue bound while it runs."""
+        executor = PasswordHashExecutor(max_workers=1, max_queue=0)
+        running = asyncio.create_task(executor.run(time.sleep, 0.3))
+        await asyncio.sleep(0.05)
+        
+        running.cancel()
+        await asyncio.sleep(0.05)
+        assert executor.get_stats()["inFlight"] == 1
+        with pytest.raises(HTTPException) as exc_info:
+            await executor.run(time.sleep, 0)
+        assert exc_info.value.status_code == 503
+        
+        await asyncio.sleep(0.4)
+        assert executor.get_stats()["inFlight"] == 0
+        executor.shutdown()
@@ -1,12 +1,23 @@
 """
 Test cases for checklist management endpoints.
-Tests CRUD operations for checklist items and completion tracking.
+Tests CRUD operations for checklist items, completion tracking and
+dependency ordering.
 """
 
+import asyncio
+import json
 import pytest
+from types import SimpleNamespace
+from fastapi import HTTPException
 from httpx import AsyncClient
 from conftest import create_test_checklist_item, assert_checklist_response
 
+from src.api.v1.checklist.router import read_next_checklist_items, update_checklist_item
+from src.checklist_graph import ChecklistGraph
+from src.models.checklist import ChecklistUpdate
+
+USER = {"sub": "engineer1", "role": "Engineer"}
+
 class TestChecklistCreation:
     """Test checklist item creation functionality."""
     
@@ -356,4 +367,64 @@ class TestChecklistValidationLogic:
         # This should succeed
         assert response.status_code == 200
         data = response.json()
-        assert data["completed"] == True
\ No newline at end of file
+        assert data["completed"] == True
+
+class TestChecklistDependencies:
+    """Test dependency ordering and next actionable tasks."""
+
+    @pytest.mark.asyncio
+    async def test_out_of_order_completion_rejected(self, clean_database):
+        """Test that a task cannot be completed before its dependencies."""
+        await create_test_checklist_item(clean_database, {"taskId": "BACKUP-001", "description": "Back up data", "category": "backup", "isCritical": True, "completed": False})
+        await create_test_checklist_item(clean_database, {"taskId": "NETWORK-001", "description": "Disconnect network", "category": "network", "isCritical": True, "completed": False, "dependencies": ["BACKUP-001"]})
+
+        with pytest.raises(HTTPException) as error:
+            await update_checklist_item("NETWORK-001", ChecklistUpdate(completed=True), db=clean_database, current_user=USER)
+
+        assert error.value.status_code == 400
+        assert error.value.detail["blockedBy"] == ["BACKUP-001"]
+
+        response = await update_checklist_item("BACKUP-001", ChecklistUpdate(completed=True), db=clean_database, current_user=USER)
+        assert response.status_code == 200
+        response = await update_checklist_item("NETWORK-001", ChecklistUpdate(completed=True), db=clean_database, current_user=USER)
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_next_actionable_tasks(self, clean_database):
+        """Test that completing a task unlocks its dependents, highest priority first."""
+        await create_test_checklist_item(clean_database, {"taskId": "SAFETY-001", "description": "Notify staff", "category": "safety", "isCritical": True, "completed": False, "priority": 2})
+        await create_test_checklist_item(clean_database, {"taskId": "SECURITY-001", "description": "Lock racks", "category": "security", "isCritical": True, "completed": False, "priority": 1})
+        await create_test_checklist_item(clean_database, {"taskId": "BACKUP-001", "description": "Back up data", "category": "backup", "isCritical": True, "completed": False, "priority": 4, "dependencies": ["SAFETY-001"]})
+
+        response = await read_next_checklist_items(limit=10, db=clean_database, current_user=USER)
+        assert [item["taskId"] for item in json.loads(response.body)] == ["SAFETY-001", "SECURITY-001"]
+
+        await update_checklist_item("SAFETY-001", ChecklistUpdate(completed=True), db=clean_database, current_user=USER)
+
+        response = await read_next_checklist_items(limit=10, db=clean_database, current_user=USER)
+        assert [item["taskId"] for item in json.loads(response.body)] == ["BACKUP-001", "SECURITY-001"]
+
+    @pytest.mark.asyncio
+    async def test_completion_during_graph_load_kept(self, clean_database):
+        """Test that a completion applied while the graph reads the checklist is not lost."""
+        backup = await create_test_checklist_item(clean_database, {"taskId": "BACKUP-001", "description": "Back up data", "category": "backup", "isCritical": True, "completed": False})
+        await create_test_checklist_item(clean_database, {"taskId": "NETWORK-001", "description": "Disconnect network", "category": "network", "isCritical": True, "completed": False, "dependencies": ["BACKUP-001"]})
+        read, release = asyncio.Event(), asyncio.Event()
+
+        async def find_before_completion(*args, **kwargs):
+            items = [item async for item in clean_database.checklist.find(*args, **kwargs)]
+            read.set()
+            await release.wait()
+            for item in items:
+                yield item
+        slow_database = SimpleNamespace(get_collection=lambda name: SimpleNamespace(find=find_before_completion))
+
+        graph = ChecklistGraph()
+        loading = asyncio.create_task(graph.ensure_loaded(slow_database))
+        await read.wait()
+        graph.apply_item_change(backup, {**backup, "completed": True})
+        release.set()
+        await loading
+
+        assert graph.unmet_dependencies("NETWORK-001") == []
+        assert graph.next_actionable() == ["NETWORK-001"]
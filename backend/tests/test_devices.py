@@ -3,10 +3,24 @@ Test cases for device management endpoints.
 Tests CRUD operations for devices with proper authentication and authorization.
 """
 
+import json
+from datetime import datetime
+
 import pytest
+from fastapi import HTTPException
 from httpx import AsyncClient
 from conftest import create_test_device, assert_device_response
 
+from src.api.v1.auth.router import update_profile
+from src.api.v1.devices.router import create_device, read_my_devices
+from src.api.v1.shutdown.router import initiate_shutdown
+from src.api.v1.users.router import assign_devices_to_user
+from src.jobs import job_manager
+from src.models.device import DeviceCreate
+from src.models.user import UserProfileUpdate
+
+ADMIN = {"sub": "admin", "role": "Admin"}
+
 class TestDeviceCreation:
     """Test device creation functionality."""
     
@@ -318,4 +332,79 @@ class TestDeviceAssignment:
         
         assert response.status_code == 200
         data = response.json()
-        assert str(user["_id"]) not in data.get("assignedUsers", [])
\ No newline at end of file
+        assert str(user["_id"]) not in data.get("assignedUsers", [])
+    
+    @pytest.mark.asyncio
+    async def test_bulk_assign_devices_updates_assigned_users(self, clean_database, sample_user_data):
+        """Test that bulk assignment mirrors the user onto devices and drops stale assignments."""
+        from conftest import create_test_user
+        user = await create_test_user(clean_database, {**sample_user_data, "name": "engineer1"})
+        for device_id in ["DEV-001", "DEV-002", "DEV-003"]:
+            await create_test_device(clean_database, {"deviceId": device_id, "name": device_id, "status": "on", "type": "server", "location": "Rack A", "assignedUsers": []})
+        
+        await assign_devices_to_user(str(user["_id"]), ["DEV-001", "DEV-002"], db=clean_database, current_user=ADMIN)
+        await assign_devices_to_user(str(user["_id"]), ["DEV-002", "DEV-003"], db=clean_database, current_user=ADMIN)
+        
+        assigned = {device["deviceId"]: device["assignedUsers"] async for device in clean_database.devices.find()}
+        assert assigned == {"DEV-001": [], "DEV-002": ["engineer1"], "DEV-003": ["engineer1"]}
+    
+    @pytest.mark.asyncio
+    async def test_bulk_assign_unknown_device_rejected(self, clean_database, sample_device_data, sample_user_data):
+        """Test that bulk assignment fails if any device does not exist."""
+        from conftest import create_test_user
+        user = await create_test_user(clean_database, {**sample_user_data, "name": "engineer1"})
+        await create_test_device(clean_database, sample_device_data)
+        
+        with pytest.raises(HTTPException) as error:
+            await assign_devices_to_user(str(user["_id"]), ["TEST-001", "MISSING-001"], db=clean_database, current_user=ADMIN)
+        
+        assert error.value.status_code == 404
+        assert "MISSING-001" in error.value.detail
+
+class TestMyDevices:
+    """Test the caller-scoped device list."""
+    
+    @pytest.mark.asyncio
+    async def test_my_devices_only_returns_assigned(self, clean_database):
+        """Test that /devices/mine only returns devices assigned to the caller."""
+        await create_test_device(clean_database, {"deviceId": "DEV-001", "name": "Mine", "status": "on", "type": "server", "location": "Rack A", "assignedUsers": ["engineer1"]})
+        await create_test_device(clean_database, {"deviceId": "DEV-002", "name": "Other", "status": "on", "type": "server", "location": "Rack B", "assignedUsers": ["someone-else"]})
+        
+        response = await read_my_devices(limit=100, cursor=None, db=clean_database, current_user={"sub": "engineer1", "role": "Engineer"})
+        
+        assert response.status_code == 200
+        assert [device["deviceId"] for device in json.loads(response.body)] == ["DEV-001"]
+    
+    @pytest.mark.asyncio
+    async def test_new_device_picks_up_existing_assignments(self, clean_database, sample_device_data):
+        """Test that a device created after a user was assigned to it lists that user."""
+        await clean_database.users.insert_one({"name": "engineer1", "role": "Engineer", "assignedDevices": [sample_device_data["deviceId"]]})
+        
+        response = await create_device(DeviceCreate(**sample_device_data), db=clean_database, current_user=ADMIN)
+        
+        assert response.status_code == 201
+        device = await clean_database.devices.find_one({"deviceId": sample_device_data["deviceId"]})
+        assert device["assignedUsers"] == ["engineer1"]
+    
+    @pytest.mark.asyncio
+    async def test_renamed_user_keeps_assigned_devices(self, clean_database, monkeypatch):
+        """Test that a renamed engineer still sees and can shut down their assigned devices."""
+        await clean_database.users.insert_one({"name": "engineer1", "role": "Engineer", "assignedDevices": ["DEV-001"]})
+        await create_test_device(clean_database, {"deviceId": "DEV-001", "name": "Mine", "status": "on", "type": "server", "location": "Rack A", "assignedUsers": ["engineer1"]})
+        submitted = []
+        
+        async def submit(job_type, params, user):
+            submitted.append((job_type, params, user))
+            return {"_id": "job-1", "jobId": "job-1", "type": job_type, "status": "queued", "user": user, "params": params, "createdAt": datetime.utcnow()}
+        
+        monkeypatch.setattr(job_manager, "submit", submit)
+        
+        await update_profile(UserProfileUpdate(name="renamed-engineer"), current_user={"sub": "engineer1", "role": "Engineer"}, db=clean_database)
+        renamed = {"sub": "renamed-engineer", "role": "Engineer"}
+        
+        response = await read_my_devices(limit=100, cursor=None, db=clean_database, current_user=renamed)
+        assert [device["deviceId"] for device in json.loads(response.body)] == ["DEV-001"]
+        
+        response = await initiate_shutdown("DEV-001", db=clean_database, current_user=renamed)
+        assert response.status_code == 202
+        assert submitted == [("shutdown", {"deviceId": "DEV-001"}, "renamed-engineer")]
@@ -0,0 +1,63 @@
+"""
+Test cases for the live update hub.
+Tests fan-out, per-device filtering and slow-consumer dropping.
+"""
+
+from src.events import EventHub, format_sse
+
+class TestEventHub:
+    """Test publishing to subscribers."""
+
+    def test_event_fanned_out_to_all_subscribers(self):
+        """Test that every subscriber receives a published event."""
+        hub = EventHub(max_queue=10)
+        first = hub.subscribe()
+        second = hub.subscribe()
+
+        hub.publish("device.status", {"deviceId": "SRV-001", "status": "off"})
+
+        assert first.queue.get_nowait()["data"]["status"] == "off"
+        assert second.queue.get_nowait()["data"]["status"] == "off"
+        assert hub.get_stats()["delivered"] == 2
+
+    def test_device_events_filtered_by_assigned_devices(self):
+        """Test that scoped subscribers only see their own devices."""
+        hub = EventHub(max_queue=10)
+        engineer = hub.subscribe(device_ids=["SRV-001"])
+
+        hub.publish("device.status", {"deviceId": "SRV-002", "status": "off"})
+        hub.publish("device.status", {"deviceId": "SRV-001", "status": "off"})
+        hub.publish("checklist.updated", {"taskId": "task-1", "item": {}})
+
+        received = [engineer.queue.get_nowait()["type"] for _ in range(engineer.queue.qsize())]
+        assert received == ["device.status", "checklist.updated"]
+
+    def test_slow_consumer_dropped_when_queue_full(self):
+        """Test that a full queue drops the subscriber instead of blocking."""
+        hub = EventHub(max_queue=2)
+        slow = hub.subscribe()
+        fast = hub.subscribe()
+
+        for i in range(3):
+            hub.publish("device.status", {"deviceId": f"SRV-00{i}", "status": "on"})
+            fast.queue.get_nowait()
+
+        assert slow.dropped
+        assert not fast.dropped
+        assert hub.get_stats()["subscribers"] == 1
+        assert hub.get_stats()["droppedSubscribers"] == 1
+
+class TestSSEFormat:
+    """Test the event-stream wire format."""
+
+    def test_event_encoded_with_id_and_type(self):
+        """Test that events carry an id, event name and JSON data line."""
+        hub = EventHub(max_queue=1)
+        subscription = hub.subscribe()
+        hub.publish("device.status", {"deviceId": "SRV-001", "status": "off"})
+
+        frame = format_sse(subscription.queue.get_nowait())
+
+        assert frame.startswith(b"id: 1\nevent: device.status\ndata: {")
+        assert b'"deviceId":"SRV-001"' in frame
+        assert frame.endswith(b"\n\n")
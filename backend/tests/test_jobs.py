@@ -0,0 +1,150 @@
+"""
+Test cases for the background job subsystem.
+Tests job execution, failure reporting, restart recovery and queue limits.
+"""
+
+import asyncio
+import pytest
+from datetime import datetime
+from fastapi import HTTPException
+
+from main import http_exception_handler
+from src.crud import insert_and_return
+from src.jobs import JobContext, JobManager, job_handler, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED
+
+@job_handler("test-echo")
+async def echo_job(db, job, context):
+    await context.progress(1, 1)
+    return {"echo": job["params"]["value"]}
+
+@job_handler("test-fail")
+async def failing_job(db, job, context):
+    raise RuntimeError("driver unreachable")
+
+async def wait_for_status(manager, job_id, expected, timeout=5):
+    for _ in range(int(timeout / 0.05)):
+        job = await manager.get(job_id)
+        if job["status"] == expected:
+            return job
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"job {job_id} never reached {expected}")
+
+class TestJobExecution:
+    """Test running jobs on the worker pool."""
+
+    @pytest.mark.asyncio
+    async def test_job_persisted_and_completed(self, clean_database):
+        """Test that a submitted job is stored as queued and finishes with its result."""
+        manager = JobManager(workers=1, max_queue=10)
+        await manager.start(clean_database)
+        try:
+            job = await manager.submit("test-echo", {"value": 42}, "engineer1")
+            assert job["status"] == JOB_QUEUED
+
+            finished = await wait_for_status(manager, job["jobId"], JOB_SUCCEEDED)
+            assert finished["result"] == {"echo": 42}
+            assert finished["progress"] == {"completed": 1, "total": 1}
+            assert finished["finishedAt"] is not None
+        finally:
+            await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_job_failure_recorded(self, clean_database):
+        """Test that a handler exception marks the job failed with its message."""
+        manager = JobManager(workers=1, max_queue=10)
+        await manager.start(clean_database)
+        try:
+            job = await manager.submit("test-fail", {}, "engineer1")
+
+            failed = await wait_for_status(manager, job["jobId"], JOB_FAILED)
+            assert failed["error"] == "driver unreachable"
+        finally:
+            await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_progress_ends_complete(self, clean_database):
+        """Test that progress reported from many coroutines at once is stored in call order."""
+        await clean_database.jobs.insert_one({"jobId": "bulk", "status": JOB_RUNNING})
+        context = JobContext(clean_database.jobs, "bulk")
+
+        await asyncio.gather(*(context.progress(completed, 50) for completed in range(1, 51)))
+
+        job = await clean_database.jobs.find_one({"jobId": "bulk"})
+        assert job["progress"] == {"completed": 50, "total": 50}
+
+class TestJobRecovery:
+    """Test handling of jobs left over from a previous process."""
+
+    @pytest.mark.asyncio
+    async def test_running_jobs_failed_and_queued_jobs_resumed(self, clean_database):
+        """Test that restart fails interrupted jobs and reruns queued ones."""
+        now = datetime.utcnow()
+        await clean_database["jobs"].insert_many([
+            {"jobId": "interrupted", "type": "test-echo", "status": JOB_RUNNING, "user": "admin",
+             "params": {"value": 1}, "createdAt": now},
+            {"jobId": "pending", "type": "test-echo", "status": JOB_QUEUED, "user": "admin",
+             "params": {"value": 2}, "createdAt": now},
+        ])
+
+        manager = JobManager(workers=1, max_queue=10)
+        await manager.start(clean_database)
+        try:
+            resumed = await wait_for_status(manager, "pending", JOB_SUCCEEDED)
+            assert resumed["result"] == {"echo": 2}
+
+            interrupted = await manager.get("interrupted")
+            assert interrupted["status"] == JOB_FAILED
+            assert "restart" in interrupted["error"].lower()
+        finally:
+            await manager.stop()
+
+class TestJobQueueLimits:
+    """Test backpressure when the queue is full."""
+
+    @pytest.mark.asyncio
+    async def test_submit_rejected_when_queue_full(self, clean_database):
+        """Test that submissions beyond the queue bound get 503."""
+        manager = JobManager(workers=1, max_queue=1)
+        # Workers are not started, so queued jobs stay queued
+        manager.database = clean_database
+        manager._queue = asyncio.Queue(maxsize=1)
+
+        await manager.submit("test-echo", {"value": 1}, "admin")
+        with pytest.raises(HTTPException) as exc_info:
+            await manager.submit("test-echo", {"value": 2}, "admin")
+
+        assert exc_info.value.status_code == 503
+        assert manager.get_stats()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_filled_during_insert_rejected(self, clean_database, monkeypatch):
+        """Test that a submit losing its queue slot while inserting gets 503 and leaves no job."""
+        manager = JobManager(workers=1, max_queue=1)
+        manager.database = clean_database
+        manager._queue = asyncio.Queue(maxsize=1)
+
+        async def insert_while_recovery_requeues(collection, document):
+            manager._queue.put_nowait("recovered-job")
+            return await insert_and_return(collection, document)
+        monkeypatch.setattr("src.jobs.insert_and_return", insert_while_recovery_requeues)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await manager.submit("test-echo", {"value": 1}, "admin")
+
+        assert exc_info.value.status_code == 503
+        assert await clean_database.jobs.count_documents({}) == 0
+
+    @pytest.mark.asyncio
+    async def test_rejected_submission_advertises_retry_after(self, clean_database):
+        """Test that the queue-full 503 reaches clients with its Retry-After header."""
+        manager = JobManager(workers=1, max_queue=1)
+        manager.database = clean_database
+        manager._queue = asyncio.Queue(maxsize=1)
+        await manager.submit("test-echo", {"value": 1}, "admin")
+        with pytest.raises(HTTPException) as exc_info:
+            await manager.submit("test-echo", {"value": 2}, "admin")
+
+        response = await http_exception_handler(None, exc_info.value)
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
@@ -0,0 +1,57 @@
+"""
+Test cases for keyset pagination helpers.
+Tests cursor encoding and the range filters built from a cursor.
+"""
+
+import pytest
+from datetime import datetime
+from bson import ObjectId
+from fastapi import HTTPException
+
+from src.pagination import encode_cursor, decode_cursor, keyset_filter
+
+LOG_SORT = [("timestamp", -1), ("_id", -1)]
+
+class TestCursorEncoding:
+    """Test opaque cursor round trips."""
+    
+    def test_cursor_round_trip_preserves_types(self):
+        """Test that datetime and ObjectId sort keys survive encoding."""
+        document = {"_id": ObjectId(), "timestamp": datetime(2024, 5, 1, 12, 30), "device": "SRV-001"}
+        
+        values = decode_cursor(encode_cursor(document, LOG_SORT), LOG_SORT)
+        
+        assert values == [document["timestamp"], document["_id"]]
+    
+    def test_invalid_cursor_rejected(self):
+        """Test that a malformed cursor is a 400 error."""
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor("not-a-cursor", LOG_SORT)
+        
+        assert exc_info.value.status_code == 400
+    
+    def test_cursor_for_different_sort_rejected(self):
+        """Test that a cursor with the wrong number of keys is rejected."""
+        cursor = encode_cursor({"deviceId": "SRV-001"}, [("deviceId", 1)])
+        
+        with pytest.raises(HTTPException):
+            decode_cursor(cursor, LOG_SORT)
+
+class TestKeysetFilter:
+    """Test range filters built from cursor values."""
+    
+    def test_single_key_ascending(self):
+        """Test filter for an ascending single-field sort."""
+        assert keyset_filter([("deviceId", 1)], ["SRV-002"]) == {"deviceId": {"$gt": "SRV-002"}}
+    
+    def test_compound_key_descending(self):
+        """Test filter for a descending compound sort breaks ties on _id."""
+        timestamp = datetime(2024, 5, 1)
+        object_id = ObjectId()
+        
+        assert keyset_filter(LOG_SORT, [timestamp, object_id]) == {
+            "$or": [
+                {"timestamp": {"$lt": timestamp}},
+                {"timestamp": timestamp, "_id": {"$lt": object_id}},
+            ]
+        }
@@ -0,0 +1,228 @@
+"""
+Test cases for the power driver layer.
+Tests driver selection, per-driver concurrency, timeouts, the TCP driver
+staggered power-on waves and dependency-ordered shutdown.
+"""
+
+import asyncio
+import time
+import pytest
+
+from src.power import PowerError, PowerManager
+from src.power.drivers import SimulatedDriver, TCPSimulatorDriver
+from src.power.dependencies import (
+    DependencyCycleError, dependency_graph, plan_dependency_waves, run_in_dependency_order
+)
+from src.power.sequencer import plan_waves, run_waves
+from src.power.simulator import PowerSimulator
+
+class TestDriverSelection:
+    """Test which driver handles a device."""
+
+    def test_device_driver_overrides_type_mapping(self):
+        """Test that power.driver beats the type mapping, which beats the default."""
+        drivers = {"simulated": SimulatedDriver(1, 5), "ipmi": SimulatedDriver(1, 5), "snmp_pdu": SimulatedDriver(1, 5)}
+        manager = PowerManager(drivers, {"server": "ipmi"}, "simulated")
+
+        assert manager.driver_for({"deviceId": "SRV-001", "type": "server"}) is drivers["ipmi"]
+        assert manager.driver_for({"deviceId": "SRV-002", "type": "server", "power": {"driver": "snmp_pdu"}}) is drivers["snmp_pdu"]
+        assert manager.driver_for({"deviceId": "NET-001", "type": "network"}) is drivers["simulated"]
+
+    def test_unknown_driver_rejected(self):
+        """Test that a device naming a missing driver fails with PowerError."""
+        manager = PowerManager({"simulated": SimulatedDriver(1, 5)}, {}, "simulated")
+
+        with pytest.raises(PowerError):
+            manager.driver_for({"deviceId": "SRV-001", "power": {"driver": "missing"}})
+
+class TestDriverLimits:
+    """Test concurrency limits, timeouts and measured durations."""
+
+    @pytest.mark.asyncio
+    async def test_slow_driver_does_not_starve_fast_driver(self):
+        """Test that calls queued on a saturated driver do not delay another driver."""
+        slow = SimulatedDriver(concurrency=1, timeout=5, off_seconds=0.3)
+        fast = SimulatedDriver(concurrency=10, timeout=5, off_seconds=0.05)
+        manager = PowerManager({"slow": slow, "fast": fast}, {"pdu": "slow", "server": "fast"}, "slow")
+
+        started = time.perf_counter()
+        finished_at = {}
+
+        async def power_off(device):
+            duration = await manager.power_off(device)
+            finished_at[device["deviceId"]] = time.perf_counter() - started
+            return duration
+
+        devices = [{"deviceId": f"PDU-{i}", "type": "pdu"} for i in range(3)]
+        devices += [{"deviceId": f"SRV-{i}", "type": "server"} for i in range(5)]
+        durations = await asyncio.gather(*(power_off(device) for device in devices))
+
+        assert max(finished_at[f"SRV-{i}"] for i in range(5)) < 0.2
+        assert finished_at["PDU-2"] >= 0.9
+        # Time spent waiting for a slot is not part of the measured duration
+        assert all(duration < 0.4 for duration in durations)
+
+    @pytest.mark.asyncio
+    async def test_timeout_raises_power_error(self):
+        """Test that a call exceeding the driver timeout fails and is counted."""
+        driver = SimulatedDriver(concurrency=1, timeout=0.05, off_seconds=1)
+
+        with pytest.raises(PowerError) as exc_info:
+            await driver.power_off({"deviceId": "SRV-001"})
+
+        assert "timed out" in str(exc_info.value)
+        assert driver.get_stats()["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_queued_call_not_left_waiting(self):
+        """Test that a call cancelled while queued for a slot no longer counts as waiting."""
+        driver = SimulatedDriver(concurrency=1, timeout=5, off_seconds=0.2)
+        running = asyncio.create_task(driver.power_off({"deviceId": "SRV-001"}))
+        queued = asyncio.create_task(driver.power_off({"deviceId": "SRV-002"}))
+        await asyncio.sleep(0.05)
+        assert driver.get_stats()["waiting"] == 1
+
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        await running
+
+        stats = driver.get_stats()
+        assert stats["waiting"] == 0
+        assert stats["active"] == 0
+
+class TestTCPSimulatorDriver:
+    """Test the TCP driver against the local power simulator."""
+
+    @pytest.mark.asyncio
+    async def test_connections_reused_and_errors_reported(self):
+        """Test that concurrent calls share a bounded pool and device errors surface."""
+        simulator = PowerSimulator(delay=0.02, failing_devices={"BAD-001"})
+        port = await simulator.start()
+        driver = TCPSimulatorDriver(concurrency=2, timeout=2, host="127.0.0.1", port=port)
+        try:
+            await asyncio.gather(*(driver.power_off({"deviceId": f"SRV-{i}"}) for i in range(6)))
+            assert simulator.states == {f"SRV-{i}": "off" for i in range(6)}
+            assert simulator.connections == 2
+
+            with pytest.raises(PowerError) as exc_info:
+                await driver.power_on({"deviceId": "BAD-001"})
+            assert "did not respond" in str(exc_info.value)
+        finally:
+            await driver.close()
+            await simulator.stop()
+
+class TestPowerOnWaves:
+    """Test staggered power-on planning and execution."""
+
+    def test_waves_fit_circuit_budget(self):
+        """Test that each circuit's waves stay within budget and oversized devices go alone."""
+        devices = [
+            {"deviceId": f"A-{watts}", "location": "Rack A", "power_consumption": {"watts": watts}}
+            for watts in [900, 800, 700, 300, 200]
+        ]
+        devices.append({"deviceId": "A-unknown", "location": "Rack A", "power_consumption": {"watts": 0}})
+        devices.append({"deviceId": "B-big", "location": "Rack B", "power_consumption": {"watts": 2500}})
+
+        plan = plan_waves(devices, default_budget=2000, default_watts=300)
+
+        rack_a = [sorted(device["deviceId"] for device in wave) for wave in plan["Rack A"]]
+        assert rack_a == [["A-300", "A-800", "A-900"], ["A-200", "A-700", "A-unknown"]]
+        assert [[device["deviceId"] for device in wave] for wave in plan["Rack B"]] == [["B-big"]]
+
+    def test_circuit_budget_override(self):
+        """Test that a per-circuit budget replaces the default budget."""
+        devices = [{"deviceId": f"DEV-{i}", "power": {"circuit": "PDU-1"}, "power_consumption": {"watts": 500}} for i in range(4)]
+
+        plan = plan_waves(devices, default_budget=2000, default_watts=300, circuit_budgets={"PDU-1": 1000})
+
+        assert [len(wave) for wave in plan["PDU-1"]] == [2, 2]
+
+    @pytest.mark.asyncio
+    async def test_waves_run_in_order_per_circuit(self):
+        """Test that a wave only starts after the previous wave on its circuit finished."""
+        plan = {
+            "Rack A": [[{"deviceId": "A-1"}, {"deviceId": "A-2"}], [{"deviceId": "A-3"}]],
+            "Rack B": [[{"deviceId": "B-1"}]],
+        }
+        order = []
+
+        async def start_device(device):
+            order.append(("start", device["deviceId"]))
+            await asyncio.sleep(0.01)
+
+        async def wave_finished(circuit, number, count, wave):
+            order.append(("wave", circuit, number, count))
+
+        await run_waves(plan, start_device, wave_finished)
+
+        assert order.index(("wave", "Rack A", 1, 2)) < order.index(("start", "A-3"))
+        assert order.index(("start", "B-1")) < order.index(("wave", "Rack A", 1, 2))
+        assert ("wave", "Rack A", 2, 2) in order and ("wave", "Rack B", 1, 1) in order
+
+class TestShutdownDependencies:
+    """Test dependency-ordered shutdown planning and execution."""
+
+    def test_plan_orders_dependencies_into_waves(self):
+        """Test that devices land in the wave after everything they wait for."""
+        devices = {
+            "SW-001": {"shutdownAfter": ["STOR-001"]},
+            "STOR-001": {"shutdownAfter": ["SRV-001", "SRV-002", "OUTSIDE-001"]},
+        }
+        predecessors = dependency_graph(["SW-001", "STOR-001", "SRV-001", "SRV-002"], devices)
+
+        assert plan_dependency_waves(predecessors) == [["SRV-001", "SRV-002"], ["STOR-001"], ["SW-001"]]
+
+    def test_cycle_detected(self):
+        """Test that a dependency cycle is reported with its members."""
+        devices = {"A": {"shutdownAfter": ["C"]}, "B": {"shutdownAfter": ["A"]}, "C": {"shutdownAfter": ["B"]}, "D": {"shutdownAfter": ["A"]}}
+
+        with pytest.raises(DependencyCycleError) as exc_info:
+            plan_dependency_waves(dependency_graph(["A", "B", "C", "D"], devices))
+
+        assert set(exc_info.value.cycle) == {"A", "B", "C"}
+
+    @pytest.mark.asyncio
+    async def test_failure_skips_downstream_only(self):
+        """Test that dependents of a failed device are skipped while independent branches finish."""
+        predecessors = {"SRV-001": set(), "SRV-002": set(), "STOR-001": {"SRV-001"}, "STOR-002": {"SRV-002"}, "SW-001": {"STOR-001", "STOR-002"}}
+        completed, skipped = [], {}
+
+        async def action(device_id):
+            await asyncio.sleep(0.01)
+            if device_id == "SRV-002":
+                return False
+            completed.append(device_id)
+            return True
+
+        async def skip(device_id, blocked_by):
+            skipped[device_id] = blocked_by
+
+        await run_in_dependency_order(predecessors, action, skip)
+
+        assert completed == ["SRV-001", "STOR-001"]
+        assert skipped == {"STOR-002": "SRV-002", "SW-001": "STOR-002"}
+
+    @pytest.mark.asyncio
+    async def test_error_cancels_remaining_devices(self):
+        """Test that an exception from one device cancels the others instead of leaving them running."""
+        predecessors = {"SRV-001": set(), "SRV-002": set(), "STOR-001": {"SRV-002"}}
+        started, finished = [], []
+
+        async def action(device_id):
+            started.append(device_id)
+            if device_id == "SRV-001":
+                raise RuntimeError("progress write failed")
+            await asyncio.sleep(0.5)
+            finished.append(device_id)
+            return True
+
+        async def skip(device_id, blocked_by):
+            pass
+
+        with pytest.raises(RuntimeError):
+            await run_in_dependency_order(predecessors, action, skip)
+        await asyncio.sleep(0.6)
+
+        assert "SRV-002" in started
+        assert finished == []
@@ -0,0 +1,107 @@
+"""
+Test cases for the materialized checklist readiness.
+Tests incremental maintenance against a full recompute.
+"""
+
+import pytest
+from conftest import create_test_checklist_item
+
+from src import readiness
+from src.readiness import apply_item_change, get_readiness, recompute_readiness
+
+CRITICAL_ITEM = {"taskId": "CRITICAL-001", "description": "Critical task", "category": "safety", "isCritical": True, "completed": False}
+NORMAL_ITEM = {"taskId": "NORMAL-001", "description": "Normal task", "category": "backup", "isCritical": False, "completed": False}
+
+class TestReadinessAggregate:
+    """Test readiness counts and incomplete task tracking."""
+
+    @pytest.mark.asyncio
+    async def test_first_read_builds_aggregate(self, clean_database):
+        """Test that the aggregate is computed from the checklist when missing."""
+        await create_test_checklist_item(clean_database, CRITICAL_ITEM)
+        await create_test_checklist_item(clean_database, NORMAL_ITEM)
+
+        readiness = await get_readiness(clean_database)
+
+        assert readiness["criticalTotal"] == 1
+        assert readiness["criticalCompleted"] == 0
+        assert readiness["incompleteTaskIds"] == ["CRITICAL-001"]
+
+    @pytest.mark.asyncio
+    async def test_incremental_changes_match_recompute(self, clean_database):
+        """Test that create, complete and delete deltas agree with a full rebuild."""
+        await get_readiness(clean_database)
+
+        created = await create_test_checklist_item(clean_database, CRITICAL_ITEM)
+        await apply_item_change(clean_database, None, created)
+
+        completed = {**created, "completed": True}
+        await clean_database.checklist.update_one({"taskId": "CRITICAL-001"}, {"$set": {"completed": True}})
+        await apply_item_change(clean_database, created, completed)
+
+        second = await create_test_checklist_item(clean_database, {**CRITICAL_ITEM, "taskId": "CRITICAL-002"})
+        await apply_item_change(clean_database, None, second)
+        await clean_database.checklist.delete_one({"taskId": "CRITICAL-002"})
+        await apply_item_change(clean_database, second, None)
+
+        incremental = await get_readiness(clean_database)
+        recomputed = await recompute_readiness(clean_database)
+
+        assert incremental["criticalTotal"] == recomputed["criticalTotal"] == 1
+        assert incremental["criticalCompleted"] == recomputed["criticalCompleted"] == 1
+        assert incremental["incompleteTaskIds"] == recomputed["incompleteTaskIds"] == []
+
+    @pytest.mark.asyncio
+    async def test_recompute_keeps_concurrent_change(self, clean_database, monkeypatch):
+        """Test that a change applied while the checklist is aggregated is not overwritten."""
+        created = await create_test_checklist_item(clean_database, CRITICAL_ITEM)
+        await get_readiness(clean_database)
+
+        aggregate = readiness._aggregate_checklist
+        calls = []
+        async def aggregate_then_complete(db):
+            totals = await aggregate(db)
+            calls.append(totals)
+            if len(calls) == 1:
+                await clean_database.checklist.update_one({"taskId": "CRITICAL-001"}, {"$set": {"completed": True}})
+                await apply_item_change(clean_database, created, {**created, "completed": True})
+            return totals
+        monkeypatch.setattr(readiness, "_aggregate_checklist", aggregate_then_complete)
+
+        await recompute_readiness(clean_database)
+
+        stored = await get_readiness(clean_database)
+        assert len(calls) == 2
+        assert stored["criticalCompleted"] == 1
+        assert stored["incompleteTaskIds"] == []
+
+    @pytest.mark.asyncio
+    async def test_change_seen_by_recompute_not_counted_twice(self, clean_database):
+        """Test that a change applied after a recompute already picked it up leaves the counts alone."""
+        await get_readiness(clean_database)
+
+        created = await create_test_checklist_item(clean_database, CRITICAL_ITEM)
+        await recompute_readiness(clean_database)
+        await apply_item_change(clean_database, None, created)
+
+        await clean_database.checklist.update_one({"taskId": "CRITICAL-001"}, {"$set": {"completed": True}})
+        await recompute_readiness(clean_database)
+        await apply_item_change(clean_database, created, {**created, "completed": True})
+
+        stored = await get_readiness(clean_database)
+        assert stored["criticalTotal"] == 1
+        assert stored["criticalCompleted"] == 1
+        assert stored["incompleteTaskIds"] == []
+
+    @pytest.mark.asyncio
+    async def test_task_id_starting_with_dollar_kept_literal(self, clean_database):
+        """Test that a taskId that looks like a field path is stored as given."""
+        await get_readiness(clean_database)
+
+        created = await create_test_checklist_item(clean_database, {**CRITICAL_ITEM, "taskId": "$criticalTaskIds"})
+        await apply_item_change(clean_database, None, created)
+
+        stored = await get_readiness(clean_database)
+        assert stored["criticalTaskIds"] == ["$criticalTaskIds"]
+        assert stored["incompleteTaskIds"] == ["$criticalTaskIds"]
+        assert stored["criticalTotal"] == 1
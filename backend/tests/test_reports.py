@@ -0,0 +1,119 @@
+"""
+Test cases for shutdown statistics reporting.
+Tests rollup maintenance on log writes, backfill and the stats endpoint.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+
+from config.settings import settings
+from src import archive
+from src.api.v1.reports.router import read_shutdown_stats
+from src.reporting import backfill_rollups, bucket_ranges, get_shutdown_stats
+from src.write_behind import write_behind
+
+def make_log(log_id, device, status, timestamp, duration=0):
+    return {"logId": log_id, "device": device, "user": "engineer1", "userName": "Engineer One", "status": status, "timestamp": timestamp, "duration": duration}
+
+LOGS = [
+    make_log("log-1", "SRV-001", "success", datetime(2026, 1, 1, 9, 15), 2.0),
+    make_log("log-2", "SRV-001", "success", datetime(2026, 1, 1, 23, 50), 4.0),
+    make_log("log-3", "SRV-002", "failed", datetime(2026, 1, 2, 0, 5)),
+    make_log("log-4", "SRV-002", "success", datetime(2026, 1, 5, 12, 0), 3.0),
+]
+
+USER = {"sub": "engineer1", "role": "Engineer"}
+
+class TestBucketRanges:
+    """Test which rollups a date range reads."""
+
+    def test_whole_days_use_daily_rollups(self):
+        """Test that partial days at the edges use hourly rollups and whole days daily ones."""
+        ranges = bucket_ranges(datetime(2026, 1, 1, 22, 30), datetime(2026, 1, 5, 2, 0))
+
+        assert {"granularity": "day", "bucket": {"$gte": datetime(2026, 1, 2), "$lt": datetime(2026, 1, 5)}} in ranges
+        assert {"granularity": "hour", "bucket": {"$gte": datetime(2026, 1, 1, 22), "$lt": datetime(2026, 1, 2)}} in ranges
+        assert {"granularity": "hour", "bucket": {"$gte": datetime(2026, 1, 5), "$lt": datetime(2026, 1, 5, 2)}} in ranges
+
+class TestShutdownRollups:
+    """Test rollups against the logs they summarise."""
+
+    @pytest.mark.asyncio
+    async def test_written_logs_update_rollups(self, clean_database):
+        """Test that logs written through the buffer are counted per device, user and status."""
+        await write_behind.insert(clean_database.shutdownLogs, [dict(log) for log in LOGS])
+
+        stats = await get_shutdown_stats(clean_database)
+
+        assert stats["total_shutdowns"] == 4
+        assert stats["successful_shutdowns"] == 3
+        assert stats["failed_shutdowns"] == 1
+        assert stats["average_duration"] == 3.0
+        assert stats["most_active_users"] == [{"user_id": "engineer1", "username": "Engineer One", "shutdown_count": 4}]
+        assert {device["device_id"]: device["shutdown_count"] for device in stats["device_statistics"]} == {"SRV-001": 2, "SRV-002": 2}
+
+        first_day = await get_shutdown_stats(clean_database, datetime(2026, 1, 1, 12), datetime(2026, 1, 2, 1))
+        assert first_day["total_shutdowns"] == 2
+
+    @pytest.mark.asyncio
+    async def test_backfill_matches_incremental(self, clean_database):
+        """Test that rebuilding from history gives the same totals as incremental updates."""
+        await clean_database.shutdownLogs.insert_many([dict(log) for log in LOGS])
+
+        assert (await get_shutdown_stats(clean_database))["total_shutdowns"] == 0
+        assert await backfill_rollups(clean_database, datetime(2026, 1, 1), datetime(2026, 1, 6)) == 4
+
+        stats = await get_shutdown_stats(clean_database, datetime(2026, 1, 1), datetime(2026, 1, 3))
+        assert stats["total_shutdowns"] == 3
+        assert stats["by_status"] == {"success": 2, "failed": 1}
+
+    @pytest.mark.asyncio
+    async def test_backfill_reads_archived_days(self, clean_database, monkeypatch, tmp_path):
+        """Test that rebuilding days moved out by retention keeps their totals, counting each log once."""
+        monkeypatch.setattr(settings, "LOG_ARCHIVE_DIR", str(tmp_path))
+        monkeypatch.setattr(settings, "LOG_RETENTION_DAYS", 30)
+        await clean_database.shutdownLogs.insert_many([dict(log) for log in LOGS])
+        await archive.apply_retention(clean_database)
+        # Left both archived and stored, as by an interrupted retention run
+        await clean_database.shutdownLogs.insert_many(archive._load_day("shutdownLogs", datetime(2026, 1, 5)))
+
+        assert await backfill_rollups(clean_database, datetime(2026, 1, 1), datetime(2026, 1, 6)) == 4
+
+        stats = await get_shutdown_stats(clean_database)
+        assert stats["total_shutdowns"] == 4
+        assert stats["by_status"] == {"success": 3, "failed": 1}
+
+    @pytest.mark.asyncio
+    async def test_backfill_refuses_current_day(self, clean_database):
+        """Test that the day still receiving logs is only rebuilt when asked to."""
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        with pytest.raises(ValueError):
+            await backfill_rollups(clean_database, today, today + timedelta(days=1))
+
+        assert await backfill_rollups(clean_database, today, today + timedelta(days=1), include_today=True) == 0
+
+    @pytest.mark.asyncio
+    async def test_stats_endpoint(self, clean_database):
+        """Test that /reports/stats serves the rollups and validates dates."""
+        await write_behind.insert(clean_database.shutdownLogs, [dict(log) for log in LOGS])
+
+        stats = await read_shutdown_stats(start_date="2026-01-05", top=10, db=clean_database, current_user=USER)
+        assert stats["total_shutdowns"] == 1
+
+        with pytest.raises(HTTPException) as error:
+            await read_shutdown_stats(start_date="yesterday", top=10, db=clean_database, current_user=USER)
+        assert error.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_stats_endpoint_normalizes_offset_dates(self, clean_database):
+        """Test that dates with a UTC offset or Z are converted to UTC, also when mixed with plain dates."""
+        await write_behind.insert(clean_database.shutdownLogs, [dict(log) for log in LOGS])
+
+        # 2026-01-01 05:00 UTC to 2026-01-02 00:00
+        stats = await read_shutdown_stats(start_date="2026-01-01T10:00:00+05:00", end_date="2026-01-02", top=10, db=clean_database, current_user=USER)
+        assert stats["total_shutdowns"] == 2
+
+        # Local midnight is 2026-01-01 19:00 UTC, so the evening of 2026-01-01 counts
+        stats = await read_shutdown_stats(start_date="2026-01-02T00:00:00+05:00", end_date="2026-01-03T00:00:00Z", top=10, db=clean_database, current_user=USER)
+        assert stats["total_shutdowns"] == 2
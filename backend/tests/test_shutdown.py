@@ -3,10 +3,19 @@ Test cases for shutdown operations.
 Tests shutdown validation, logging, and device state management.
 """
 
+import json
 import pytest
+from fastapi import HTTPException
 from httpx import AsyncClient
+from pydantic import ValidationError
 from conftest import create_test_device, create_test_checklist_item, create_test_user
 
+from config.settings import settings
+from src.api.v1.shutdown_logs.router import read_shutdown_logs
+from src.api.v1.shutdown.router import build_shutdown_log, initiate_bulk_shutdown, initiate_shutdown, run_bulk_shutdown_job
+from src.models.shutdown import BulkShutdownRequest
+from src.log_storage import from_stored, log_query, to_stored, write_shutdown_logs
+
 class TestShutdownValidation:
     """Test shutdown validation logic."""
     
@@ -268,6 +277,88 @@ class TestShutdownAllDevices:
         assert response.status_code == 400
         assert "checklist validation failed" in response.json()["detail"]["message"].lower()
 
+class TestAllDevicesOffCheck:
+    """Test detection of a fully powered-off fleet."""
+
+    @pytest.mark.asyncio
+    async def test_all_devices_off_ignores_off_and_maintenance(self, clean_database):
+        """Test that only devices that are on (or have no status) count as on."""
+        from src.api.v1.shutdown.router import all_devices_off
+
+        await create_test_device(clean_database, {"deviceId": "DEV-001", "name": "Device 1", "status": "off", "type": "server", "location": "Rack A"})
+        await create_test_device(clean_database, {"deviceId": "DEV-002", "name": "Device 2", "status": "maintenance", "type": "server", "location": "Rack B"})
+        assert await all_devices_off(clean_database) == True
+
+        await clean_database.devices.update_one({"deviceId": "DEV-001"}, {"$set": {"status": "on"}})
+        assert await all_devices_off(clean_database) == False
+
+class TestBulkShutdown:
+    """Test bulk shutdown validation."""
+    
+    @pytest.mark.asyncio
+    async def test_bulk_shutdown_rejects_unassigned_devices(self, clean_database, sample_device_data):
+        """Test that bulk shutdown lists every device the caller may not shut down."""
+        device = await create_test_device(clean_database, sample_device_data)
+        request = BulkShutdownRequest(device_ids=[device["deviceId"], device["deviceId"], "OTHER-001"])
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await initiate_bulk_shutdown(request, db=clean_database, current_user={"sub": "testuser", "role": "Engineer"})
+        
+        assert exc_info.value.status_code == 403
+        assert exc_info.value.detail["devices"] == [device["deviceId"], "OTHER-001"]
+    
+    def test_bulk_shutdown_requires_devices(self):
+        """Test that an empty device list is a validation error."""
+        with pytest.raises(ValidationError):
+            BulkShutdownRequest(device_ids=[])
+
+class TestOutsideDependencies:
+    """Test that devices outside a request that must go off first are still off."""
+    
+    ENGINEER = {"sub": "engineer1", "role": "Engineer"}
+    
+    async def create_storage_behind_compute(self, database, compute_status="on"):
+        await create_test_device(database, {"deviceId": "SRV-001", "name": "Compute", "status": compute_status, "type": "server", "location": "Rack A", "assignedUsers": ["engineer1"]})
+        await create_test_device(database, {"deviceId": "STOR-001", "name": "Storage", "status": "on", "type": "storage", "location": "Rack A", "assignedUsers": ["engineer1"], "shutdownAfter": ["SRV-001"]})
+    
+    @pytest.mark.asyncio
+    async def test_single_shutdown_rejected_while_dependency_on(self, clean_database):
+        """Test that /initiate refuses a device whose dependency is still on."""
+        await self.create_storage_behind_compute(clean_database)
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await initiate_shutdown("STOR-001", db=clean_database, current_user=self.ENGINEER)
+        
+        assert exc_info.value.status_code == 409
+        assert exc_info.value.detail["devices"] == ["SRV-001"]
+    
+    @pytest.mark.asyncio
+    async def test_bulk_shutdown_rejected_while_dependency_on(self, clean_database):
+        """Test that /bulk refuses devices whose dependencies outside the request are still on."""
+        await self.create_storage_behind_compute(clean_database)
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await initiate_bulk_shutdown(BulkShutdownRequest(device_ids=["STOR-001"]), db=clean_database, current_user=self.ENGINEER)
+        
+        assert exc_info.value.status_code == 409
+        assert exc_info.value.detail["devices"] == {"STOR-001": ["SRV-001"]}
+    
+    @pytest.mark.asyncio
+    async def test_bulk_job_skips_device_whose_dependency_came_back_on(self, clean_database):
+        """Test that a dependency powered on after the request was accepted leaves the device on."""
+        await self.create_storage_behind_compute(clean_database)
+        
+        class Context:
+            async def progress(self, completed, total, **details):
+                pass
+        
+        job = {"params": {"deviceIds": ["STOR-001"], "reason": "Bulk shutdown"}, "user": "engineer1"}
+        result = await run_bulk_shutdown_job(clean_database, job, Context())
+        
+        assert result["results"][0]["message"] == "Skipped: dependency SRV-001 still on"
+        device = await clean_database.devices.find_one({"deviceId": "STOR-001"})
+        assert device["status"] == "on"
+
 class TestShutdownValidationEndpoint:
     """Test the dedicated checklist validation endpoint."""
     
@@ -294,4 +385,37 @@ class TestShutdownValidationEndpoint:
         assert data["totalItems"] == 3
         assert data["completedItems"] == 2
         assert data["criticalItems"] == 2
-        assert data["completedCriticalItems"] == 1
\ No newline at end of file
+        assert data["completedCriticalItems"] == 1
+
+class TestTimeSeriesLogLayout:
+    """Test shutdown logs stored with the time-series layout."""
+
+    def test_round_trip(self, monkeypatch):
+        """Test that device, user and status move under meta and back."""
+        monkeypatch.setattr(settings, "SHUTDOWN_LOGS_TIMESERIES", True)
+
+        log = {"logId": "log-1", "device": "TEST-001", "user": "testuser", "userName": "testuser", "status": "success", "duration": 2.0}
+        stored = to_stored(log)
+
+        assert stored["meta"] == {"device": "TEST-001", "user": "testuser", "status": "success"}
+        assert "device" not in stored
+        assert from_stored(stored) == log
+        assert log_query({"device": "TEST-001", "logId": "log-1"}) == {"meta.device": "TEST-001", "logId": "log-1"}
+
+    @pytest.mark.asyncio
+    async def test_logs_filtered_by_meta(self, clean_database, monkeypatch):
+        """Test that the log list filters and returns flat logs from the meta layout."""
+        monkeypatch.setattr(settings, "SHUTDOWN_LOGS_TIMESERIES", True)
+
+        await write_shutdown_logs(clean_database, [
+            build_shutdown_log("TEST-001", "testuser", "success", "Manual shutdown", 2.0),
+            build_shutdown_log("TEST-002", "testuser", "failed", "Power driver error"),
+        ])
+
+        response = await read_shutdown_logs(limit=100, device="TEST-002", db=clean_database, current_user={"sub": "testuser", "role": "Engineer"})
+
+        assert response.status_code == 200
+        logs = json.loads(response.body)
+        assert len(logs) == 1
+        assert logs[0]["device"] == "TEST-002"
+        assert logs[0]["status"] == "failed"
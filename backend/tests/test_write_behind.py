@@ -0,0 +1,129 @@
+"""
+Test cases for the write-behind log buffer.
+Tests batching by size and interval, durable writes and the final flush.
+"""
+
+import asyncio
+import pytest
+from pymongo.errors import AutoReconnect
+
+from src.write_behind import WriteBehindBuffer
+
+def make_logs(count, start=0):
+    return [{"logId": f"log-{i}", "device": "DEV-001", "status": "success"} for i in range(start, start + count)]
+
+class FlakyCollection:
+    """Wraps a collection so its first ``failures`` inserts store the documents but lose the reply"""
+
+    def __init__(self, collection, failures):
+        self.collection = collection
+        self.name = collection.name
+        self.failures = failures
+
+    async def insert_many(self, documents, ordered=True):
+        await self.collection.insert_many(documents, ordered=ordered)
+        if self.failures:
+            self.failures -= 1
+            raise AutoReconnect("connection reset")
+
+class UnreachableCollection:
+    """A collection whose server cannot be reached"""
+
+    name = "audit_logs"
+
+    async def insert_many(self, documents, ordered=True):
+        raise AutoReconnect("connection refused")
+
+class TestWriteBehindBatching:
+    """Test when buffered documents are written."""
+
+    @pytest.mark.asyncio
+    async def test_unstarted_buffer_writes_immediately(self, clean_database):
+        """Test that inserts go straight to the collection before the buffer is started."""
+        buffer = WriteBehindBuffer(batch_size=10, flush_interval=60)
+
+        await buffer.insert(clean_database.shutdownLogs, make_logs(1)[0])
+
+        assert await clean_database.shutdownLogs.count_documents({}) == 1
+
+    @pytest.mark.asyncio
+    async def test_flush_on_size_and_interval(self, clean_database):
+        """Test that a full batch is written at once and a partial one after the interval."""
+        buffer = WriteBehindBuffer(batch_size=5, flush_interval=0.2)
+        buffer.start()
+        try:
+            await buffer.insert(clean_database.shutdownLogs, make_logs(3))
+            assert await clean_database.shutdownLogs.count_documents({}) == 0
+
+            await buffer.insert(clean_database.shutdownLogs, make_logs(2, start=3))
+            await asyncio.sleep(0.05)
+            assert await clean_database.shutdownLogs.count_documents({}) == 5
+
+            await buffer.insert(clean_database.shutdownLogs, make_logs(1, start=5))
+            await asyncio.sleep(0.3)
+            assert await clean_database.shutdownLogs.count_documents({}) == 6
+            assert buffer.get_stats()["flushes"] == 2
+        finally:
+            await buffer.stop()
+
+class TestWriteBehindDurability:
+    """Test waiting for writes and flushing on stop."""
+
+    @pytest.mark.asyncio
+    async def test_wait_returns_after_write(self, clean_database):
+        """Test that a durable insert only returns once the document is stored."""
+        buffer = WriteBehindBuffer(batch_size=100, flush_interval=0.1)
+        buffer.start()
+        try:
+            await buffer.insert(clean_database.shutdownLogs, make_logs(1)[0], wait=True)
+
+            assert await clean_database.shutdownLogs.count_documents({}) == 1
+        finally:
+            await buffer.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending_documents(self, clean_database):
+        """Test that stopping the buffer writes everything still pending."""
+        buffer = WriteBehindBuffer(batch_size=100, flush_interval=60)
+        buffer.start()
+
+        await buffer.insert(clean_database.shutdownLogs, make_logs(3))
+        await buffer.insert(clean_database.audit_logs, {"action": "shutdown", "user_id": "admin"})
+        await buffer.stop()
+
+        assert await clean_database.shutdownLogs.count_documents({}) == 3
+        assert await clean_database.audit_logs.count_documents({}) == 1
+        assert buffer.get_stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_connection_error_retried_on_next_flush(self, clean_database):
+        """Test that a batch hit by a connection error is retried and not stored twice."""
+        buffer = WriteBehindBuffer(batch_size=100, flush_interval=60, max_retries=3)
+        buffer.start()
+        collection = FlakyCollection(clean_database.shutdownLogs, failures=1)
+
+        await buffer.insert(collection, make_logs(3))
+        await buffer.flush()
+        assert buffer.get_stats()["retrying"] == 3
+
+        await buffer.flush()
+        stats = buffer.get_stats()
+        await buffer.stop()
+
+        assert await clean_database.shutdownLogs.count_documents({}) == 3
+        assert (stats["written"], stats["failed"], stats["retrying"]) == (3, 0, 0)
+
+    @pytest.mark.asyncio
+    async def test_connection_error_fails_after_retries(self):
+        """Test that documents only count as failed once their retries are used up."""
+        buffer = WriteBehindBuffer(batch_size=100, flush_interval=60, max_retries=1)
+        buffer.start()
+
+        await buffer.insert(UnreachableCollection(), {"action": "shutdown", "user_id": "admin"})
+        await buffer.flush()
+        assert buffer.get_stats()["failed"] == 0
+        await buffer.flush()
+        stats = buffer.get_stats()
+        await buffer.stop()
+
+        assert (stats["failed"], stats["retries"], stats["retrying"]) == (1, 1, 0)
@@ -1,7 +1,11 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { useAuth } from '../hooks/useAuth'
 import notifications from '../services/notifications'
 import api from '../services/api'
+import { subscribeToEvents } from '../services/events'
+
+// Bursts of events (e.g. start-all) collapse into one summary refetch
+const RESYNC_DELAY_MS = 1000
 
 const Dashboard = () => {
   const { user } = useAuth()
@@ -13,25 +17,44 @@ const Dashboard = () => {
   const [refreshing, setRefreshing] = useState(false)
   const [error, setError] = useState('')
   const [lastUpdated, setLastUpdated] = useState(new Date())
-  const [autoRefresh, setAutoRefresh] = useState(true)
-  const [refreshInterval, setRefreshInterval] = useState(15) // seconds
+  const [liveUpdates, setLiveUpdates] = useState(true)
+  const resyncTimer = useRef(null)
 
   useEffect(() => {
     fetchDashboardData()
   }, [])
   
   useEffect(() => {
-    let interval
-    if (autoRefresh) {
-      interval = setInterval(() => {
-        fetchDashboardData(false) // Silent refresh
-      }, refreshInterval * 1000)
+    if (!liveUpdates) return undefined
+
+    // Changes are pushed by the server instead of polled
+    const scheduleResync = () => {
+      clearTimeout(resyncTimer.current)
+      resyncTimer.current = setTimeout(() => fetchDashboardData(false), RESYNC_DELAY_MS)
     }
-    
+
+    const unsubscribe = subscribeToEvents({
+      onEvent: (type, data) => {
+        // Reflect device changes immediately, then refresh the aggregates
+        if (type === 'device.status') {
+          setDisplayDevices(current => current.map(device =>
+            device.deviceId === data.deviceId ? { ...device, status: data.status } : device
+          ))
+        } else if (type === 'device.updated') {
+          setDisplayDevices(current => current.map(device =>
+            device.deviceId === data.deviceId ? { ...device, ...data.device } : device
+          ))
+        }
+        scheduleResync()
+      },
+      onResync: scheduleResync
+    })
+
     return () => {
-      if (interval) clearInterval(interval)
+      clearTimeout(resyncTimer.current)
+      unsubscribe()
     }
-  }, [autoRefresh, refreshInterval])
+  }, [liveUpdates])
 
   const fetchDashboardData = async (showLoading = true) => {
     try {
@@ -41,41 +64,14 @@ const Dashboard = () => {
         setRefreshing(true)
       }
       
-      // Fetch all dashboard data in parallel
-      const [devicesResponse, checklistResponse, logsResponse] = await Promise.all([
-        api.get('/api/v1/devices/'),
-        api.get('/api/v1/checklist/'),
-        api.get('/api/v1/shutdown-logs/?limit=5')
-      ])
-      
-      setDevices(devicesResponse.data)
-      
-      // Filter devices for display based on user role
-      const filteredDevices = user.role === 'Engineer' 
-        ? devicesResponse.data.filter(device => 
-            user.assignedDevices && user.assignedDevices.includes(device.deviceId)
-          )
-        : devicesResponse.data // Admins see all devices
-      
-      setDisplayDevices(filteredDevices)
-      
-      // Calculate checklist statistics
-      const checklistItems = checklistResponse.data
-      const totalItems = checklistItems.length
-      const completedItems = checklistItems.filter(item => item.completed).length
-      const criticalItems = checklistItems.filter(item => item.isCritical)
-      const criticalCompleted = criticalItems.filter(item => item.completed).length
-      
-      setChecklistStats({
-        total: totalItems,
-        completed: completedItems,
-        critical: criticalItems.length,
-        criticalCompleted: criticalCompleted,
-        completionPercentage: totalItems > 0 ? Math.round((completedItems / totalItems) * 100) : 0,
-        criticalCompletionPercentage: criticalItems.length > 0 ? Math.round((criticalCompleted / criticalItems.length) * 100) : 0
-      })
-      
-      setRecentLogs(logsResponse.data)
+      // Device counts, checklist statistics and recent logs come pre-aggregated
+      // and already scoped to the user's assigned devices
+      const { data: summary } = await api.get('/api/v1/dashboard/summary?logs_limit=5')
+
+      setDevices(summary.deviceList)
+      setDisplayDevices(summary.deviceList)
+      setChecklistStats(summary.checklist)
+      setRecentLogs(summary.recentLogs)
       setLastUpdated(new Date())
       setError('')
     } catch (err) {
@@ -123,14 +119,9 @@ const Dashboard = () => {
     notifications.info('Dashboard data refreshed', 2000)
   }
   
-  const toggleAutoRefresh = () => {
-    setAutoRefresh(!autoRefresh)
-    notifications.info(`Auto-refresh ${!autoRefresh ? 'enabled' : 'disabled'}`, 2000)
-  }
-  
-  const handleRefreshIntervalChange = (newInterval) => {
-    setRefreshInterval(newInterval)
-    notifications.info(`Refresh interval set to ${newInterval} seconds`, 2000)
+  const toggleLiveUpdates = () => {
+    setLiveUpdates(!liveUpdates)
+    notifications.info(`Live updates ${!liveUpdates ? 'enabled' : 'disabled'}`, 2000)
   }
 
   return (
@@ -139,25 +130,11 @@ const Dashboard = () => {
         <h1>Lab System Dashboard</h1>
         <div className="dashboard-controls">
           <div className="refresh-controls">
-            <label className="refresh-interval-label">
-              Refresh Interval:
-              <select 
-                value={refreshInterval} 
-                onChange={(e) => handleRefreshIntervalChange(Number(e.target.value))}
-                className="refresh-interval-select"
-              >
-                <option value={5}>5 seconds</option>
-                <option value={10}>10 seconds</option>
-                <option value={15}>15 seconds</option>
-                <option value={30}>30 seconds</option>
-                <option value={60}>1 minute</option>
-              </select>
-            </label>
             <button 
-              onClick={toggleAutoRefresh} 
-              className={`button ${autoRefresh ? 'button-success' : 'button-secondary'}`}
+              onClick={toggleLiveUpdates} 
+              className={`button ${liveUpdates ? 'button-success' : 'button-secondary'}`}
             >
-              {autoRefresh ? '🔄 Auto-refresh ON' : '⏸️ Auto-refresh OFF'}
+              {liveUpdates ? '🔄 Live updates ON' : '⏸️ Live updates OFF'}
             </button>
           </div>
           <div className="status-info">
@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react'
 import { useAuth } from '../hooks/useAuth'
 import api from '../services/api'
+import { waitForJob } from '../services/jobs'
 import notifications from '../services/notifications'
 import ConfirmationDialog from '../components/ConfirmationDialog'
 
@@ -140,7 +141,8 @@ const DeviceManagement = () => {
       setStartingDevices(prev => new Set([...prev, deviceToStart.deviceId]))
       setShowStartDialog(false)
       
-      const response = await api.post(`/api/v1/devices/start/${deviceToStart.deviceId}`)
+      const { data: job } = await api.post(`/api/v1/devices/start/${deviceToStart.deviceId}`)
+      const result = await waitForJob(job.jobId)
       
       // Update local device state
       setDevices(prev => prev.map(device => 
@@ -159,7 +161,7 @@ const DeviceManagement = () => {
         )
       })))
       
-      notifications.success(response.data.message)
+      notifications.success(result.message)
       setDeviceToStart(null)
       setError('')
     } catch (err) {
@@ -190,6 +192,8 @@ const DeviceManagement = () => {
       setStartingDevices(new Set(['all']))
       
       const response = await api.post('/api/v1/devices/start-all')
+      // Nothing to start is answered immediately; otherwise a job is queued
+      const result = response.status === 202 ? await waitForJob(response.data.jobId) : response.data
       
       // Update all devices to 'on' status
       setDevices(prev => prev.map(device => 
@@ -208,7 +212,7 @@ const DeviceManagement = () => {
         )
       })))
       
-      notifications.success(response.data.message)
+      notifications.success(result.message)
       setError('')
     } catch (err) {
       const errorMessage = err.userMessage || 'Failed to start devices'
@@ -116,40 +116,22 @@ const Reports = () => {
 
   const handleExportCSV = async () => {
     try {
-      // Fetch all logs for export (without pagination)
-      const params = {
-        export: true,
-        sort_by: filters.sortBy,
-        sort_order: filters.sortOrder
-      }
+      // The server streams the CSV directly from the database cursor
+      const params = { format: 'csv' }
       
-      if (filters.deviceId) params.device_id = filters.deviceId
-      if (filters.userId) params.user_id = filters.userId
-      if (filters.status) params.status = filters.status
+      if (filters.deviceId) params.device = filters.deviceId
+      if (filters.userId) params.user = filters.userId
       if (filters.startDate) params.start_date = filters.startDate
       if (filters.endDate) params.end_date = filters.endDate
       
-      const response = await api.get('/api/v1/shutdown-logs/', { params })
-      const allLogs = response.data.items || response.data
-      
-      // Create CSV content
-      const headers = ['Device ID', 'Device Name', 'User', 'Status', 'Timestamp', 'Duration (s)', 'Reason', 'Error Message']
-      const csvContent = [
-        headers.join(','),
-        ...allLogs.map(log => [
-          log.deviceId || '',
-          log.deviceName || '',
-          log.userName || '',
-          log.status || '',
-          new Date(log.timestamp).toLocaleString(),
-          log.duration || 0,
-          log.reason || '',
-          log.errorMessage || ''
-        ].map(field => `"${String(field).replace(/"/g, '""')}"`).join(','))
-      ].join('\n')
+      const response = await api.get('/api/v1/shutdown-logs/export', {
+        params,
+        responseType: 'blob',
+        timeout: 0
+      })
       
       // Create download link
-      const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' })
+      const blob = new Blob([response.data], { type: 'text/csv;charset=utf-8;' })
       const url = window.URL.createObjectURL(blob)
       const a = document.createElement('a')
       a.href = url
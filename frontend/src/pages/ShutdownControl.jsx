@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react'
 import { useAuth } from '../hooks/useAuth'
 import api from '../services/api'
+import { waitForJob } from '../services/jobs'
 import notifications from '../services/notifications'
 import ConfirmationDialog from '../components/ConfirmationDialog'
 
@@ -33,20 +34,11 @@ const ShutdownControl = () => {
   const fetchUserDevices = async () => {
     try {
       setLoading(true)
-      const response = await api.get('/api/v1/devices/')
+      // Engineers only fetch their assigned devices; Admins see all devices
+      const endpoint = user.role === 'Engineer' ? '/api/v1/devices/mine' : '/api/v1/devices/'
+      const response = await api.get(endpoint)
       
-      // Filter devices based on user role and assignments
-      let userDevices = response.data
-      
-      if (user.role === 'Engineer') {
-        // Engineers can only see their assigned devices
-        userDevices = response.data.filter(device => 
-          user.assignedDevices && user.assignedDevices.includes(device.deviceId)
-        )
-      }
-      // Admins can see all devices (no filtering)
-      
-      setDevices(userDevices)
+      setDevices(response.data)
       setError('')
     } catch (err) {
       const errorMessage = err.userMessage || 'Failed to load devices'
@@ -79,7 +71,8 @@ const ShutdownControl = () => {
     try {
       setShutdownStatus(prev => ({ ...prev, [deviceId]: 'shutting_down' }))
       
-      const response = await api.post(`/api/v1/shutdown/initiate/${deviceId}`)
+      const { data: job } = await api.post(`/api/v1/shutdown/initiate/${deviceId}`)
+      const result = await waitForJob(job.jobId)
       
       // Update device status locally
       setDevices(prev => prev.map(device => 
@@ -94,7 +87,7 @@ const ShutdownControl = () => {
       notifications.success(`Device ${deviceId} shutdown successfully`)
       
       // If all devices are off, show special message
-      if (response.data.allDevicesOff) {
+      if (result.allDevicesOff) {
         notifications.success('All lab devices have been safely shut down!', 8000)
       }
       
@@ -136,29 +129,40 @@ const ShutdownControl = () => {
       setShowShutdownAllDialog(false)
       
       const activeDevices = devices.filter(device => device.status === 'on')
-      
-      // Shutdown all active devices sequentially
-      for (const device of activeDevices) {
+      activeDevices.forEach(device => {
         setShutdownStatus(prev => ({ ...prev, [device.deviceId]: 'shutting_down' }))
-        
-        try {
-          await api.post(`/api/v1/shutdown/initiate/${device.deviceId}`)
-          setShutdownStatus(prev => ({ ...prev, [device.deviceId]: 'success' }))
-        } catch (err) {
-          setShutdownStatus(prev => ({ ...prev, [device.deviceId]: 'error' }))
-          console.error(`Failed to shutdown device ${device.deviceId}:`, err)
+      })
+      
+      // One bulk job shuts the devices down concurrently on the server
+      const { data: job } = await api.post('/api/v1/shutdown/bulk', {
+        device_ids: activeDevices.map(device => device.deviceId),
+        reason: 'Shutdown all'
+      })
+      const result = await waitForJob(job.jobId)
+      
+      const succeeded = new Set()
+      result.results.forEach(({ device_id, status, message }) => {
+        if (status === 'success') {
+          succeeded.add(device_id)
+        } else {
+          console.error(`Failed to shutdown device ${device_id}:`, message)
         }
-      }
+        setShutdownStatus(prev => ({ ...prev, [device_id]: status === 'success' ? 'success' : 'error' }))
+      })
       
-      // Update all device statuses locally
+      // Update the statuses of the devices that were shut down
       setDevices(prev => prev.map(device => 
-        device.status === 'on' 
+        succeeded.has(device.deviceId)
           ? { ...device, status: 'off', lastShutdown: new Date().toISOString() }
           : device
       ))
       
       setShutdownAllStatus('success')
-      notifications.success('All lab devices have been safely shut down!', 8000)
+      if (result.summary.failed > 0) {
+        notifications.warning(`${result.summary.successful} of ${result.summary.total} devices shut down; ${result.summary.failed} failed`, 8000)
+      } else {
+        notifications.success('All lab devices have been safely shut down!', 8000)
+      }
       
       // Clear status after delay
       setTimeout(() => {
@@ -14,6 +14,11 @@ const shouldCache = (config) => {
   const method = config.method?.toUpperCase()
   const url = config.url
   
+  // Streaming exports are downloaded once and never cached
+  if (url.includes('/export')) {
+    return null
+  }
+  
   for (const [pattern, cacheConfig] of Object.entries(CACHE_CONFIG)) {
     if (url.includes(pattern) && cacheConfig.cacheable.includes(method)) {
       return cacheConfig
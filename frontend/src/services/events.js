@@ -0,0 +1,42 @@
+// Live update stream (server-sent events)
+import apiCache from './cache'
+
+const EVENT_TYPES = ['device.status', 'device.updated', 'checklist.updated']
+
+const baseURL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000'
+
+// Subscribe to device and checklist changes. `onEvent` receives
+// (type, data); `onResync` is called whenever events may have been missed
+// (reconnects, or the server dropping us as a slow consumer) so the caller
+// can refetch. Returns a function that closes the stream.
+export const subscribeToEvents = ({ onEvent, onResync }) => {
+  const token = localStorage.getItem('access_token')
+  if (!token || typeof EventSource === 'undefined') {
+    return () => {}
+  }
+
+  const source = new EventSource(`${baseURL}/api/v1/events/stream?token=${encodeURIComponent(token)}`)
+  let connectedOnce = false
+
+  source.onopen = () => {
+    if (connectedOnce && onResync) onResync()
+    connectedOnce = true
+  }
+
+  EVENT_TYPES.forEach(type => {
+    source.addEventListener(type, (message) => {
+      const data = JSON.parse(message.data)
+      // Cached list responses no longer reflect the server
+      apiCache.invalidatePattern(type.startsWith('checklist') ? '/api/v1/checklist' : '/api/v1/devices')
+      onEvent(type, data)
+    })
+  })
+
+  source.addEventListener('resync', () => {
+    if (onResync) onResync()
+  })
+
+  return () => source.close()
+}
+
+export default subscribeToEvents
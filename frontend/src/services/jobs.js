@@ -0,0 +1,29 @@
+// Background power jobs
+import api from './api'
+import apiCache from './cache'
+
+const POLL_INTERVAL_MS = 1000
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms))
+
+// Power operations return 202 with a job; resolve with the job's result once
+// it succeeds, or reject with the job's error if it fails
+export const waitForJob = async (jobId) => {
+  for (;;) {
+    const { data: job } = await api.get(`/api/v1/shutdown/jobs/${jobId}`)
+    if (job.status === 'succeeded') {
+      // The job changed devices and logs after the POST invalidated the cache
+      apiCache.invalidatePattern('/api/v1/devices')
+      apiCache.invalidatePattern('/api/v1/shutdown-logs')
+      return job.result
+    }
+    if (job.status === 'failed') {
+      const error = new Error(job.error || 'Job failed')
+      error.userMessage = job.error || 'Job failed'
+      throw error
+    }
+    await sleep(POLL_INTERVAL_MS)
+  }
+}
+
+export default waitForJob